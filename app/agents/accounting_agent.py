@@ -3,6 +3,8 @@
 from typing import Dict, Any
 from app.services.vector_service import vector_service
 from app.services.llm_service import llm_service
+from app.services.response_cache import response_cache
+from app.utils.streaming import emit
 
 
 class AccountingAgent:
@@ -29,13 +31,25 @@ class AccountingAgent:
 
         # Step 2: If a highly relevant knowledge base entry is found, return it as the response
         if knowledge_results and knowledge_results[0]["similarity"] > 0.7:
+            emit("kb_hit", {"question": knowledge_results[0].get("question", ""),
+                            "similarity": knowledge_results[0]["similarity"]})
             return {
                 "response": knowledge_results[0]["answer"],
                 "source": "knowledge_base",         # Indicates the answer came from the preloaded knowledge
                 "next_action": "complete"           # No further action required
             }
 
-        # Step 3: If no suitable knowledge is found, fallback to generating a response using the LLM
+        # Step 3: Reuse a generated answer to a near-identical recent question
+        cached = await response_cache.lookup("ACCOUNTING", message)
+        if cached:
+            emit("cache_hit", {"similarity": cached["similarity"]})
+            return {
+                "response": cached["answer"],
+                "source": "response_cache",     # Indicates a recently generated answer was reused
+                "next_action": "complete"
+            }
+
+        # Step 4: If no suitable knowledge is found, fallback to generating a response using the LLM
         prompt = f"""
         You are an accounting assistant. Help with this finance-related query:
         {message}
@@ -46,8 +60,9 @@ class AccountingAgent:
 
         # Generate a response from the LLM using the formatted prompt
         response = await llm_service.generate_response(prompt)
+        await response_cache.store("ACCOUNTING", message, response)
 
-        # Step 4: Return the generated response
+        # Step 5: Return the generated response
         return {
             "response": response,
             "source": "generated",                # Indicates the answer was generated by the language model
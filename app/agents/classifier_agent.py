@@ -2,6 +2,8 @@
 
 from typing import Dict, Any
 from app.services.llm_service import llm_service
+from app.services.intent_classifier import LocalIntentClassifier
+from app.utils.config import settings
 from app.utils.logger import logger
 
 
@@ -10,21 +12,37 @@ class ClassifierAgent:
         # Defines the type of agent, useful for agent-based routing logic
         self.agent_type = "classifier"
 
+        # Fast in-process model consulted before the LLM (no-op until trained)
+        self.local_classifier = LocalIntentClassifier()
+        self.local_classifier.load(settings.intent_model_path)
+
+        # Counters for which tier answered each classification
+        self.metrics = {"local": 0, "llm": 0}
+
     async def classify_query(self, message: str, context: str = "") -> Dict[str, Any]:
         """
         Classifies the user's query to determine which department or agent should handle it.
 
+        The local model answers first; only messages where its confidence is below
+        `intent_confidence_threshold` (or no model is trained) are sent to the LLM.
+
         Args:
             message (str): The user's input message that needs classification.
             context (str, optional): Additional context if available (currently unused).
 
         Returns:
             Dict[str, Any]: Classification result including category, confidence score,
-                            next agent, and routing flag.
+                            next agent, routing flag and which classifier answered.
         """
         try:
-            # Use LLM service to classify the user's message
-            classification = await llm_service.classify_intent(message)
+            # Try the local model first; fall back to the LLM for ambiguous messages
+            classification = self.local_classifier.predict(message)
+            if classification and classification["confidence"] >= settings.intent_confidence_threshold:
+                classifier = "local"
+            else:
+                classification = await llm_service.classify_intent(message)
+                classifier = "llm"
+            self.metrics[classifier] += 1
 
             # Log the classification result
             logger.info(f"Classified message as: {classification}")
@@ -34,7 +52,8 @@ class ClassifierAgent:
                 "category": classification["category"],                   # Classified topic (e.g., HR, IT)
                 "confidence": classification["confidence"],               # LLM confidence score
                 "next_agent": self._get_next_agent(classification["category"]),  # Map category to next agent
-                "requires_routing": True                                   # Indicates the message needs routing
+                "requires_routing": True,                                  # Indicates the message needs routing
+                "classifier": classifier                                   # "local" model or "llm"
             }
 
         except Exception as e:
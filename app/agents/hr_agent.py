@@ -1,7 +1,9 @@
 # Import necessary types and services
 from typing import Dict, Any
 from app.services.llm_service import llm_service
+from app.services.response_cache import response_cache
 from app.services.vector_service import vector_service
+from app.utils.streaming import emit
  
  
 class HRAgent:
@@ -12,7 +14,8 @@ class HRAgent:
     async def handle_query(self, message: str, context: Dict = None) -> Dict[str, Any]:
         """
         Handles HR-related queries by first checking a vector-based knowledge base.
-        If a high-confidence match is found, uses it. Otherwise, falls back to LLM-generated response.
+        If a high-confidence match is found, uses it. Otherwise, reuses the answer to a recent,
+        near-identical question, and only then falls back to an LLM-generated response.
  
         Args:
             message (str): The user's input query.
@@ -29,13 +32,25 @@ class HRAgent:
  
         # Step 2: If a confident match is found in the knowledge base, return it
         if knowledge_results and knowledge_results[0]["similarity"] > 0.7:
+            emit("kb_hit", {"question": knowledge_results[0].get("question", ""),
+                            "similarity": knowledge_results[0]["similarity"]})
             return {
                 "response": knowledge_results[0]["answer"],   # Return the most relevant answer
                 "source": "knowledge_base",                   # Source is the knowledge base
                 "next_action": "complete"                     # No further steps required
             }
  
-        # Step 3: If no relevant KB answer, generate a response using LLM
+        # Step 3: Reuse a generated answer to a near-identical recent question
+        cached = await response_cache.lookup("HR", message)
+        if cached:
+            emit("cache_hit", {"similarity": cached["similarity"]})
+            return {
+                "response": cached["answer"],
+                "source": "response_cache",
+                "next_action": "complete"
+            }
+ 
+        # Step 4: If no relevant KB or cached answer, generate a response using LLM
         prompt = f"""
         You are an HR assistant. Help with this HR-related query:
         {message}
@@ -46,8 +61,9 @@ class HRAgent:
  
         # Generate the response from the LLM
         response = await llm_service.generate_response(prompt)
+        await response_cache.store("HR", message, response)
  
-        # Step 4: Return the generated response
+        # Step 5: Return the generated response
         return {
             "response": response,               # LLM-generated answer
             "source": "generated",              # Indicates fallback to LLM
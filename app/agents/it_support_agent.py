@@ -1,9 +1,16 @@
 # Import necessary types and services
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Tuple
 from app.services.llm_service import llm_service
+from app.services.response_cache import response_cache
 from app.services.vector_service import vector_service
 from app.services.web_search import web_search_service
+from app.utils.config import settings
 from app.utils.logger import logger
+from app.utils.streaming import emit
+
+# Knowledge base similarity that counts as an answer once the user has given details
+DETAIL_MATCH_THRESHOLD = 0.6
 
 
 class ITSupportAgent:
@@ -51,6 +58,7 @@ class ITSupportAgent:
 
         if knowledge_results and knowledge_results[0]["similarity"] > 0.7:
             best_result = knowledge_results[0]
+            emit("kb_hit", {"question": best_result.get("question", ""), "similarity": best_result["similarity"]})
             response = f"""I found a solution in our knowledge base:\n\n{best_result['answer']}
 
 ✅ **Did this help solve your problem?**
@@ -74,8 +82,14 @@ Please respond with:
     async def _ask_for_details(self, message: str) -> Dict[str, Any]:
         """
         Prompts user for more specific details about their issue.
-        Uses LLM to generate relevant follow-up questions.
+        Uses LLM to generate relevant follow-up questions, reusing the questions generated
+        for a near-identical recent issue when there is one.
         """
+        cached = await response_cache.lookup("IT_DETAILS", message)
+        if cached:
+            emit("cache_hit", {"similarity": cached["similarity"]})
+            return self._details_request(cached["answer"], message)
+
         prompt = f"""
         A user has an IT issue: "{message}"
         
@@ -90,9 +104,13 @@ Please respond with:
         """
 
         response = await llm_service.generate_response(prompt)
+        await response_cache.store("IT_DETAILS", message, response)
+        return self._details_request(response, message)
 
+    @staticmethod
+    def _details_request(questions: str, message: str) -> Dict[str, Any]:
         return {
-            "response": f"""I'd like to help you with that IT issue. To provide the best solution, I need a few more details:\n\n{response}
+            "response": f"""I'd like to help you with that IT issue. To provide the best solution, I need a few more details:\n\n{questions}
 
 Please provide as much information as you can.""",
             "source": "detail_gathering",
@@ -104,20 +122,20 @@ Please provide as much information as you can.""",
     async def _handle_detail_gathering(self, message: str, context: Dict) -> Dict[str, Any]:
         """
         Handles user input after asking for more information.
-        Re-queries the knowledge base and escalates if needed.
+        Re-queries the knowledge base (with a web search running alongside) and escalates if needed.
+        The returned dict includes per-stage `timings` in milliseconds.
         """
         original_query = context.get('original_query', '')
         full_context = f"Original issue: {original_query}\nAdditional details: {message}"
 
-        # Recheck the knowledge base with fuller context
-        knowledge_results = await vector_service.search_knowledge(
-            full_context,
-            category="IT",
-            n_results=3
-        )
+        # Recheck the knowledge base with fuller context, searching the web at the same time
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        knowledge_results, web_results, timings = await self._retrieve(full_context)
 
-        if knowledge_results and knowledge_results[0]["similarity"] > 0.6:
+        if knowledge_results and knowledge_results[0]["similarity"] > DETAIL_MATCH_THRESHOLD:
             best_result = knowledge_results[0]
+            emit("kb_hit", {"question": best_result.get("question", ""), "similarity": best_result["similarity"]})
             response = f"""Based on the details you provided, here's a solution:\n\n{best_result['answer']}
 
 ✅ **Please let me know if this resolves your issue:**
@@ -125,18 +143,19 @@ Please provide as much information as you can.""",
 • 'No' - Still need help
 • 'Partial' - Helped but need more assistance"""
 
+            timings["total_ms"] = self._elapsed_ms(loop, started)
             return {
                 "response": response,
                 "source": "knowledge_base",
                 "confidence": best_result["similarity"],
                 "next_action": "ask_resolution",
-                "conversation_stage": "awaiting_resolution_feedback"
+                "conversation_stage": "awaiting_resolution_feedback",
+                "timings": timings
             }
 
-        # Try a web search if knowledge base didn't help
-        web_results = await web_search_service.search_web(f"fix {full_context}", 3)
-
+        # Use the web results if the knowledge base didn't help
         if web_results:
+            emit("web_search", {"results": len(web_results)})
             search_context = "\n".join([
                 f"- {result['title']}: {result['snippet']}"
                 for result in web_results[:3]
@@ -153,7 +172,9 @@ Please provide as much information as you can.""",
             Provide a clear, numbered step-by-step solution. Be specific and helpful.
             """
 
+            llm_started = loop.time()
             response = await llm_service.generate_response(prompt)
+            timings["llm_ms"] = self._elapsed_ms(loop, llm_started)
 
             # Store the generated solution in the knowledge base
             await vector_service.add_knowledge(
@@ -169,24 +190,97 @@ Please provide as much information as you can.""",
 • 'No' - Need more help
 • 'Partial' - Helped but need additional support"""
 
+            timings["total_ms"] = self._elapsed_ms(loop, started)
             return {
                 "response": final_response,
                 "source": "web_search",
                 "search_results": web_results,
                 "next_action": "ask_resolution",
-                "conversation_stage": "awaiting_resolution_feedback"
+                "conversation_stage": "awaiting_resolution_feedback",
+                "timings": timings
             }
 
         # Still no answer — offer to create a support ticket
+        timings["total_ms"] = self._elapsed_ms(loop, started)
         return {
             "response": """I've gathered your details but couldn't find a definitive solution in our resources. Let me create a support ticket for you so our specialized IT team can assist you directly. They'll have access to more advanced troubleshooting tools.
 
 **Would you like me to create a support ticket?** (Yes/No)""",
             "source": "no_solution",
             "next_action": "offer_ticket",
-            "conversation_stage": "offering_ticket"
+            "conversation_stage": "offering_ticket",
+            "timings": timings
         }
 
+    async def _retrieve(self, query: str) -> Tuple[List[Dict], List[Dict], Dict[str, Any]]:
+        """
+        Search the knowledge base and the web concurrently under one latency budget.
+
+        Process:
+        - Start both searches at once.
+        - Wait for the knowledge base first; on a strong hit the web search is cancelled,
+          since its results would not be used.
+        - Otherwise wait for the web search for whatever remains of the budget.
+        - A search still running when the budget runs out is cancelled and counts as no results.
+
+        Args:
+            query (str): The original issue plus the details the user added.
+
+        Returns:
+            Tuple: (knowledge_results, web_results, timings), where timings holds a `kb` / `web`
+                   status ("ok", "cancelled", "timeout" or "error"), `kb_ms` / `web_ms` for the
+                   searches that finished and `retrieval_ms` for the whole stage (milliseconds
+                   since the stage began).
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + settings.it_retrieval_budget_seconds
+        timings: Dict[str, Any] = {}
+
+        async def timed(stage: str, coro):
+            results = await coro
+            timings[f"{stage}_ms"] = self._elapsed_ms(loop, started)  # Only stages that finished
+            return results
+
+        kb_task = asyncio.create_task(timed("kb", vector_service.search_knowledge(query, category="IT", n_results=3)))
+        web_task = asyncio.create_task(timed("web", web_search_service.search_web(f"fix {query}", 3)))
+
+        try:
+            knowledge_results = await self._await_stage("kb", kb_task, deadline - loop.time(), timings)
+            if knowledge_results and knowledge_results[0]["similarity"] > DETAIL_MATCH_THRESHOLD:
+                web_task.cancel()
+                timings["web"] = "cancelled"
+                web_results = []
+            else:
+                web_results = await self._await_stage("web", web_task, deadline - loop.time(), timings)
+        finally:
+            for task in (kb_task, web_task):
+                task.cancel()  # No-op for finished tasks
+
+        timings["retrieval_ms"] = self._elapsed_ms(loop, started)
+        logger.info(f"IT retrieval timings: {timings}")
+        return knowledge_results, web_results, timings
+
+    @staticmethod
+    async def _await_stage(stage: str, task: asyncio.Task, timeout: float, timings: Dict[str, Any]) -> List[Dict]:
+        """
+        Wait for one retrieval task, returning [] (and recording why) on timeout or error.
+        """
+        try:
+            results = await asyncio.wait_for(task, timeout=max(timeout, 0))
+            timings[stage] = "ok"
+            return results or []
+        except asyncio.TimeoutError:
+            timings[stage] = "timeout"
+        except Exception as e:
+            timings[stage] = "error"
+            logger.error(f"IT retrieval stage '{stage}' failed: {e}")
+        return []
+
+    @staticmethod
+    def _elapsed_ms(loop: asyncio.AbstractEventLoop, started: float) -> float:
+        return round((loop.time() - started) * 1000, 1)
+
     async def _handle_resolution_feedback(self, message: str, context: Dict) -> Dict[str, Any]:
         """
         Handles user feedback after a solution is provided.
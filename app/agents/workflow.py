@@ -9,9 +9,12 @@ from app.agents.it_support_agent import it_support_agent
 from app.agents.hr_agent import hr_agent
 from app.agents.accounting_agent import accounting_agent
 
-# Import ticket service to log and create support tickets
+# Import ticket service to create support tickets and the background chat log writer
 from app.services.ticket_service import ticket_service
+from app.services.chat_log_writer import chat_log_writer
+from app.utils.db_executor import run_db
 from app.utils.logger import logger
+from app.utils.streaming import emit
 
 # Define the structure of the state dictionary passed between workflow nodes
 class HelpDeskState(TypedDict):
@@ -26,9 +29,16 @@ class HelpDeskState(TypedDict):
     conversation_stage: str
     needs_ticket: bool
 
+# Conversation stages in which an agent is waiting for the user's follow-up reply.
+# Messages in these stages belong to the ongoing conversation, so they skip reclassification.
+STICKY_STAGES = {"gathering_details", "awaiting_resolution_feedback", "offering_ticket"}
+
 # Define the HelpDesk workflow class using LangGraph
 class HelpDeskWorkflow:
     def __init__(self):
+        # Counters for how often the LLM classifier ran vs. was skipped by sticky routing
+        self.metrics = {"classifications_run": 0, "classifications_skipped": 0}
+
         # Build and compile the workflow on initialization
         self.workflow = self._build_workflow()
 
@@ -80,11 +90,20 @@ class HelpDeskWorkflow:
 
     # Node: Classify the user's query and assign appropriate agent
     async def _classify_node(self, state: HelpDeskState) -> HelpDeskState:
+        # Sticky routing: follow-up replies ("yes", extra details) stay with the current agent
+        if state.get("conversation_stage", "initial") in STICKY_STAGES and state.get("category"):
+            self.metrics["classifications_skipped"] += 1
+            logger.debug(f"Sticky routing to {state['current_agent']} for session {state['session_id']}")
+            emit("agent", {"agent": state["current_agent"], "category": state["category"], "sticky": True})
+            return state
+
         last_message = state["messages"][-1]["content"]
         classification = await classifier_agent.classify_query(last_message)
+        self.metrics["classifications_run"] += 1
 
         state["category"] = classification["category"]
         state["current_agent"] = classification["next_agent"]
+        emit("agent", {"agent": state["current_agent"], "category": state["category"], "sticky": False})
 
         return state
 
@@ -118,12 +137,17 @@ class HelpDeskWorkflow:
             if key in result:
                 state["context"][key] = result[key]
 
+        # Per-stage timings of this turn (retrieval, LLM) go out with the response metadata
+        if result.get("timings"):
+            state["context"]["timings"] = result["timings"]
+            emit("timings", result["timings"])
+
         # Determine if ticket creation is required
         if result.get("next_action") == "create_ticket":
             state["needs_ticket"] = True
 
         # Log the chat to the ticketing system
-        ticket_service.log_chat(
+        await chat_log_writer.log(
             state["session_id"],
             last_message,
             result["response"],
@@ -144,7 +168,7 @@ class HelpDeskWorkflow:
             "agent": "hr"
         })
 
-        ticket_service.log_chat(
+        await chat_log_writer.log(
             state["session_id"],
             last_message,
             result["response"],
@@ -164,7 +188,7 @@ class HelpDeskWorkflow:
             "agent": "accounting"
         })
 
-        ticket_service.log_chat(
+        await chat_log_writer.log(
             state["session_id"],
             last_message,
             result["response"],
@@ -193,7 +217,8 @@ class HelpDeskWorkflow:
 
         # Create the support ticket using service
         if user_messages:
-            ticket = ticket_service.create_ticket(
+            ticket = await run_db(
+                ticket_service.create_ticket,
                 user_id=state["user_id"],
                 category=state["category"],
                 title=self._generate_ticket_title(user_messages[0], state["category"]),
@@ -203,6 +228,7 @@ class HelpDeskWorkflow:
 
             state["ticket_id"] = ticket.id
             state["needs_ticket"] = False
+            emit("ticket", {"ticket_id": ticket.id, "priority": priority, "category": state["category"]})
 
             # Add additional context based on previous resolution stage
             resolution_info = ""
@@ -1,17 +1,29 @@
 # Import necessary types, Services and Utilities
 
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
+import json
 import uuid
+from datetime import datetime, timedelta, timezone
 from app.agents.workflow import helpdesk_workflow, HelpDeskState
+from app.agents.classifier_agent import classifier_agent
 from app.services.ticket_service import ticket_service
 from app.services.auth_service import auth_service
-from app.models.database import get_db, Ticket, User, SessionLocal
+from app.services.analytics_service import analytics_service
+from app.services.chat_log_writer import chat_log_writer
+from app.services.llm_service import llm_service
+from app.services.response_cache import response_cache
+from app.services.session_store import session_store
+from app.services.web_search import web_search_service
+from app.models.database import User
+from app.utils.db_executor import run_db
 from app.utils.logger import logger
-from datetime import datetime
+from app.utils.streaming import current_stream, emit
 
 # Initialize FastAPI app with basic metadata
 app = FastAPI(title="IT Helpdesk System", version="1.0.0")
@@ -23,8 +35,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Let browser clients read the pagination cursor
 )
 
+# Start background workers when the server starts
+@app.on_event("startup")
+async def startup_event():
+    await run_db(ticket_service.ensure_counters)  # Backfill analytics counters on older databases
+    await run_db(analytics_service.ensure_rollups)  # ...and the time-series rollups
+    chat_log_writer.start()
+
+# Flush pending chat logs and release shared connection pools when the server stops
+@app.on_event("shutdown")
+async def shutdown_event():
+    await chat_log_writer.stop()
+    await llm_service.aclose()
+    await web_search_service.aclose()
+
 # Pydantic models for request/response validation and serialization
 
 class LoginRequest(BaseModel):
@@ -46,6 +73,7 @@ class ChatResponse(BaseModel):
     session_id: str
     agent: str
     ticket_id: Optional[int] = None
+    timings: Optional[Dict[str, Any]] = None  # Per-stage timings (ms) of the turn, when the agent measured them
 
 class TicketStatusRequest(BaseModel):
     ticket_id: int
@@ -65,6 +93,25 @@ class TicketResponse(BaseModel):
     updated_at: str
     assigned_to: Optional[str] = None
 
+# Query parameters shared by the paginated ticket listings (filters, sort and page position)
+def ticket_list_params(
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    sort: str = Query("created_at", pattern="^(created_at|updated_at)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    return {
+        "status": status, "category": category, "priority": priority, "assigned_to": assigned_to,
+        "created_after": created_after, "created_before": created_before,
+        "sort": sort, "order": order, "limit": limit, "cursor": cursor
+    }
+
 # Security setup: HTTP Bearer token scheme for authentication
 security = HTTPBearer()
 
@@ -75,9 +122,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if payload is None:
         raise HTTPException(status_code=401, detail="Invalid authentication token")
     
-    user = auth_service.get_user_by_username(payload.get("sub"))  # Get user by username from token payload
+    username = payload.get("sub")
+    user = auth_service.get_cached_user(username)  # Usually served from memory
+    if user is None:
+        user = await run_db(auth_service.get_user_by_username, username)  # Get user by username from token payload
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=401, detail="User is inactive")
     
     return user
 
@@ -87,14 +139,11 @@ async def get_support_engineer(current_user: User = Depends(get_current_user)) -
         raise HTTPException(status_code=403, detail="Support engineer access required")
     return current_user
 
-# In-memory dictionary to track active chat sessions (replace with Redis for production)
-active_sessions = {}
-
 # User login endpoint - authenticates user and returns JWT token
 @app.post("/login", response_model=LoginResponse)
 async def login(login_request: LoginRequest):
     """Authenticate user and return access token"""
-    user_data = auth_service.authenticate_user(login_request.username, login_request.password)
+    user_data = await run_db(auth_service.authenticate_user, login_request.username, login_request.password)
     if not user_data:
         raise HTTPException(status_code=401, detail="Invalid username or password")
     
@@ -123,74 +172,115 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
         "last_login": current_user.last_login.isoformat() if current_user.last_login else None
     }
 
+# Run one chat turn: load session state, invoke the helpdesk workflow, persist the result
+async def run_chat_turn(message: ChatMessage) -> ChatResponse:
+    # Use existing session_id or generate a new one for chat context
+    session_id = message.session_id or str(uuid.uuid4())
+
+    # Load the session state, initializing it if this is a new (or expired) session
+    state = await session_store.get(session_id)
+    if state is None:
+        state = {
+            "messages": [],
+            "current_agent": "classifier",
+            "category": "",
+            "user_id": message.user_id,
+            "session_id": session_id,
+            "context": {},
+            "ticket_id": 0,
+            "resolution_status": "",
+            "conversation_stage": "initial",
+            "needs_ticket": False
+        }
+
+    # Timings describe a single turn; never report the previous turn's
+    state["context"].pop("timings", None)
+
+    # Add user's message to conversation state
+    state["messages"].append({
+        "role": "user",
+        "content": message.content
+    })
+
+    # Process the message through the AI-powered helpdesk workflow
+    result = await helpdesk_workflow.workflow.ainvoke(state)
+
+    # Persist the updated session state (trimmed to the per-session caps)
+    await session_store.save(session_id, result)
+
+    # Extract last assistant response message
+    last_response = None
+    for msg in reversed(result["messages"]):
+        if msg["role"] == "assistant":
+            last_response = msg
+            break
+
+    # Default response if assistant has no reply
+    if not last_response:
+        last_response = {
+            "content": "I'm here to help! How can I assist you today?",
+            "agent": "system"
+        }
+
+    # Return chat response with session context and optional ticket info
+    return ChatResponse(
+        response=last_response["content"],
+        session_id=session_id,
+        agent=last_response.get("agent", "system"),
+        ticket_id=result.get("ticket_id"),
+        timings=result["context"].get("timings")
+    )
+
 # Chat endpoint - handles user messages, manages session state, and invokes helpdesk workflow
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(message: ChatMessage):
     try:
-        # Use existing session_id or generate a new one for chat context
-        session_id = message.session_id or str(uuid.uuid4())
-
-        # Initialize session state if new session
-        if session_id not in active_sessions:
-            initial_state: HelpDeskState = {
-                "messages": [],
-                "current_agent": "classifier",
-                "category": "",
-                "user_id": message.user_id,
-                "session_id": session_id,
-                "context": {},
-                "ticket_id": 0,
-                "resolution_status": "",
-                "conversation_stage": "initial",
-                "needs_ticket": False
-            }
-            active_sessions[session_id] = initial_state
-
-        state = active_sessions[session_id]
-
-        # Add user's message to conversation state
-        state["messages"].append({
-            "role": "user",
-            "content": message.content
-        })
-
-        # Process the message through the AI-powered helpdesk workflow
-        result = await helpdesk_workflow.workflow.ainvoke(state)
-
-        # Update session state with workflow output
-        active_sessions[session_id] = result
-
-        # Extract last assistant response message
-        last_response = None
-        for msg in reversed(result["messages"]):
-            if msg["role"] == "assistant":
-                last_response = msg
-                break
-
-        # Default response if assistant has no reply
-        if not last_response:
-            last_response = {
-                "content": "I'm here to help! How can I assist you today?",
-                "agent": "system"
-            }
-
-        # Return chat response with session context and optional ticket info
-        return ChatResponse(
-            response=last_response["content"],
-            session_id=session_id,
-            agent=last_response.get("agent", "system"),
-            ticket_id=result.get("ticket_id")
-        )
-
+        return await run_chat_turn(message)
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Streaming chat endpoint - same as /chat, but sends Server-Sent Events while the turn runs:
+#   agent (routing decision), kb_hit, cache_hit, web_search, token (LLM output chunks), timings, ticket,
+#   then message (the final ChatResponse) or error, and finally done
+@app.post("/chat/stream")
+async def chat_stream_endpoint(message: ChatMessage):
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run():
+        # Events emitted anywhere inside the workflow land in this request's queue
+        current_stream.set(queue)
+        try:
+            response = await run_chat_turn(message)
+            emit("message", response.model_dump())
+        except Exception as e:
+            logger.error(f"Error in chat stream endpoint: {e}")
+            emit("error", {"detail": "Internal server error"})
+        finally:
+            queue.put_nowait(None)  # End-of-stream marker
+
+    async def event_source():
+        task = asyncio.create_task(run())
+        try:
+            while (item := await queue.get()) is not None:
+                yield f"event: {item['event']}\ndata: {json.dumps(item['data'])}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        finally:
+            # Client went away: stop generating on its behalf
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Endpoint to get status/details of a specific ticket by ticket ID
 @app.post("/ticket/status", response_model=TicketResponse)
 async def get_ticket_status(request: TicketStatusRequest):
     try:
-        ticket = ticket_service.get_ticket_status(request.ticket_id)
+        ticket = await run_db(ticket_service.get_ticket_status, request.ticket_id)
         if not ticket:
             raise HTTPException(status_code=404, detail="Ticket not found")
 
@@ -209,11 +299,16 @@ async def get_ticket_status(request: TicketStatusRequest):
         logger.error(f"Error getting ticket status: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-# Get all tickets raised by a specific user
+# Get tickets raised by a specific user, one page at a time (newest first by default).
+# When more tickets remain, the cursor for the next page is returned in the X-Next-Cursor header.
 @app.get("/tickets/user/{user_id}")
-async def get_user_tickets(user_id: str):
+async def get_user_tickets(user_id: str, response: Response,
+                           params: Dict[str, Any] = Depends(ticket_list_params)):
     try:
-        tickets = ticket_service.get_user_tickets(user_id)
+        tickets, next_cursor = await run_db(ticket_service.list_tickets, user_id=user_id, **params)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
         # Return list of tickets with details
         return [
             TicketResponse(
@@ -228,6 +323,8 @@ async def get_user_tickets(user_id: str):
             )
             for ticket in tickets
         ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting user tickets: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -240,28 +337,17 @@ async def update_ticket_status(
 ):
     """Update status and assignment of a ticket - only support engineers allowed"""
     try:
-        db = SessionLocal()
-        ticket = db.query(Ticket).filter(Ticket.id == request.ticket_id).first()
-        
+        # Assign to the requested engineer, or to the engineer making the change
+        ticket = await run_db(
+            ticket_service.update_ticket,
+            request.ticket_id,
+            request.status,
+            request.assigned_to or support_engineer.username
+        )
+
         if not ticket:
-            db.close()
             raise HTTPException(status_code=404, detail="Ticket not found")
-        
-        # Update ticket status and assignment
-        ticket.status = request.status
-        if request.assigned_to:
-            ticket.assigned_to = request.assigned_to
-        else:
-            ticket.assigned_to = support_engineer.username
-        
-        ticket.updated_at = datetime.utcnow()
-        
-        # Mark resolved_at timestamp if ticket is resolved
-        if request.status.lower() == "resolved":
-            ticket.resolved_at = datetime.utcnow()
-        
-        db.commit()
-        
+
         # Prepare response model
         result = TicketResponse(
             id=ticket.id,
@@ -274,7 +360,6 @@ async def update_ticket_status(
             assigned_to=ticket.assigned_to
         )
         
-        db.close()
         logger.info(f"Ticket {ticket.id} updated by support engineer {support_engineer.username}")
         return result
         
@@ -282,14 +367,17 @@ async def update_ticket_status(
         logger.error(f"Error updating ticket: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
-# Support engineer only: Fetch all tickets in the system
+# Support engineer only: Fetch tickets across the system, filtered and paginated.
+# When more tickets remain, the cursor for the next page is returned in the X-Next-Cursor header.
 @app.get("/tickets/all")
-async def get_all_tickets(support_engineer: User = Depends(get_support_engineer)):
-    """Retrieve all tickets - support engineers only"""
+async def get_all_tickets(response: Response,
+                          params: Dict[str, Any] = Depends(ticket_list_params),
+                          support_engineer: User = Depends(get_support_engineer)):
+    """Retrieve tickets page by page - support engineers only"""
     try:
-        db = SessionLocal()
-        tickets = db.query(Ticket).all()
-        db.close()
+        tickets, next_cursor = await run_db(ticket_service.list_tickets, **params)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         
         # Return list of all tickets with details
         return [
@@ -305,52 +393,71 @@ async def get_all_tickets(support_engineer: User = Depends(get_support_engineer)
             )
             for ticket in tickets
         ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting all tickets: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Clear cached generated answers (e.g. after an HR or accounting policy change) - support engineers only
+@app.delete("/response-cache")
+async def invalidate_response_cache(category: Optional[str] = Query(None, pattern="^(HR|ACCOUNTING|IT_DETAILS)$"),
+                                    support_engineer: User = Depends(get_support_engineer)):
+    return {"category": category, "removed": response_cache.invalidate(category)}
+
 # Analytics dashboard endpoint to provide summary statistics on tickets
 @app.get("/analytics/dashboard")
 async def get_dashboard_analytics():
     try:
-        from sqlalchemy import func
-        from app.models.database import SessionLocal
-
-        db = SessionLocal()
-
-        # Count total, open, and resolved tickets
-        total_tickets = db.query(Ticket).count()
-        open_tickets = db.query(Ticket).filter(Ticket.status == 'open').count()
-        resolved_tickets = db.query(Ticket).filter(Ticket.status == 'resolved').count()
-
-        # Group tickets by category and count them
-        category_stats = db.query(
-            Ticket.category,
-            func.count(Ticket.id).label('count')
-        ).group_by(Ticket.category).all()
-
-        db.close()
-
-        # Calculate resolution rate and format category data
-        return {
-            "total_tickets": total_tickets,
-            "open_tickets": open_tickets,
-            "resolved_tickets": resolved_tickets,
-            "resolution_rate": (resolved_tickets / total_tickets * 100) if total_tickets > 0 else 0,
-            "category_breakdown": [
-                {"category": cat, "count": count}
-                for cat, count in category_stats
-            ]
-        }
+        return await run_db(ticket_service.get_dashboard_stats)
     except Exception as e:
         logger.error(f"Error getting analytics: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Time-series analytics: tickets created/resolved/open per hour or day, plus p50/p90/p99
+# time-to-resolution per category and assignee. Defaults to the last day (hourly) or 30 days (daily).
+@app.get("/analytics/timeseries")
+async def get_timeseries_analytics(
+    interval: str = Query("hour", pattern="^(hour|day)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category: Optional[str] = None
+):
+    # Rollups are stored in naive UTC; convert timezone-aware query values
+    def to_utc(value: Optional[datetime]) -> Optional[datetime]:
+        if value is not None and value.tzinfo is not None:
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    end = to_utc(end) or datetime.utcnow()
+    start = to_utc(start) or end - (timedelta(days=1) if interval == "hour" else timedelta(days=30))
+    try:
+        return await run_db(analytics_service.get_timeseries, start, end, interval, category)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting timeseries analytics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 # Simple health check endpoint to verify service status
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "IT Helpdesk System"}
 
+# Runtime performance counters (classifier calls avoided, coalesced LLM calls, cache hit rates, chat log queue, auth, web search and response caches)
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "workflow": helpdesk_workflow.metrics,
+        "classifier": classifier_agent.metrics,
+        "embedding_cache": llm_service.embedding_cache.get_stats(),
+        "llm_requests": llm_service.get_request_stats(),
+        "chat_log_writer": chat_log_writer.get_stats(),
+        "auth_cache": auth_service.get_cache_stats(),
+        "web_search": web_search_service.get_stats(),
+        "response_cache": response_cache.get_stats()
+    }
+
 
 # Run app with Uvicorn if executed as main program
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 # Import necessary SQLAlchemy components for ORM modeling
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
 
@@ -12,6 +14,12 @@ from app.utils.config import settings
 # For hashing passwords securely
 import hashlib
 
+# Typing for the counter helpers
+from typing import Any, Dict
+
+# Engine profile (pool sizing, SQLite PRAGMAs); importable without the side effects below
+from app.models.engine import create_db_engine, sqlite_pragmas
+
 # Define base class for SQLAlchemy models
 Base = declarative_base()
 
@@ -65,6 +73,20 @@ class Ticket(Base):
     # One-to-many relationship: Ticket has multiple ChatLogs
     chat_logs = relationship("ChatLog", back_populates="ticket")
 
+    # Composite indexes (created by migrations/versions/0002_listing_indexes.py on existing
+    # databases). Listing indexes serve one filter column with rows already ordered by
+    # (created_at, id), so a page costs O(page size)
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_updated_at_id", "updated_at", "id"),
+        Index("ix_tickets_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_tickets_assigned_to_created_at_id", "assigned_to", "created_at", "id"),
+        # Dashboard counts by category and status
+        Index("ix_tickets_category_status", "category", "status"),
+    )
+
 
 # -------------------- ChatLog Model --------------------
 class ChatLog(Base):
@@ -82,14 +104,57 @@ class ChatLog(Base):
     # Relationship to ticket (many chat logs belong to one ticket)
     ticket = relationship("Ticket", back_populates="chat_logs")
 
+    # Conversation history for a session in order
+    __table_args__ = (
+        Index("ix_chat_logs_session_id_created_at", "session_id", "created_at"),
+    )
+
+
+# -------------------- TicketCounter Model --------------------
+class TicketCounter(Base):
+    __tablename__ = "ticket_counters"
+
+    # Number of tickets per (category, status), maintained in the same transaction as
+    # every ticket insert or status change so dashboard reads never scan tickets
+    category = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+# -------------------- Analytics Rollup Models --------------------
+class TicketHourlyStats(Base):
+    __tablename__ = "ticket_hourly_stats"
+
+    # Tickets created and resolved per hour (UTC, truncated to the hour) and category
+    hour = Column(DateTime, primary_key=True)
+    category = Column(String, primary_key=True)
+    created = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0)
+
+
+class ResolutionTimeHistogram(Base):
+    __tablename__ = "resolution_time_histogram"
+
+    # Log-scale histogram of time-to-resolution per resolution day, category and assignee;
+    # `bucket` indexes the duration range (see app/services/analytics_service.py)
+    day = Column(DateTime, primary_key=True)
+    category = Column(String, primary_key=True)
+    assignee = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
 
 # -------------------- Database Setup --------------------
 
 # Create the SQLAlchemy database engine using settings
-engine = create_engine(settings.database_url, echo=False)
+engine = create_db_engine(settings.database_url)
+
+# Engine for read-heavy queries (analytics, ticket listings); the primary unless a replica is configured
+read_engine = create_db_engine(settings.database_read_url, read_only=True) if settings.database_read_url else engine
 
-# Create a session factory to generate DB sessions
+# Create session factories to generate DB sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 # Create all defined tables in the database
 Base.metadata.create_all(bind=engine)
@@ -148,6 +213,34 @@ def init_default_users():
 init_default_users()
 
 
+# -------------------- Counter Helpers --------------------
+
+def upsert_increment(db: Session, model, keys: Dict[str, Any], **deltas: int):
+    """
+    Add `deltas` to the counter columns of the row of `model` identified by `keys`
+    (its primary key), creating the row if needed, inside the caller's transaction.
+
+    Uses a single atomic INSERT ... ON CONFLICT DO UPDATE on SQLite and PostgreSQL,
+    and update-then-insert elsewhere.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        statement = insert(model).values(**keys, **deltas)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={column: getattr(model, column) + delta for column, delta in deltas.items()}
+        ))
+        return
+
+    updated = db.query(model).filter_by(**keys).update(
+        {getattr(model, column): getattr(model, column) + delta for column, delta in deltas.items()},
+        synchronize_session=False
+    )
+    if not updated:
+        db.add(model(**keys, **deltas))
+
+
 # -------------------- FastAPI Dependency --------------------
 
 def get_db() -> Session:
@@ -160,3 +253,15 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Session:
+    """
+    Like `get_db`, but the session is bound to the read engine (replica when configured).
+    Use only for queries that do not write.
+    """
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,71 @@
+# Engine factory shared by the application and the migrations
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+
+# Import application settings (pool sizing, SQLite PRAGMAs)
+from app.utils.config import settings
+
+# Typing for the engine helpers
+from typing import Any, Dict, Optional
+
+# Nothing here touches a database on import; app.models.database builds the
+# application's engines, tables and default users from these helpers.
+
+
+def sqlite_pragmas(read_only: bool = False) -> Dict[str, Any]:
+    """
+    PRAGMAs applied to every new SQLite connection, taken from settings.
+    Read-only connections skip journal_mode, which they are not allowed to change.
+    """
+    pragmas = {
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": settings.sqlite_cache_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms
+    }
+    if not read_only:
+        pragmas = {"journal_mode": settings.sqlite_journal_mode, **pragmas}
+    return pragmas
+
+
+def create_db_engine(url: str, read_only: bool = False,
+                     pragmas: Optional[Dict[str, Any]] = None) -> Engine:
+    """
+    Create an engine with the production profile from settings.
+
+    Args:
+        url (str): Database URL.
+        read_only (bool): True for replica/analytics engines (SQLite: no journal_mode change).
+        pragmas (Optional[Dict[str, Any]]): SQLite PRAGMAs to apply on connect; defaults to
+                                            `sqlite_pragmas(read_only)`.
+
+    Process:
+        - File databases get a sized QueuePool (pool_size / max_overflow / pool_timeout).
+        - For SQLite, a connect listener applies the PRAGMAs to each new pooled connection.
+        - Other databases get pre-ping so stale pooled connections are replaced transparently.
+    """
+    options: Dict[str, Any] = {"echo": False}
+    is_sqlite = url.startswith("sqlite")
+    if not (is_sqlite and ":memory:" in url):
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout
+        )
+    if not is_sqlite:
+        options["pool_pre_ping"] = True
+
+    db_engine = create_engine(url, **options)
+
+    if is_sqlite:
+        pragmas = sqlite_pragmas(read_only) if pragmas is None else pragmas
+
+        @event.listens_for(db_engine, "connect")
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return db_engine
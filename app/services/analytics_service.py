@@ -0,0 +1,269 @@
+# Import necessary types and Utilities
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.database import (
+    Ticket, TicketHourlyStats, ResolutionTimeHistogram, get_db, get_read_db, upsert_increment
+)
+from app.utils.logger import logger
+
+# Resolution times are histogrammed in log-scale buckets: bucket b covers
+# [BASE**b, BASE**(b+1)) seconds. With BASE = 2**(1/4) each bucket spans ~19%,
+# so reported percentiles are within ~10% of the exact value.
+RESOLUTION_BUCKET_BASE = 2 ** 0.25
+
+# Supported bucket sizes for the time series
+INTERVALS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Upper bound on buckets per request (e.g. ~7 months of hourly data)
+MAX_BUCKETS = 5000
+
+PERCENTILES = (50, 90, 99)
+
+
+def hour_of(timestamp: datetime) -> datetime:
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def day_of(timestamp: datetime) -> datetime:
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def resolution_bucket(seconds: float) -> int:
+    """
+    Histogram bucket for a resolution time in seconds (anything under a second is bucket 0).
+    """
+    return 0 if seconds < 1 else int(math.log(seconds, RESOLUTION_BUCKET_BASE))
+
+
+def bucket_seconds(bucket: int) -> float:
+    """
+    Representative duration of a bucket: the geometric midpoint of its range.
+    """
+    return RESOLUTION_BUCKET_BASE ** (bucket + 0.5)
+
+
+class AnalyticsService:
+    def __init__(self):
+        """
+        Maintain and query the analytics rollup tables.
+
+        Rollups (kept in the same transaction as every ticket write, via TicketService):
+            - ticket_hourly_stats: tickets created and resolved per hour and category.
+            - resolution_time_histogram: log-scale histogram of time-to-resolution per
+              resolution day, category and assignee.
+
+        Both reflect the current state of the tickets table, so `rebuild_rollups` can
+        recreate them from scratch and produce identical rows.
+        """
+        pass
+
+    @staticmethod
+    def _is_resolved(ticket: Ticket) -> bool:
+        return ((ticket.status or "").lower() == "resolved"
+                and ticket.resolved_at is not None and ticket.created_at is not None)
+
+    def record_created(self, db: Session, ticket: Ticket):
+        """
+        Count a newly created ticket in its creation hour (caller's transaction).
+        """
+        upsert_increment(db, TicketHourlyStats,
+                         {"hour": hour_of(ticket.created_at), "category": ticket.category}, created=1)
+
+    def record_resolution(self, db: Session, ticket: Ticket, sign: int):
+        """
+        Add (sign=1) or remove (sign=-1) a resolved ticket's contribution to the rollups.
+        Does nothing if the ticket is not resolved.
+
+        TicketService calls this with -1 before changing a ticket and +1 afterwards, so
+        reopening, re-resolving and reassignment all keep the rollups exact.
+        """
+        if not self._is_resolved(ticket):
+            return
+        upsert_increment(db, TicketHourlyStats,
+                         {"hour": hour_of(ticket.resolved_at), "category": ticket.category}, resolved=sign)
+        seconds = (ticket.resolved_at - ticket.created_at).total_seconds()
+        upsert_increment(db, ResolutionTimeHistogram, {
+            "day": day_of(ticket.resolved_at),
+            "category": ticket.category,
+            "assignee": ticket.assigned_to or "unassigned",
+            "bucket": resolution_bucket(seconds)
+        }, count=sign)
+
+    def rebuild_rollups(self, db: Session):
+        """
+        Recreate both rollup tables from the tickets table (caller commits).
+
+        Streams tickets in chunks and aggregates in memory; memory use is bounded by
+        the number of rollup rows, not the number of tickets.
+        """
+        hourly: Dict[tuple, List[int]] = {}
+        histogram: Dict[tuple, int] = {}
+
+        rows = db.query(Ticket.category, Ticket.status, Ticket.assigned_to,
+                        Ticket.created_at, Ticket.resolved_at).yield_per(10000)
+        for category, status, assigned_to, created_at, resolved_at in rows:
+            if created_at is None:
+                continue
+            hourly.setdefault((hour_of(created_at), category), [0, 0])[0] += 1
+            if (status or "").lower() == "resolved" and resolved_at is not None:
+                hourly.setdefault((hour_of(resolved_at), category), [0, 0])[1] += 1
+                key = (day_of(resolved_at), category, assigned_to or "unassigned",
+                       resolution_bucket((resolved_at - created_at).total_seconds()))
+                histogram[key] = histogram.get(key, 0) + 1
+
+        db.query(TicketHourlyStats).delete()
+        db.query(ResolutionTimeHistogram).delete()
+        db.bulk_insert_mappings(TicketHourlyStats, [
+            {"hour": hour, "category": category, "created": created, "resolved": resolved}
+            for (hour, category), (created, resolved) in hourly.items()
+        ])
+        db.bulk_insert_mappings(ResolutionTimeHistogram, [
+            {"day": day, "category": category, "assignee": assignee, "bucket": bucket, "count": count}
+            for (day, category, assignee, bucket), count in histogram.items()
+        ])
+        logger.info(f"Rebuilt analytics rollups: {len(hourly)} hourly rows, {len(histogram)} histogram rows")
+
+    def ensure_rollups(self):
+        """
+        Build the rollups if they are empty but tickets exist (e.g. an older database).
+        """
+        db = next(get_db())
+        try:
+            if (db.query(TicketHourlyStats).first() is None
+                    and db.query(Ticket.id).first() is not None):
+                self.rebuild_rollups(db)
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error rebuilding analytics rollups: {e}")
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _percentiles(buckets: Dict[int, int]) -> Dict[str, Any]:
+        """
+        Approximate percentiles (in seconds) from a {bucket: count} histogram.
+        """
+        total = sum(buckets.values())
+        result: Dict[str, Any] = {"count": total}
+        ordered = sorted(buckets.items())
+        for p in PERCENTILES:
+            if total == 0:
+                result[f"p{p}_seconds"] = None
+                continue
+            rank = math.ceil(total * p / 100)
+            seen = 0
+            for bucket, count in ordered:
+                seen += count
+                if seen >= rank:
+                    result[f"p{p}_seconds"] = round(bucket_seconds(bucket), 1)
+                    break
+        return result
+
+    def get_timeseries(self, start: datetime, end: datetime, interval: str = "hour",
+                       category: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Created/resolved/open ticket counts per time bucket, plus resolution-time percentiles.
+
+        Args:
+            start (datetime): Range start (UTC); rounded down to the bucket boundary.
+            end (datetime): Range end (UTC, exclusive).
+            interval (str): "hour" or "day".
+            category (Optional[str]): Restrict everything to one category.
+
+        Returns:
+            Dict[str, Any]:
+                - buckets: [{start, created, resolved, open}] for every bucket in the range
+                  (`open` = tickets created but not yet resolved at the end of the bucket)
+                - resolution_time: {overall, by_category, by_assignee}, each with count and
+                  p50/p90/p99 in seconds, for tickets resolved within the range (day granularity)
+
+        Raises:
+            ValueError: For an unknown interval, an empty range or too many buckets.
+
+        Notes:
+            - Reads only the rollup tables, never the tickets table, so the cost depends on
+              the length of the range, not the number of tickets.
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported interval: {interval}")
+        step = INTERVALS[interval]
+        truncate = hour_of if interval == "hour" else day_of
+        start = truncate(start)
+        if end <= start:
+            raise ValueError("end must be after start")
+        n_buckets = math.ceil((end - start) / step)
+        if n_buckets > MAX_BUCKETS:
+            raise ValueError(f"Range covers {n_buckets} {interval} buckets; the maximum is {MAX_BUCKETS}")
+
+        db = next(get_read_db())  # Analytics query; may be served by a replica
+        try:
+            hourly = db.query(TicketHourlyStats.hour, TicketHourlyStats.created, TicketHourlyStats.resolved)
+            histogram = db.query(ResolutionTimeHistogram.category, ResolutionTimeHistogram.assignee,
+                                 ResolutionTimeHistogram.bucket, ResolutionTimeHistogram.count)
+            before = db.query(func.coalesce(func.sum(TicketHourlyStats.created), 0),
+                              func.coalesce(func.sum(TicketHourlyStats.resolved), 0))
+            if category is not None:
+                hourly = hourly.filter(TicketHourlyStats.category == category)
+                histogram = histogram.filter(ResolutionTimeHistogram.category == category)
+                before = before.filter(TicketHourlyStats.category == category)
+
+            # Tickets still open when the range starts
+            created_before, resolved_before = before.filter(TicketHourlyStats.hour < start).one()
+            hourly_rows = hourly.filter(TicketHourlyStats.hour >= start, TicketHourlyStats.hour < end).all()
+            histogram_rows = histogram.filter(ResolutionTimeHistogram.day >= day_of(start),
+                                              ResolutionTimeHistogram.day < end).all()
+        finally:
+            db.close()
+
+        # Fold hourly rows (all categories) into the requested buckets
+        totals: Dict[datetime, List[int]] = {}
+        for hour, created, resolved in hourly_rows:
+            bucket = totals.setdefault(truncate(hour), [0, 0])
+            bucket[0] += created
+            bucket[1] += resolved
+
+        series = []
+        open_tickets = created_before - resolved_before
+        for i in range(n_buckets):
+            bucket_start = start + i * step
+            created, resolved = totals.get(bucket_start, (0, 0))
+            open_tickets += created - resolved
+            series.append({
+                "start": bucket_start.isoformat(),
+                "created": created,
+                "resolved": resolved,
+                "open": open_tickets
+            })
+
+        # Merge histogram rows per category, per assignee and overall
+        overall: Dict[int, int] = {}
+        by_category: Dict[str, Dict[int, int]] = {}
+        by_assignee: Dict[str, Dict[int, int]] = {}
+        for row_category, assignee, bucket, count in histogram_rows:
+            for histogram_counts in (overall,
+                                     by_category.setdefault(row_category, {}),
+                                     by_assignee.setdefault(assignee, {})):
+                histogram_counts[bucket] = histogram_counts.get(bucket, 0) + count
+
+        return {
+            "interval": interval,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "category": category,
+            "buckets": series,
+            "resolution_time": {
+                "overall": self._percentiles(overall),
+                "by_category": {name: self._percentiles(h) for name, h in sorted(by_category.items())},
+                "by_assignee": {name: self._percentiles(h) for name, h in sorted(by_assignee.items())}
+            }
+        }
+
+
+# Singleton instance used by TicketService and the API
+analytics_service = AnalyticsService()
@@ -12,7 +12,12 @@ import jwt
 import hashlib
 
 # Typing for clarity
-from typing import Optional
+from typing import Any, Dict, Optional
+
+# Bounded caches for decoded tokens and user records
+import time
+from app.utils.cache import TTLCache
+from app.utils.config import settings
 
 
 # ------------- JWT Configuration -------------
@@ -23,9 +28,26 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30  # Token validity duration
 
 # ------------- AuthService Class -------------
 class AuthService:
-    
-    @staticmethod
-    def authenticate_user(username: str, password: str) -> Optional[dict]:
+
+    def __init__(self, cache_ttl_seconds: float, user_cache_size: int, token_cache_size: int):
+        """
+        Authentication helpers with in-process caches, so the common authenticated
+        request needs no JWT decode and no database round-trip.
+
+        Caches:
+            - users: username -> detached User record (TTL `cache_ttl_seconds`).
+              Invalidated on login, deactivation and role changes made through this service.
+            - tokens: token -> decoded payload, valid until the sooner of the TTL and the
+              token's own expiry. Only valid tokens are cached.
+
+        Notes:
+            - Each API worker has its own caches, so a change made by another process
+              (or directly in the database) is seen within `cache_ttl_seconds`.
+        """
+        self._user_cache = TTLCache(max_size=user_cache_size, ttl_seconds=cache_ttl_seconds)
+        self._token_cache = TTLCache(max_size=token_cache_size, ttl_seconds=cache_ttl_seconds)
+
+    def authenticate_user(self, username: str, password: str) -> Optional[dict]:
         """
         Authenticates the user by verifying the username and hashed password.
 
@@ -40,6 +62,7 @@ class AuthService:
                 # Update last login timestamp
                 user.last_login = datetime.utcnow()
                 db.commit()
+                self.invalidate_user(username)  # Cached record has the old last_login
                 
                 # Return selected user info (avoid returning full SQLAlchemy object)
                 return {
@@ -74,35 +97,102 @@ class AuthService:
         }
         return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-    @staticmethod
-    def verify_token(token: str) -> Optional[dict]:
+    def verify_token(self, token: str) -> Optional[dict]:
         """
-        Validates and decodes a JWT token.
+        Validates and decodes a JWT token (decoded payloads are cached until they expire).
 
         Returns:
             dict: Payload if valid
             None: If token is invalid or expired
         """
+        payload = self._token_cache.get(token)
+        if payload is not None:
+            return payload
         try:
             payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             username: str = payload.get("sub")
             if username is None:
                 return None
-            return payload
         except jwt.PyJWTError:
             return None
 
-    @staticmethod
-    def get_user_by_username(username: str) -> Optional[User]:
+        # Never serve a cached payload past the token's own expiry
+        ttl = self._token_cache.ttl_seconds
+        if payload.get("exp") is not None:
+            ttl = min(ttl, payload["exp"] - time.time())
+        if ttl > 0:
+            self._token_cache.set(token, payload, ttl_seconds=ttl)
+        return payload
+
+    def get_cached_user(self, username: str) -> Optional[User]:
+        """
+        Return the cached user record, or None on a miss. Never touches the database,
+        so it is safe to call from the event loop.
+        """
+        return self._user_cache.get(username)
+
+    def get_user_by_username(self, username: str) -> Optional[User]:
         """
         Fetch user from the database using their username.
         Useful for token validation and role checks.
+
+        The returned (detached) record is cached for `get_cached_user`.
+        """
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.username == username).first()
+            if user is not None:
+                self._user_cache.set(username, user)
+            return user
+        finally:
+            db.close()
+
+    def deactivate_user(self, username: str) -> bool:
+        """
+        Mark a user inactive; their existing tokens stop working immediately.
+
+        Returns:
+            bool: True if the user exists.
+        """
+        return self._update_user(username, is_active=False)
+
+    def set_user_role(self, username: str, role: str) -> bool:
         """
+        Change a user's role ('user' or 'support-engineer'); takes effect on their next request.
+
+        Returns:
+            bool: True if the user exists.
+        """
+        return self._update_user(username, role=role)
+
+    def _update_user(self, username: str, **fields) -> bool:
         db = SessionLocal()
         try:
-            return db.query(User).filter(User.username == username).first()
+            user = db.query(User).filter(User.username == username).first()
+            if user is None:
+                return False
+            for name, value in fields.items():
+                setattr(user, name, value)
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
         finally:
             db.close()
+            self.invalidate_user(username)
+
+    def invalidate_user(self, username: str):
+        """
+        Drop a user's cached record so the next request reloads it from the database.
+        """
+        self._user_cache.delete(username)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters for the user and token caches.
+        """
+        return {"users": self._user_cache.get_stats(), "tokens": self._token_cache.get_stats()}
 
     @staticmethod
     def is_support_engineer(user: User) -> bool:
@@ -114,4 +204,8 @@ class AuthService:
 
 
 # Singleton instance of AuthService
-auth_service = AuthService()
+auth_service = AuthService(
+    cache_ttl_seconds=settings.auth_cache_ttl_seconds,
+    user_cache_size=settings.auth_user_cache_size,
+    token_cache_size=settings.auth_token_cache_size
+)
@@ -0,0 +1,156 @@
+# Import necessary types and Utilities
+
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.services.ticket_service import ticket_service
+from app.utils.config import settings
+from app.utils.db_executor import run_db
+from app.utils.logger import logger
+
+
+class ChatLogWriter:
+    def __init__(self, batch_size: int, flush_interval_ms: int, max_queue_size: int,
+                 overflow_policy: str = "block"):
+        """
+        Write-behind logger for chat log rows.
+
+        Agent nodes hand rows to an in-memory queue and return immediately; a background
+        task writes them in batches, one transaction per batch, so no disk commit sits on
+        the critical path of a chat turn.
+
+        Args:
+            batch_size (int): Flush as soon as this many rows are waiting.
+            flush_interval_ms (int): Flush rows no later than this long after the first one arrived.
+            max_queue_size (int): Maximum rows waiting to be written.
+            overflow_policy (str): What `log` does when the queue is full:
+                                   "block" waits for space (backpressure on the chat turn),
+                                   "drop" discards the row and counts it.
+
+        Lifecycle:
+            - `start()` on application startup launches the background flusher.
+            - `stop()` on shutdown flushes every queued row before returning.
+            - When not started (scripts, tests), `log` writes the row directly.
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.overflow_policy = overflow_policy
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"enqueued": 0, "written": 0, "batches": 0, "dropped": 0, "failed": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """
+        Start the background flusher on the running event loop.
+        """
+        if self.is_running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Chat log writer started (batch {self.batch_size}, "
+                    f"interval {self.flush_interval * 1000:.0f}ms, queue {self.max_queue_size})")
+
+    async def stop(self):
+        """
+        Stop accepting rows and wait until everything already queued has been written.
+        """
+        if not self.is_running:
+            return
+        task, self._task = self._task, None  # New rows now take the direct-write path
+        await self._queue.put(None)  # Sentinel: everything queued before it is flushed first
+        await task
+
+        # Rows from producers that were still waiting for queue space when the sentinel went in
+        leftovers = []
+        while not self._queue.empty():
+            leftovers.append(self._queue.get_nowait())
+        if leftovers:
+            await self._flush(leftovers)
+        logger.info("Chat log writer stopped")
+
+    async def log(self, session_id: str, user_message: str, agent_response: str,
+                  agent_type: str, ticket_id: int = None):
+        """
+        Record one chat interaction (same arguments as `TicketService.log_chat`).
+        """
+        if not self.is_running:
+            await run_db(ticket_service.log_chat, session_id, user_message, agent_response, agent_type, ticket_id)
+            return
+
+        row = {
+            "session_id": session_id,
+            "user_message": user_message,
+            "agent_response": agent_response,
+            "agent_type": agent_type,
+            "ticket_id": ticket_id,
+            "created_at": datetime.utcnow()  # Time of the turn, not of the flush
+        }
+
+        if self.overflow_policy == "drop":
+            try:
+                self._queue.put_nowait(row)
+            except asyncio.QueueFull:
+                self.stats["dropped"] += 1
+                logger.warning(f"Chat log queue full, dropped log for session {session_id}")
+                return
+        else:
+            await self._queue.put(row)
+        self.stats["enqueued"] += 1
+
+    async def _run(self):
+        """
+        Collect rows into batches of up to `batch_size`, waiting at most `flush_interval`
+        after the first row of a batch, and write each batch in one transaction.
+        """
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            row = await self._queue.get()
+            if row is None:
+                break
+
+            batch = [row]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        try:
+            await run_db(ticket_service.log_chats, batch)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.error(f"Failed to write {len(batch)} chat logs: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return write counters and the current queue depth.
+        """
+        return {**self.stats, "queued": self._queue.qsize() if self.is_running else 0}
+
+
+# Singleton instance used by the workflow; started and stopped with the API
+chat_log_writer = ChatLogWriter(
+    batch_size=settings.chat_log_batch_size,
+    flush_interval_ms=settings.chat_log_flush_interval_ms,
+    max_queue_size=settings.chat_log_queue_size,
+    overflow_policy=settings.chat_log_overflow_policy
+)
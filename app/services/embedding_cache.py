@@ -0,0 +1,241 @@
+# Import necessary types and Utilities
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Dict, Tuple
+from app.utils.db_executor import run_db
+from app.utils.logger import logger
+
+
+class EmbeddingCache:
+    def __init__(self, path: Optional[str], max_memory_entries: int = 10000,
+                 write_batch_size: int = 64, write_interval: float = 5.0):
+        """
+        Initialize a two-tier, content-addressed embedding cache.
+
+        Args:
+            path (Optional[str]): SQLite file for the persistent tier. If None, only the
+                                  in-memory tier is used.
+            max_memory_entries (int): Number of vectors kept in the in-memory LRU tier.
+            write_batch_size (int): New vectors buffered before they are written to disk
+                                    in one transaction.
+            write_interval (float): Seconds after which buffered vectors are written even
+                                    if the batch is not full.
+
+        Layout:
+            - Memory tier: OrderedDict used as an LRU (most recently used at the end).
+            - Disk tier: SQLite table of float32 blobs keyed by the same hash, so
+              embeddings survive restarts and are shared between API workers.
+
+        Notes:
+            - Async callers use `aget`, `aget_many` and `aput_many`: memory hits are served
+              inline, while disk reads and writes run in the DB thread pool (`run_db`) so
+              SQLite I/O never blocks the event loop.
+            - Writes are buffered and committed in batches; buffered vectors are served
+              from memory until then. Call `flush` on shutdown to write what is left.
+        """
+        self.max_memory_entries = max_memory_entries
+        self.write_batch_size = max(write_batch_size, 1)
+        self.write_interval = write_interval
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._pending: Dict[str, Tuple[str, List[float]]] = {}  # key -> (model, vector) not yet on disk
+        self._pending_since = 0.0
+        self._lock = threading.Lock()  # Guards the memory tier, the write buffer and the stats
+        self._db_lock = threading.Lock()  # Serializes use of the SQLite connection across threads
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "disk_writes": 0}
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """
+        Build the cache key from the model name and a normalized form of the text.
+
+        Normalization lowercases the text and collapses whitespace so trivial
+        variations ("Printer  not working" vs "printer not working") share one entry.
+        """
+        normalized = " ".join(text.lower().split())
+        return hashlib.sha256(f"{model}\x00{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding, checking memory first and then disk (blocking; from
+        async code use `aget`).
+
+        Returns:
+            Optional[List[float]]: The cached vector, or None on a miss.
+        """
+        key = self.make_key(model, text)
+        vector = self._memory_get(key)
+        if vector is not None or self._conn is None:
+            return self._count(vector, "memory_hits")
+        return self._count(self._disk_get([key]).get(key), "disk_hits")
+
+    async def aget(self, model: str, text: str) -> Optional[List[float]]:
+        """
+        Look up a cached embedding without blocking the event loop: memory is checked
+        inline, disk in the DB thread pool.
+        """
+        return (await self.aget_many(model, [text]))[0]
+
+    async def aget_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Look up several embeddings at once; disk lookups for all memory misses share one
+        query in the DB thread pool.
+
+        Returns:
+            List[Optional[List[float]]]: One cached vector (or None on a miss) per text, in order.
+        """
+        keys = [self.make_key(model, text) for text in texts]
+        vectors = [self._memory_get(key) for key in keys]
+        for vector in vectors:
+            if vector is not None:
+                self._count(vector, "memory_hits")
+
+        missing = [key for key, vector in zip(keys, vectors) if vector is None]
+        found = await run_db(self._disk_get, missing) if missing and self._conn is not None else {}
+        for i, key in enumerate(keys):
+            if vectors[i] is None:
+                vectors[i] = self._count(found.get(key), "disk_hits")
+        return vectors
+
+    def put(self, model: str, text: str, vector: List[float]):
+        """
+        Store an embedding in memory and buffer it for the disk tier. A full (or old)
+        buffer is written here, blocking; from async code use `aput_many`.
+        Empty vectors (failed generations) are ignored.
+        """
+        if self._buffer(model, [(text, vector)]):
+            self.flush()
+
+    async def aput_many(self, model: str, items: List[Tuple[str, List[float]]]):
+        """
+        Store (text, vector) pairs; a full (or old) write buffer is written in the DB thread pool.
+        """
+        if self._buffer(model, items):
+            await run_db(self.flush)
+
+    def flush(self):
+        """
+        Write every buffered embedding to disk in one transaction.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending or self._conn is None:
+            return
+        rows = [(key, model, len(vector), array("f", vector).tobytes(), time.time())
+                for key, (model, vector) in pending.items()]
+        try:
+            with self._db_lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            with self._lock:
+                self.stats["disk_writes"] += 1
+        except sqlite3.Error as e:
+            # The disk tier is an optimization only; never fail the caller
+            logger.error(f"Error writing {len(rows)} embeddings to the cache: {e}")
+
+    def _memory_get(self, key: str) -> Optional[List[float]]:
+        """
+        Vector from the memory tier or the write buffer, or None.
+        """
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)  # Mark as most recently used
+                return vector
+            pending = self._pending.get(key)
+            return pending[1] if pending is not None else None
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Read vectors from the disk tier and promote them to the memory tier (blocking).
+        """
+        found = {}
+        try:
+            with self._db_lock:
+                for start in range(0, len(keys), 500):  # Stay below SQLite's bound-parameter limit
+                    chunk = keys[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    found.update((key, array("f", blob).tolist()) for key, blob in rows)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading embedding cache: {e}")
+        with self._lock:
+            for key, vector in found.items():
+                self._remember(key, vector)
+        return found
+
+    def _count(self, vector: Optional[List[float]], hit: str) -> Optional[List[float]]:
+        """
+        Count a lookup as a `hit` (or a miss if `vector` is None) and return the vector.
+        """
+        with self._lock:
+            self.stats[hit if vector is not None else "misses"] += 1
+        return vector
+
+    def _buffer(self, model: str, items: List[Tuple[str, List[float]]]) -> bool:
+        """
+        Add vectors to the memory tier and the write buffer. Returns True when the buffer
+        should be written now (full, or holding vectors older than `write_interval`).
+        """
+        now = time.monotonic()
+        with self._lock:
+            for text, vector in items:
+                if not vector:
+                    continue
+                key = self.make_key(model, text)
+                self._remember(key, list(vector))
+                if self._conn is not None:
+                    if not self._pending:
+                        self._pending_since = now
+                    self._pending[key] = (model, list(vector))
+            return bool(self._pending) and (len(self._pending) >= self.write_batch_size
+                                            or now - self._pending_since >= self.write_interval)
+
+    def _remember(self, key: str, vector: List[float]):
+        """
+        Insert into the memory tier, evicting the least recently used entries if full.
+        Caller must hold the lock.
+        """
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Return hit/miss counters plus the overall hit rate and memory tier size.
+        """
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "pending_writes": len(self._pending),
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
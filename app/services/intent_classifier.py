@@ -0,0 +1,158 @@
+# Import necessary types and Utilities
+
+import json
+import math
+import re
+import numpy as np
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from app.utils.logger import logger
+
+# Categories the helpdesk routes on (same set the LLM classifier uses)
+CATEGORIES = ["IT_HARDWARE", "IT_SOFTWARE", "HR", "ACCOUNTING", "GENERAL"]
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens plus adjacent-word bigrams ("not working" carries more signal than either word).
+    """
+    words = _TOKEN_PATTERN.findall(text.lower())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class LocalIntentClassifier:
+    def __init__(self):
+        """
+        A lightweight TF-IDF + multinomial logistic regression intent classifier.
+
+        It runs in-process in well under a millisecond, so the helpdesk can route
+        clear-cut messages without a round-trip to the LLM. The model is untrained
+        until `fit` or `load` is called; `predict` returns None in that state.
+        """
+        self.vocabulary: Dict[str, int] = {}
+        self.idf: Optional[np.ndarray] = None
+        self.weights: Optional[np.ndarray] = None  # Shape (n_features, n_classes)
+        self.bias: Optional[np.ndarray] = None     # Shape (n_classes,)
+        self.classes: List[str] = []
+
+    @property
+    def is_trained(self) -> bool:
+        return self.weights is not None
+
+    def _vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Convert text to a sparse L2-normalized TF-IDF vector as (feature indices, values).
+        """
+        counts = Counter(t for t in tokenize(text) if t in self.vocabulary)
+        if not counts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        indices = np.fromiter((self.vocabulary[t] for t in counts), dtype=np.int64, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[indices]
+        values /= np.linalg.norm(values)
+        return indices, values
+
+    def fit(self, texts: List[str], labels: List[str],
+            max_features: int = 2000, min_df: int = 1,
+            epochs: int = 300, learning_rate: float = 1.0, l2: float = 1e-4):
+        """
+        Train the classifier with full-batch gradient descent on the softmax loss.
+
+        Args:
+            texts (List[str]): Training messages.
+            labels (List[str]): Category label for each message.
+            max_features (int): Vocabulary size cap (most frequent terms are kept).
+            min_df (int): Minimum number of messages a term must appear in.
+            epochs (int): Gradient descent iterations.
+            learning_rate (float): Step size.
+            l2 (float): L2 regularization strength.
+        """
+        self.classes = sorted(set(labels))
+        tokenized = [set(tokenize(text)) for text in texts]
+
+        # Build the vocabulary from document frequencies
+        document_frequency = Counter(t for tokens in tokenized for t in tokens)
+        terms = [t for t, df in document_frequency.most_common() if df >= min_df][:max_features]
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        n_docs = len(texts)
+        self.idf = np.array(
+            [math.log((1 + n_docs) / (1 + document_frequency[t])) + 1 for t in terms],
+            dtype=np.float32
+        )
+
+        # Dense design matrix is fine at helpdesk scale (thousands of messages x a few thousand terms)
+        X = np.zeros((n_docs, len(terms)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            indices, values = self._vectorize(text)
+            X[row, indices] = values
+        class_index = {c: i for i, c in enumerate(self.classes)}
+        Y = np.zeros((n_docs, len(self.classes)), dtype=np.float32)
+        Y[np.arange(n_docs), [class_index[label] for label in labels]] = 1.0
+
+        self.weights = np.zeros((len(terms), len(self.classes)), dtype=np.float32)
+        self.bias = np.zeros(len(self.classes), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = self._softmax(X @ self.weights + self.bias)
+            error = (probabilities - Y) / n_docs
+            self.weights -= learning_rate * (X.T @ error + l2 * self.weights)
+            self.bias -= learning_rate * error.sum(axis=0)
+
+        logger.info(f"Trained local intent classifier on {n_docs} messages, {len(terms)} features")
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def predict(self, message: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify a message.
+
+        Returns:
+            Optional[Dict[str, Any]]: {'category', 'confidence'} in the same shape as
+            `OllamaService.classify_intent`, or None if the model is untrained or the
+            message shares no vocabulary with the training data.
+        """
+        if not self.is_trained:
+            return None
+        indices, values = self._vectorize(message)
+        if len(indices) == 0:
+            return None
+        probabilities = self._softmax(values @ self.weights[indices] + self.bias)
+        best = int(np.argmax(probabilities))
+        return {"category": self.classes[best], "confidence": float(probabilities[best])}
+
+    def save(self, path: str):
+        """
+        Persist the trained model as JSON.
+        """
+        Path(path).write_text(json.dumps({
+            "classes": self.classes,
+            "vocabulary": self.vocabulary,
+            "idf": self.idf.tolist(),
+            "weights": self.weights.tolist(),
+            "bias": self.bias.tolist()
+        }))
+
+    def load(self, path: str) -> bool:
+        """
+        Load a model saved by `save`. Returns False (and stays untrained) if the file is missing or invalid.
+        """
+        try:
+            data = json.loads(Path(path).read_text())
+            self.classes = data["classes"]
+            self.vocabulary = data["vocabulary"]
+            self.idf = np.array(data["idf"], dtype=np.float32)
+            self.weights = np.array(data["weights"], dtype=np.float32)
+            self.bias = np.array(data["bias"], dtype=np.float32)
+            logger.info(f"Loaded local intent classifier from {path}")
+            return True
+        except FileNotFoundError:
+            return False
+        except (ValueError, KeyError) as e:
+            logger.error(f"Invalid intent model at {path}: {e}")
+            self.weights = None
+            return False
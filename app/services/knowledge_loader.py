@@ -0,0 +1,140 @@
+# Import necessary types and Utilities
+
+import csv
+import json
+import yaml
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+from app.utils.logger import logger
+
+# File types understood by the knowledge-base ingest pipeline
+SUPPORTED_SUFFIXES = {".md", ".markdown", ".jsonl", ".csv"}
+
+# Category of entries that name none, given no default and no parent directory to take it from
+FALLBACK_CATEGORY = "GENERAL"
+
+
+def iter_knowledge_entries(paths: Iterable[str], default_category: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream knowledge entries from files and directories, one entry at a time.
+
+    Args:
+        paths (Iterable[str]): Files or directories to read. Directories are walked
+                               recursively in sorted order so runs are reproducible.
+        default_category (str, optional): Category used when an entry does not specify one.
+                                          If omitted, the parent directory name is used
+                                          (FALLBACK_CATEGORY for files without one).
+
+    Yields:
+        Dict: Entries with 'question', 'answer', 'category' and 'metadata' keys.
+
+    Supported formats:
+        - Markdown: one article per file. Optional YAML front matter may set
+          'question' and 'category'; otherwise the first '# heading' (or file name)
+          is the question and the remaining body is the answer.
+        - JSONL: one JSON object per line with 'question', 'answer' and optional 'category'.
+        - CSV: header row with 'question', 'answer' and optional 'category' columns.
+
+    Files that cannot be read or parsed are logged and skipped, as are JSONL lines that are
+    not JSON objects; values that are not strings (e.g. a numeric category) are converted.
+    """
+    for path in paths:
+        root = Path(path)
+        files = sorted(p for p in root.rglob("*") if p.is_file()) if root.is_dir() else [root]
+        for file_path in files:
+            suffix = file_path.suffix.lower()
+            if suffix not in SUPPORTED_SUFFIXES:
+                continue
+            category = default_category or file_path.parent.name.upper() or FALLBACK_CATEGORY
+            try:
+                if suffix in (".md", ".markdown"):
+                    entry = _read_markdown(file_path, category)
+                    if entry:
+                        yield entry
+                elif suffix == ".jsonl":
+                    yield from _read_jsonl(file_path, category)
+                else:
+                    yield from _read_csv(file_path, category)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                # Skip unreadable files instead of aborting the whole ingest
+                logger.error(f"Skipping {file_path}: {e}")
+
+
+def _make_entry(question: str, answer: str, category: str, source: Path) -> Optional[Dict]:
+    """
+    Normalize a raw record into an entry, dropping records without a question or answer.
+    """
+    question = str(question if question is not None else "").strip()
+    answer = str(answer if answer is not None else "").strip()
+    if not question or not answer:
+        return None
+    return {
+        "question": question,
+        "answer": answer,
+        "category": str(category).strip().upper(),
+        "metadata": {"source": str(source)}
+    }
+
+
+def _read_markdown(file_path: Path, category: str) -> Optional[Dict]:
+    """
+    Parse a single Markdown article (with optional YAML front matter).
+    """
+    text = file_path.read_text(encoding="utf-8")
+    front_matter = {}
+    if text.startswith("---"):
+        parts = text.split("---", 2)
+        if len(parts) == 3:
+            loaded = yaml.safe_load(parts[1])
+            if isinstance(loaded, dict):
+                front_matter = loaded
+            elif loaded is not None:
+                logger.warning(f"{file_path}: ignoring front matter that is not a mapping")
+            text = parts[2]
+
+    question = front_matter.get("question")
+    lines = text.strip().splitlines()
+    if not question and lines and lines[0].startswith("#"):
+        question = lines[0].lstrip("#").strip()
+        lines = lines[1:]
+
+    return _make_entry(
+        question or file_path.stem.replace("_", " ").replace("-", " "),
+        "\n".join(lines),
+        front_matter.get("category") or category,
+        file_path
+    )
+
+
+def _read_jsonl(file_path: Path, category: str) -> Iterator[Dict]:
+    """
+    Stream entries from a JSON Lines file without loading it into memory.
+    """
+    with open(file_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping {file_path}:{line_number}: {e}")
+                continue
+            if not isinstance(record, dict):
+                logger.error(f"Skipping {file_path}:{line_number}: expected a JSON object")
+                continue
+            entry = _make_entry(record.get("question"), record.get("answer"),
+                                record.get("category") or category, file_path)
+            if entry:
+                yield entry
+
+
+def _read_csv(file_path: Path, category: str) -> Iterator[Dict]:
+    """
+    Stream entries from a CSV file with a header row.
+    """
+    with open(file_path, encoding="utf-8", newline="") as f:
+        for record in csv.DictReader(f):
+            entry = _make_entry(record.get("question"), record.get("answer"),
+                                record.get("category") or category, file_path)
+            if entry:
+                yield entry
@@ -0,0 +1,198 @@
+# Import necessary types and Utilities
+
+import math
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from app.utils.logger import logger
+
+# Function words ignored in queries and in scoring; on their own they say nothing about which article is meant
+STOPWORDS = frozenset("""
+    a an and are as at be but by can could do does for from have how i if in is it me my of on or our
+    should so that the this to was we what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lower-case alphanumeric terms, the way the FTS5 unicode61 tokenizer does.
+    """
+    return re.findall(r"[^\W_]+", (text or "").lower())
+
+
+def key_terms(text: str) -> List[str]:
+    """
+    Distinct terms of a text without stopwords, in order of appearance.
+    """
+    return list(dict.fromkeys(term for term in tokenize(text) if term not in STOPWORDS))
+
+
+class LexicalIndex:
+    def __init__(self, path: Optional[str]):
+        """
+        BM25 keyword index over knowledge-base questions and answers (SQLite FTS5).
+
+        Embedding similarity is weak on short, specific queries ("VPN error 809",
+        "form W-4"): the words that matter are exact tokens. This index finds entries
+        that contain them, ranked by BM25 with question matches weighted above answer matches.
+
+        Args:
+            path (Optional[str]): SQLite file for the index. If None, it is kept in memory.
+
+        Notes:
+            - Entries live in `kb_entries`; `kb_fts` is an external-content FTS5 table kept in
+              sync with it by triggers, and `kb_fts_vocab` exposes per-term document counts.
+            - Besides the BM25 rank, each hit gets a `lexical_score` in [0, 1] that can be
+              compared with cosine similarity (see `_coverage`).
+        """
+        self._conn = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS kb_entries (
+                id INTEGER PRIMARY KEY,
+                doc_id TEXT UNIQUE NOT NULL,
+                category TEXT NOT NULL,
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                document TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_kb_entries_category ON kb_entries (category);
+            CREATE VIRTUAL TABLE IF NOT EXISTS kb_fts USING fts5(
+                question, answer, content='kb_entries', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 0'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS kb_fts_vocab USING fts5vocab(kb_fts, 'row');
+            CREATE TRIGGER IF NOT EXISTS kb_entries_ai AFTER INSERT ON kb_entries BEGIN
+                INSERT INTO kb_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+            END;
+            CREATE TRIGGER IF NOT EXISTS kb_entries_ad AFTER DELETE ON kb_entries BEGIN
+                INSERT INTO kb_fts (kb_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+            END;
+            CREATE TRIGGER IF NOT EXISTS kb_entries_au AFTER UPDATE ON kb_entries BEGIN
+                INSERT INTO kb_fts (kb_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+                INSERT INTO kb_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+            END;
+        """)
+        self._conn.commit()
+
+    def count(self) -> int:
+        """
+        Number of indexed entries.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM kb_entries").fetchone()[0]
+
+    def upsert(self, ids: List[str], entries: List[Dict]):
+        """
+        Add or replace entries; each needs "category", "question", "answer" and "document".
+        """
+        rows = [(doc_id, entry.get("category", ""), entry.get("question", ""), entry.get("answer", ""),
+                 entry.get("document", "")) for doc_id, entry in zip(ids, entries)]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO kb_entries (doc_id, category, question, answer, document) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (doc_id) DO UPDATE SET category = excluded.category, question = excluded.question,
+                    answer = excluded.answer, document = excluded.document
+            """, rows)
+            self._conn.commit()
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Remove entries by ID (unknown IDs are ignored). Returns the number removed.
+        """
+        with self._lock:
+            removed = self._conn.executemany("DELETE FROM kb_entries WHERE doc_id = ?",
+                                             [(doc_id,) for doc_id in ids]).rowcount
+            self._conn.commit()
+        return removed
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM kb_entries")
+            self._conn.commit()
+
+    def search(self, query: str, category: Optional[str] = None, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Entries containing any of the query's terms (stopwords ignored), best BM25 first.
+
+        Args:
+            query (str): Free-text query; punctuation is ignored.
+            category (Optional[str]): Search only this category.
+            n_results (int): Maximum number of results.
+
+        Returns:
+            List[Dict[str, Any]]: Each with "id", "category", "question", "answer", "document",
+                                  "bm25" (lower is better) and "lexical_score" (0-1).
+        """
+        terms = key_terms(query)
+        if not terms or n_results <= 0:
+            return []
+        match = " OR ".join(f'"{term}"' for term in terms)
+        sql = """
+            SELECT e.doc_id, e.category, e.question, e.answer, e.document, bm25(kb_fts, 2.0, 1.0) AS score
+            FROM kb_fts JOIN kb_entries e ON e.id = kb_fts.rowid
+            WHERE kb_fts MATCH ?
+        """
+        params: List[Any] = [match]
+        if category:
+            sql += " AND e.category = ?"
+            params.append(category)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(n_results)
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+                if not rows:
+                    return []
+                vocabulary = set(terms).union(*(key_terms(row[2]) for row in rows))
+                idf = self._idf(vocabulary)
+        except sqlite3.Error as e:
+            logger.error(f"Error searching lexical index: {e}")
+            return []
+
+        return [{
+            "id": doc_id, "category": row_category, "question": question, "answer": answer,
+            "document": document, "bm25": score, "lexical_score": self._coverage(terms, key_terms(question), idf)
+        } for doc_id, row_category, question, answer, document, score in rows]
+
+    def _idf(self, terms: Iterable[str]) -> Dict[str, float]:
+        """
+        Inverse document frequency of each term (caller holds the lock). Terms that appear in
+        no entry get the highest weight.
+        """
+        terms = list(terms)
+        total = self._conn.execute("SELECT COUNT(*) FROM kb_entries").fetchone()[0]
+        placeholders = ",".join("?" * len(terms))
+        counts = dict(self._conn.execute(
+            f"SELECT term, doc FROM kb_fts_vocab WHERE term IN ({placeholders})", terms
+        ).fetchall())
+        return {term: math.log((total + 1) / (counts.get(term, 0) + 0.5)) for term in terms}
+
+    @staticmethod
+    def _coverage(query_terms: List[str], question_terms: List[str], idf: Dict[str, float]) -> float:
+        """
+        IDF-weighted overlap (Dice coefficient) between the query and an entry's question.
+
+        Stopwords are left out on both sides. 1.0 means the same distinctive words on both
+        sides; rare words dominate, so "VPN error 809" scores high against "How do I fix VPN
+        error 809?" while "VPN" alone, or a query sharing only common words, scores low.
+        """
+        query_set, question_set = set(query_terms), set(question_terms)
+        total = sum(idf[t] for t in query_set) + sum(idf[t] for t in question_set)
+        if total <= 0:
+            return 0.0
+        return 2 * sum(idf[t] for t in query_set & question_set) / total
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the number of indexed entries.
+        """
+        return {"entries": self.count()}
@@ -1,9 +1,19 @@
 # Import necessary types and Utilities
 
+import asyncio
+import hashlib
+import httpx
 import ollama
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Awaitable, Callable
+from app.services.embedding_cache import EmbeddingCache
 from app.utils.config import settings
+from app.utils.db_executor import run_db
 from app.utils.logger import logger
+from app.utils.singleflight import SingleFlight
+from app.utils.streaming import is_streaming, emit
+
+# Returned by generate_response when the model cannot be reached or times out
+FALLBACK_RESPONSE = "I apologize, but I'm having trouble processing your request right now."
 
 
 class OllamaService:
@@ -11,21 +21,83 @@ class OllamaService:
         """
         Initialize the OllamaService instance.
 
-        - Create an Ollama client configured with the base URL from the app settings.
-        - Set the model name to be used for all requests from the app settings.
+        - Create a non-blocking Ollama client configured with the base URL from the app settings.
+          The client sends every request through one pooled HTTP transport, created and owned
+          here so it can be closed on shutdown.
+        - Set the chat model and the (separate, much smaller) embedding model from the app settings.
+        - Create a semaphore that caps how many requests are in flight against Ollama at once.
+        - Open the content-addressed embedding cache so repeated texts skip Ollama entirely.
+        - Coalesce identical concurrent requests: callers asking for the same (model, prompt)
+          while that request is in flight share its result instead of sending their own.
         
-        This setup allows all subsequent calls to interact with the Ollama LLM API.
+        This setup allows all subsequent calls to interact with the Ollama LLM API
+        without blocking the event loop while a generation is running.
         """
-        self.client = ollama.Client(host=settings.ollama_base_url)
+        self.transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.ollama_max_connections,
+                max_keepalive_connections=settings.ollama_max_connections
+            )
+        )
+        self.client = ollama.AsyncClient(
+            host=settings.ollama_base_url,
+            timeout=httpx.Timeout(settings.ollama_timeout, connect=10.0),
+            transport=self.transport
+        )
         self.model = settings.ollama_model
+        self.embedding_model = settings.embedding_model
+        self.semaphore = asyncio.Semaphore(settings.ollama_max_concurrency)
+        self.embedding_cache = EmbeddingCache(
+            path=settings.embedding_cache_path or None,
+            max_memory_entries=settings.embedding_cache_memory_size,
+            write_batch_size=settings.embedding_cache_write_batch_size,
+            write_interval=settings.embedding_cache_write_interval
+        )
+        self.chat_flights = SingleFlight()
+        self.embedding_flights = SingleFlight()
+
+    def _flight_key(self, operation: str, text: str, model: str = None) -> tuple:
+        """
+        Single-flight key for a request: operation, model and a hash of the prompt/input text.
+        (Requests carry no per-call generation options yet; add them here when they do.)
+        """
+        return (operation, model or self.model, hashlib.sha256(text.encode("utf-8")).hexdigest())
+
+    async def _request(self, call: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        """
+        Run a single Ollama request under the concurrency limit and a per-call timeout.
+
+        Args:
+            call (Callable): Zero-argument function returning the client coroutine to await.
+            timeout (float): Maximum seconds to wait for the request to finish.
+
+        Returns:
+            Any: The raw response returned by the Ollama client.
+
+        Raises:
+            asyncio.TimeoutError: If the request does not finish within `timeout`.
+        """
+        async with self.semaphore:
+            return await asyncio.wait_for(call(), timeout=timeout)
+
+    async def aclose(self):
+        """
+        Write buffered embeddings to the cache and close the shared HTTP connection pool
+        (called on application shutdown).
+        """
+        await run_db(self.embedding_cache.flush)
+        await self.transport.aclose()
 
-    async def generate_response(self, prompt: str, context: str = "") -> str:
+    async def generate_response(self, prompt: str, context: str = "", stream_tokens: bool = True) -> str:
         """
         Generate a text response from the Ollama LLM based on the user's prompt.
         
         Args:
             prompt (str): The main user query or input message.
             context (str, optional): Additional conversation history or context to guide the response.
+            stream_tokens (bool, optional): When the current request is a streaming chat request,
+                publish each generated chunk as a "token" event. Internal prompts such as
+                classification pass False so their output never reaches the user.
         
         Returns:
             str: The generated response text from the model.
@@ -33,6 +105,7 @@ class OllamaService:
         Workflow:
         - If context is provided, combine it with the prompt, formatting to keep clarity.
         - Use the Ollama client's chat method to send a message with the combined prompt.
+        - For streaming requests, read the reply chunk by chunk and emit each one as it arrives.
         - Extract and return the content of the model's reply.
         
         Error Handling:
@@ -40,36 +113,84 @@ class OllamaService:
         - Return a polite error message if something goes wrong.
         
         Note:
-        - The method is asynchronous to fit into async web frameworks like FastAPI.
-        - Ollama client calls are currently synchronous; consider async wrappers if needed.
+        - The call is awaited on the async client, so other requests keep being served
+          while the model is generating.
+        - Requests beyond `ollama_max_concurrency` wait for a free slot.
+        - Identical prompts requested concurrently share one generation; a streaming caller
+          that joins another's generation receives the whole reply as a single token event.
         """
-        try:
-            # Prepare the complete prompt by combining context with user input if context exists
-            full_prompt = f"{context}\n\nUser Query: {prompt}" if context else prompt
+        # Prepare the complete prompt by combining context with user input if context exists
+        full_prompt = f"{context}\n\nUser Query: {prompt}" if context else prompt
+        messages = [{"role": "user", "content": full_prompt}]
+        streaming = stream_tokens and is_streaming()
+        started = []
 
-            # Call Ollama's chat API with the model and user message
-            response = self.client.chat(
-                model=self.model,
-                messages=[
-                    {"role": "user", "content": full_prompt}
-                ]
-            )
+        def generate() -> Awaitable[str]:
+            started.append(True)  # Only runs for the caller that actually sends the request
+            return self._generate(messages, streaming)
 
-            # Return the response content generated by the model
-            return response['message']['content']
+        try:
+            text = await self.chat_flights.do(self._flight_key("chat", full_prompt), generate)
+            if streaming and not started:
+                # Joined another caller's request: its tokens went to that caller's stream
+                emit("token", {"text": text})
+            return text
+        except asyncio.TimeoutError:
+            logger.error(f"Ollama generation timed out after {settings.ollama_timeout}s")
+            return FALLBACK_RESPONSE
         except Exception as e:
             # Log error details for debugging
             logger.error(f"Error generating response: {e}")
 
             # Return a fallback message to the user
-            return "I apologize, but I'm having trouble processing your request right now."
+            return FALLBACK_RESPONSE
+
+    async def _generate(self, messages: List[Dict[str, str]], streaming: bool) -> str:
+        """
+        Send one chat request to Ollama and return the reply text.
+        """
+        if streaming:
+            # Forward tokens to the client as soon as Ollama produces them
+            return await self._request(
+                lambda: self._stream_chat(messages),
+                timeout=settings.ollama_timeout
+            )
 
-    async def generate_embedding(self, text: str) -> List[float]:
+        # Call Ollama's chat API with the model and user message
+        response = await self._request(
+            lambda: self.client.chat(
+                model=self.model,
+                messages=messages
+            ),
+            timeout=settings.ollama_timeout
+        )
+
+        # Return the response content generated by the model
+        return response['message']['content']
+
+    async def _stream_chat(self, messages: List[Dict[str, str]]) -> str:
         """
-        Generate a vector embedding for a given text input using the Ollama model.
+        Run a streaming chat request, emitting each chunk as a "token" event.
+
+        Returns:
+            str: The full concatenated response once generation finishes.
+        """
+        chunks = []
+        async for part in await self.client.chat(model=self.model, messages=messages, stream=True):
+            token = part['message']['content']
+            if token:
+                chunks.append(token)
+                emit("token", {"text": token})
+        return "".join(chunks)
+
+    async def generate_embedding(self, text: str, model: str = None) -> List[float]:
+        """
+        Generate a vector embedding for a given text input using the embedding model.
         
         Args:
             text (str): The input text to convert into a numeric vector representation.
+            model (str, optional): Embedding model to use; defaults to `settings.embedding_model`.
+                                   The knowledge base passes the model its collection was built with.
         
         Returns:
             List[float]: A list of floats representing the embedding vector.
@@ -78,21 +199,28 @@ class OllamaService:
         - Embeddings are useful for semantic search, similarity matching, or clustering.
         
         Process:
-        - Send the input text to Ollama's embeddings API endpoint.
-        - Extract the embedding vector from the response.
+        - Return the vector from the embedding cache if this (model, text) was seen before.
+        - Otherwise send the input text to Ollama's /api/embed endpoint (joining an
+          identical request already in flight, if any).
+        - Extract the embedding vector from the response and store it in the cache.
         
         Error Handling:
         - Log any exceptions during the API call.
         - Return an empty list if embedding generation fails.
         """
+        model = model or self.embedding_model
+        cached = await self.embedding_cache.aget(model, text)
+        if cached is not None:
+            return cached
+
+        async def embed_one() -> List[float]:
+            return (await self._embed([text], model))[0]
+
         try:
-            # Request embedding vector from Ollama model
-            response = self.client.embeddings(
-                model=self.model,
-                prompt=text
-            )
-            # Return the embedding array from the response
-            return response['embedding']
+            return await self.embedding_flights.do(self._flight_key("embedding", text, model), embed_one)
+        except asyncio.TimeoutError:
+            logger.error(f"Ollama embedding timed out after {settings.ollama_embedding_timeout}s")
+            return []
         except Exception as e:
             # Log the error for troubleshooting
             logger.error(f"Error generating embedding: {e}")
@@ -100,6 +228,75 @@ class OllamaService:
             # Return empty embedding on failure
             return []
 
+    async def generate_embeddings(self, texts: List[str], model: str = None) -> List[List[float]]:
+        """
+        Embed many texts, sending them to Ollama in batches instead of one request per text.
+
+        Args:
+            texts (List[str]): Texts to embed.
+            model (str, optional): Embedding model to use; defaults to `settings.embedding_model`.
+
+        Returns:
+            List[List[float]]: One vector per input text, in order. A text whose batch
+                               failed gets an empty list, like `generate_embedding`.
+
+        Process:
+        - Serve texts already in the embedding cache without a request.
+        - Split the remaining (distinct) texts into batches of `settings.embedding_batch_size`
+          and send each batch as one /api/embed call; batches run concurrently within
+          the Ollama concurrency limit.
+        - Store every new vector in the embedding cache.
+        """
+        model = model or self.embedding_model
+        vectors: List[List[float]] = [[] for _ in texts]
+        missing: Dict[str, List[int]] = {}  # text -> positions still needing a vector
+        for i, (text, cached) in enumerate(zip(texts, await self.embedding_cache.aget_many(model, texts))):
+            if cached is not None:
+                vectors[i] = cached
+            else:
+                missing.setdefault(text, []).append(i)
+
+        pending = list(missing)
+        size = max(settings.embedding_batch_size, 1)
+        batches = [pending[start:start + size] for start in range(0, len(pending), size)]
+
+        async def embed_batch(batch: List[str]):
+            try:
+                for text, vector in zip(batch, await self._embed(batch, model)):
+                    for i in missing[text]:
+                        vectors[i] = vector
+            except asyncio.TimeoutError:
+                logger.error(f"Ollama batch embedding of {len(batch)} texts timed out "
+                             f"after {settings.ollama_embedding_timeout}s")
+            except Exception as e:
+                logger.error(f"Error generating {len(batch)} embeddings: {e}")
+
+        await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        return vectors
+
+    async def _embed(self, texts: List[str], model: str) -> List[List[float]]:
+        """
+        Request embeddings for a list of texts in one /api/embed call and cache them.
+        """
+        # Request embedding vectors from the Ollama embedding model
+        response = await self._request(
+            lambda: self.client.embed(
+                model=model,
+                input=texts
+            ),
+            timeout=settings.ollama_embedding_timeout
+        )
+        # Cache and return the embedding arrays from the response
+        embeddings = [list(vector) for vector in response['embeddings']]
+        await self.embedding_cache.aput_many(model, list(zip(texts, embeddings)))
+        return embeddings
+
+    def get_request_stats(self) -> Dict[str, Any]:
+        """
+        Return Ollama requests sent vs. calls coalesced into one already in flight.
+        """
+        return {"chat": self.chat_flights.get_stats(), "embeddings": self.embedding_flights.get_stats()}
+
     async def classify_intent(self, message: str) -> Dict[str, Any]:
         """
         Classify the intent of a user message into predefined categories using the LLM.
@@ -111,12 +308,14 @@ class OllamaService:
             Dict[str, Any]: Dictionary containing:
                 - 'category' (str): The predicted intent category.
                 - 'confidence' (float): The confidence score (0 to 1).
+                - 'fallback' (bool): True when the result is the default below rather
+                  than the model's answer, so callers can avoid treating it as a label.
         
         Workflow:
         - Construct a prompt instructing the model to classify the message.
         - Use the generate_response method to get the LLM's classification.
         - Parse the response, expecting the format: CATEGORY|CONFIDENCE.
-        - If parsing fails, default to 'GENERAL' with 0.5 confidence.
+        - If Ollama failed or parsing fails, default to 'GENERAL' with 0.5 confidence.
         
         Categories:
         - IT_HARDWARE: Issues with physical devices like printers, computers.
@@ -143,7 +342,11 @@ class OllamaService:
         """
 
         # Call the LLM to get the classification response
-        response = await self.generate_response(prompt)
+        response = await self.generate_response(prompt, stream_tokens=False)
+        fallback = {"category": "GENERAL", "confidence": 0.5, "fallback": True}
+        if response == FALLBACK_RESPONSE:
+            # Ollama was unreachable; the apology text is not a category
+            return fallback
 
         try:
             # Parse the LLM response by splitting on '|'
@@ -154,10 +357,10 @@ class OllamaService:
             confidence = float(parts[1].strip()) if len(parts) > 1 else 0.8
 
             # Return structured classification result
-            return {"category": category, "confidence": confidence}
+            return {"category": category, "confidence": confidence, "fallback": False}
         except:
             # In case of any parsing errors, fallback to GENERAL category with medium confidence
-            return {"category": "GENERAL", "confidence": 0.5}
+            return fallback
 
 
 # Create a singleton instance of the OllamaService for reuse across the app
@@ -0,0 +1,135 @@
+# Import necessary types and Utilities
+
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from app.services.llm_service import llm_service, FALLBACK_RESPONSE
+from app.utils.config import settings
+from app.utils.logger import logger
+
+
+class SemanticResponseCache:
+    def __init__(self, similarity_threshold: float, ttl_seconds: float, max_entries_per_category: int,
+                 enabled: bool = True):
+        """
+        Cache of generated answers looked up by meaning rather than exact text.
+
+        Each entry is (question embedding, answer). A new question reuses a cached answer
+        when its embedding's cosine similarity to a cached question in the same category
+        reaches `similarity_threshold`, so "How do I request vacation?" and "how can I
+        request vacation time" cost one LLM call between them.
+
+        Args:
+            similarity_threshold (float): Minimum cosine similarity for a hit (0-1). Keep it
+                                          high: a wrong hit returns an answer to a different question.
+            ttl_seconds (float): Entries expire this long after they were stored.
+            max_entries_per_category (int): Least recently used entries beyond this are evicted.
+            enabled (bool): When False, lookups always miss and nothing is stored.
+
+        Notes:
+            - Categories are namespaces chosen by the caller (e.g. "HR", "ACCOUNTING", "IT_DETAILS");
+              `invalidate` clears one of them or all.
+            - Question embeddings come from `llm_service.generate_embedding`, which has its own
+              cache, so embedding a message the knowledge-base search already embedded is free.
+            - The fallback apology returned when the LLM fails is never cached.
+            - Per process, in memory; runs on the event loop, so no locking is needed.
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries_per_category
+        self.enabled = enabled
+        # category -> OrderedDict(question -> (expires_at, unit embedding, answer)), LRU order
+        self._entries: Dict[str, "OrderedDict[str, Tuple[float, np.ndarray, str]]"] = {}
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    async def lookup(self, category: str, question: str) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a question similar enough to this one.
+
+        Args:
+            category (str): Cache namespace to search.
+            question (str): The user's question.
+
+        Returns:
+            Optional[Dict[str, Any]]: {"answer", "similarity", "question"} for the best live
+                                      match above the threshold, otherwise None.
+        """
+        entries = self._entries.get(category)
+        if not self.enabled or not entries:
+            self.stats["misses"] += 1
+            return None
+
+        # Drop expired entries before comparing
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _, _) in entries.items() if expires_at <= now]:
+            del entries[key]
+
+        query = self._unit(await llm_service.generate_embedding(question)) if entries else None
+        if query is None:
+            self.stats["misses"] += 1
+            return None
+
+        questions = list(entries.keys())
+        similarities = np.stack([entries[key][1] for key in questions]) @ query
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            self.stats["misses"] += 1
+            return None
+
+        entries.move_to_end(questions[best])
+        self.stats["hits"] += 1
+        return {"answer": entries[questions[best]][2], "similarity": float(similarities[best]),
+                "question": questions[best]}
+
+    async def store(self, category: str, question: str, answer: str):
+        """
+        Remember a generated answer for a question (skipped for LLM failure fallbacks).
+        """
+        if not self.enabled or not answer or answer == FALLBACK_RESPONSE:
+            return
+        vector = self._unit(await llm_service.generate_embedding(question))
+        if vector is None:
+            return
+
+        entries = self._entries.setdefault(category, OrderedDict())
+        entries[question] = (time.monotonic() + self.ttl_seconds, vector, answer)
+        entries.move_to_end(question)
+        self.stats["stores"] += 1
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, category: Optional[str] = None) -> int:
+        """
+        Remove every cached answer in a category (or in all categories when None).
+
+        Returns:
+            int: Number of entries removed.
+        """
+        categories = [category] if category is not None else list(self._entries)
+        removed = sum(len(self._entries.pop(name, {})) for name in categories)
+        self.stats["invalidations"] += 1
+        logger.info(f"Invalidated {removed} cached responses ({category or 'all categories'})")
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return hit/miss counters and the number of entries per category.
+        """
+        return {**self.stats, "entries": {name: len(entries) for name, entries in self._entries.items()}}
+
+
+# Singleton instance shared by the HR, Accounting and IT agents
+response_cache = SemanticResponseCache(
+    similarity_threshold=settings.response_cache_similarity,
+    ttl_seconds=settings.response_cache_ttl_seconds,
+    max_entries_per_category=settings.response_cache_max_entries,
+    enabled=settings.response_cache_enabled
+)
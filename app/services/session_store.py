@@ -0,0 +1,281 @@
+# Import necessary types and Utilities
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from app.utils.cache import TTLCache
+from app.utils.config import settings
+from app.utils.logger import logger
+
+
+class SessionStore(ABC):
+    """
+    Base class for conversation state storage.
+
+    Backends only need to implement `_load`, `_store` and `delete` (a backend missing
+    one cannot be instantiated); this class applies the per-session size caps before
+    anything is written.
+    """
+
+    def __init__(self, ttl_seconds: int, max_messages: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the conversation state for a session, or None if unknown or expired.
+        """
+        return await self._load(session_id)
+
+    async def save(self, session_id: str, state: Dict[str, Any]):
+        """
+        Persist the conversation state, trimming it to the per-session caps first.
+        Saving also refreshes the session's time-to-live.
+        """
+        await self._store(session_id, self._serialize(state))
+
+    @abstractmethod
+    async def delete(self, session_id: str):
+        """
+        Forget a session.
+        """
+
+    @abstractmethod
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read and decode the stored state, or None if unknown or expired.
+        """
+
+    @abstractmethod
+    async def _store(self, session_id: str, payload: str):
+        """
+        Write the serialized state and (re)start its time-to-live.
+        """
+
+    def _serialize(self, state: Dict[str, Any]) -> str:
+        """
+        Convert state to JSON, keeping only the most recent messages so a long-running
+        conversation cannot grow without bound.
+
+        - At most `max_messages` messages are kept.
+        - If the JSON is still larger than `max_bytes`, the oldest messages are dropped
+          until it fits (the rest of the state is always kept).
+        """
+        state = dict(state)
+        messages = list(state.get("messages", []))[-self.max_messages:]
+        while True:
+            state["messages"] = messages
+            payload = json.dumps(state, default=str)
+            if len(payload.encode("utf-8")) <= self.max_bytes or not messages:
+                return payload
+            messages = messages[1:]
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Per-process LRU store with TTL eviction. Fast, but not shared between workers
+    and lost on restart.
+    """
+
+    def __init__(self, max_sessions: int, **kwargs):
+        super().__init__(**kwargs)
+        self._cache = TTLCache(max_size=max_sessions, ttl_seconds=self.ttl_seconds)
+
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        payload = self._cache.get(session_id)
+        return json.loads(payload) if payload is not None else None
+
+    async def _store(self, session_id: str, payload: str):
+        self._cache.set(session_id, payload)
+
+    async def delete(self, session_id: str):
+        self._cache.delete(session_id)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    SQLite-backed store. Survives restarts and is shared by all workers on one host.
+    Database calls run in a worker thread so they never block the event loop.
+    """
+
+    # Expired rows are purged every this many writes
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._lock = asyncio.Lock()
+        self._writes = 0
+
+    def _select(self, session_id: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT state FROM sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def _upsert(self, session_id: str, payload: str, purge: bool):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+            (session_id, payload, now + self.ttl_seconds)
+        )
+        if purge:
+            self._conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+        self._conn.commit()
+
+    def _remove(self, session_id: str):
+        self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        self._conn.commit()
+
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        async with self._lock:
+            payload = await asyncio.to_thread(self._select, session_id)
+        return json.loads(payload) if payload is not None else None
+
+    async def _store(self, session_id: str, payload: str):
+        async with self._lock:
+            self._writes += 1
+            await asyncio.to_thread(self._upsert, session_id, payload, self._writes % self.PURGE_EVERY == 0)
+
+    async def delete(self, session_id: str):
+        async with self._lock:
+            await asyncio.to_thread(self._remove, session_id)
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store for any server speaking the Redis protocol (RESP). Shared across workers and hosts;
+    expiry is handled server-side with SET ... EX.
+
+    Uses a minimal built-in RESP client over asyncio streams, so no extra dependency is required.
+    """
+
+    def __init__(self, url: str, **kwargs):
+        super().__init__(**kwargs)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            await self._send("AUTH", self.password)
+        if self.db:
+            await self._send("SELECT", str(self.db))
+
+    async def _send(self, *args: str):
+        """
+        Write one command and read its reply (caller holds the lock).
+        """
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg.encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._writer.write(b"".join(parts))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            data = await self._reader.readexactly(length + 2)
+            return data[:-2].decode("utf-8")
+        if kind == b"*":
+            return [await self._read_reply() for _ in range(int(body))]
+        raise RuntimeError(f"Unexpected Redis reply: {line!r}")
+
+    async def _command(self, *args: str):
+        """
+        Run a command, reconnecting once if the connection was dropped. On any other
+        failure, including cancellation, the connection is discarded.
+        """
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+                    return await self._send(*args)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+                except BaseException:
+                    # Cancelled or failed between sending the command and reading its whole
+                    # reply: the rest of the reply may still arrive, so the connection cannot
+                    # be reused by the next command
+                    self._disconnect()
+                    raise
+
+    def _disconnect(self):
+        """
+        Drop the connection; the next command opens a new one (caller holds the lock).
+        """
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        payload = await self._command("GET", f"session:{session_id}")
+        return json.loads(payload) if payload is not None else None
+
+    async def _store(self, session_id: str, payload: str):
+        await self._command("SET", f"session:{session_id}", payload, "EX", str(self.ttl_seconds))
+
+    async def delete(self, session_id: str):
+        await self._command("DEL", f"session:{session_id}")
+
+
+def create_session_store() -> SessionStore:
+    """
+    Build the session store selected by `settings.session_backend` ("memory", "sqlite" or "redis").
+    """
+    caps = {
+        "ttl_seconds": settings.session_ttl_seconds,
+        "max_messages": settings.session_max_messages,
+        "max_bytes": settings.session_max_bytes
+    }
+    backend = settings.session_backend.lower()
+    if backend == "sqlite":
+        return SQLiteSessionStore(path=settings.session_sqlite_path, **caps)
+    if backend == "redis":
+        return RedisSessionStore(url=settings.session_redis_url, **caps)
+    if backend != "memory":
+        logger.warning(f"Unknown session backend '{settings.session_backend}', using in-memory store")
+    return InMemorySessionStore(max_sessions=settings.session_max_sessions, **caps)
+
+
+# Singleton instance used by the API
+session_store = create_session_store()
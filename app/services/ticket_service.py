@@ -1,12 +1,48 @@
 # Import necessary types and Utilities
 
+from sqlalchemy import func, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
-from app.models.database import Ticket, ChatLog, get_db  # Importing ORM models and DB session generator
+from typing import List, Dict, Any, Optional, Tuple
+from app.models.database import Ticket, ChatLog, TicketCounter, get_db, get_read_db, upsert_increment  # Importing ORM models and DB session generators
+from app.services.analytics_service import analytics_service  # Time-series rollups kept in step with tickets
 from app.utils.logger import logger  # Logger for tracking info and errors
 from datetime import datetime  # To handle timestamps
+import base64  # Opaque pagination cursors
+import json
 import uuid  # Imported but unused in current code
 
+# Columns ticket listings can be sorted by (always with `id` as the tie-breaker)
+SORT_COLUMNS = {"created_at": Ticket.created_at, "updated_at": Ticket.updated_at}
+
+# Largest page a listing may request
+MAX_PAGE_SIZE = 200
+
+# Attempts at updating a ticket that concurrent updates keep changing under us before giving up
+MAX_UPDATE_ATTEMPTS = 10
+
+
+def _encode_cursor(sort: str, order: str, ticket: Ticket) -> str:
+    """
+    Encode the position after `ticket` as an opaque URL-safe cursor.
+    """
+    payload = {"s": sort, "o": order, "v": getattr(ticket, sort).isoformat(), "id": ticket.id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str, order: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor from `_encode_cursor`. Raises ValueError if it is malformed or was
+    issued for a different sort order.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value, ticket_id = datetime.fromisoformat(payload["v"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if payload.get("s") != sort or payload.get("o") != order:
+        raise ValueError("Cursor does not match the requested sort order")
+    return value, ticket_id
+
 
 class TicketService:
     def __init__(self):
@@ -16,6 +52,46 @@ class TicketService:
         """
         pass
 
+    @staticmethod
+    def _bump_counter(db: Session, category: str, status: str, delta: int):
+        """
+        Add `delta` to the (category, status) ticket counter inside the caller's transaction,
+        creating the row if needed.
+        """
+        upsert_increment(db, TicketCounter, {"category": category, "status": status}, count=delta)
+
+    @staticmethod
+    def _claim_for_update(db: Session, ticket_id: int, status: str) -> Optional[Ticket]:
+        """
+        Fetch a ticket and set its new status in the caller's transaction, but only if the
+        ticket still has the status, resolution time and assignee that were read.
+
+        Counters and rollups are moved from the values read here, so two concurrent updates
+        must not both start from the same old state. The conditional UPDATE is atomic and
+        holds the row (the SQLite write lock) until the caller commits. If another update
+        committed in between, it matches nothing and the ticket is read again.
+
+        Returns:
+            Optional[Ticket]: The ticket with its old values loaded, or None if it does not exist.
+
+        Raises:
+            RuntimeError: If the ticket kept changing for MAX_UPDATE_ATTEMPTS attempts.
+        """
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+            if not ticket:
+                return None
+            claimed = db.query(Ticket).filter(
+                Ticket.id == ticket_id,
+                Ticket.status.is_not_distinct_from(ticket.status),
+                Ticket.resolved_at.is_not_distinct_from(ticket.resolved_at),
+                Ticket.assigned_to.is_not_distinct_from(ticket.assigned_to)
+            ).update({Ticket.status: status}, synchronize_session=False)
+            if claimed == 1:
+                return ticket  # Still holds the old values (not synchronized with the UPDATE)
+            db.rollback()  # Another update got there first: read the ticket again
+        raise RuntimeError(f"Ticket {ticket_id} kept changing during the update")
+
     def create_ticket(self,
                       user_id: str,
                       category: str,
@@ -38,6 +114,8 @@ class TicketService:
         Process:
             - Gets a new DB session from the `get_db` generator.
             - Creates a Ticket object and sets default status to "open".
+            - Increments the (category, "open") counter and the hourly "created" rollup
+              in the same transaction.
             - Adds the ticket to the session and commits the transaction.
             - Refreshes the ticket instance to load DB-generated values (like auto-incremented ID).
             - Logs successful ticket creation.
@@ -52,9 +130,12 @@ class TicketService:
                 title=title,
                 description=description,
                 priority=priority,
-                status="open"  # Default status for a new ticket
+                status="open",  # Default status for a new ticket
+                created_at=datetime.utcnow()  # Set up front so the hourly rollup uses the same timestamp
             )
             db.add(ticket)    # Add ticket to the current DB transaction
+            self._bump_counter(db, category, "open", 1)  # Dashboard counter, committed atomically with the ticket
+            analytics_service.record_created(db, ticket)
             db.commit()       # Commit transaction to persist ticket in DB
             db.refresh(ticket)  # Refresh to get updated fields like `id`
             logger.info(f"Created ticket {ticket.id} for user {user_id}")
@@ -106,6 +187,235 @@ class TicketService:
         finally:
             db.close()  # Close DB session
 
+    def list_tickets(self,
+                     user_id: Optional[str] = None,
+                     status: Optional[str] = None,
+                     category: Optional[str] = None,
+                     priority: Optional[str] = None,
+                     assigned_to: Optional[str] = None,
+                     created_after: Optional[datetime] = None,
+                     created_before: Optional[datetime] = None,
+                     sort: str = "created_at",
+                     order: str = "desc",
+                     limit: int = 50,
+                     cursor: Optional[str] = None) -> Tuple[List[Ticket], Optional[str]]:
+        """
+        Return one page of tickets matching the filters, using keyset (cursor) pagination.
+
+        Args:
+            user_id, status, category, priority, assigned_to (Optional[str]): Exact-match filters.
+            created_after (Optional[datetime]): Only tickets created at or after this time.
+            created_before (Optional[datetime]): Only tickets created before this time.
+            sort (str): "created_at" or "updated_at".
+            order (str): "desc" (newest first) or "asc".
+            limit (int): Page size, capped at MAX_PAGE_SIZE.
+            cursor (Optional[str]): `next_cursor` from the previous page; None for the first page.
+
+        Returns:
+            Tuple[List[Ticket], Optional[str]]: The page and the cursor for the next page
+            (None when this is the last page).
+
+        Raises:
+            ValueError: For an unknown sort/order or an invalid cursor.
+
+        Notes:
+            - The page is located by seeking past (sort value, id) of the last row seen, so
+              the cost is proportional to the page size, not to how deep the page is.
+            - One extra row is fetched to know whether another page exists.
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort column: {sort}")
+        if order not in ("asc", "desc"):
+            raise ValueError(f"Unsupported sort order: {order}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        sort_column = SORT_COLUMNS[sort]
+
+        db = next(get_read_db())  # Read-only query; may be served by a replica
+        try:
+            query = db.query(Ticket)
+            for column, value in [(Ticket.user_id, user_id), (Ticket.status, status),
+                                  (Ticket.category, category), (Ticket.priority, priority),
+                                  (Ticket.assigned_to, assigned_to)]:
+                if value is not None:
+                    query = query.filter(column == value)
+            if created_after is not None:
+                query = query.filter(Ticket.created_at >= created_after)
+            if created_before is not None:
+                query = query.filter(Ticket.created_at < created_before)
+
+            # Seek past the last row of the previous page
+            if cursor:
+                last_value, last_id = _decode_cursor(cursor, sort, order)
+                position = tuple_(sort_column, Ticket.id)
+                query = query.filter(position < (last_value, last_id) if order == "desc"
+                                     else position > (last_value, last_id))
+
+            if order == "desc":
+                query = query.order_by(sort_column.desc(), Ticket.id.desc())
+            else:
+                query = query.order_by(sort_column.asc(), Ticket.id.asc())
+
+            tickets = query.limit(limit + 1).all()
+        finally:
+            db.close()
+
+        next_cursor = None
+        if len(tickets) > limit:
+            tickets = tickets[:limit]
+            next_cursor = _encode_cursor(sort, order, tickets[-1])
+        return tickets, next_cursor
+
+    def update_ticket(self, ticket_id: int, status: str, assigned_to: str) -> Optional[Ticket]:
+        """
+        Update a ticket's status and assignee on behalf of a support engineer.
+
+        Args:
+            ticket_id (int): ID of the ticket to update.
+            status (str): New status value.
+            assigned_to (str): Username of the engineer the ticket is assigned to.
+
+        Returns:
+            Optional[Ticket]: The updated ticket, or None if it does not exist.
+
+        Workflow:
+            - Fetch the ticket and atomically claim the status change (`_claim_for_update`),
+              then set status, assignee and `updated_at`.
+            - Move the ticket between (category, status) counters and update the resolution
+              rollups in the same transaction.
+            - If status is "resolved" (any case), set `resolved_at`.
+            - Commit, or rollback and re-raise on error.
+        """
+        db = next(get_db())  # Get DB session
+        try:
+            ticket = self._claim_for_update(db, ticket_id, status)
+            if not ticket:
+                return None
+
+            if ticket.status != status:
+                self._bump_counter(db, ticket.category, ticket.status, -1)
+                self._bump_counter(db, ticket.category, status, 1)
+
+            # Rollups reflect the ticket's current state: take the old resolution out, add the new one
+            analytics_service.record_resolution(db, ticket, -1)
+            ticket.status = status
+            ticket.assigned_to = assigned_to
+            ticket.updated_at = datetime.utcnow()
+
+            # Mark resolved_at timestamp if ticket is resolved
+            if status.lower() == "resolved":
+                ticket.resolved_at = datetime.utcnow()
+            analytics_service.record_resolution(db, ticket, 1)
+
+            db.commit()
+            db.refresh(ticket)  # Load committed values before the session closes
+            return ticket
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error updating ticket: {e}")
+            raise
+        finally:
+            db.close()
+
+    def get_dashboard_stats(self) -> Dict[str, Any]:
+        """
+        Compute summary statistics for the analytics dashboard.
+
+        Returns:
+            Dict[str, Any]: total/open/resolved counts, resolution rate and per-category counts.
+
+        Notes:
+            - Reads the ticket_counters table (one row per category/status pair), so the
+              cost does not grow with the number of tickets.
+        """
+        db = next(get_read_db())  # Analytics query; may be served by a replica
+        try:
+            counters = db.query(TicketCounter.category, TicketCounter.status, TicketCounter.count).all()
+        finally:
+            db.close()
+
+        # Roll the (category, status) counters up into the dashboard totals
+        status_totals: Dict[str, int] = {}
+        category_totals: Dict[str, int] = {}
+        for category, status, count in counters:
+            status_totals[status] = status_totals.get(status, 0) + count
+            category_totals[category] = category_totals.get(category, 0) + count
+
+        total_tickets = sum(status_totals.values())
+        resolved_tickets = status_totals.get("resolved", 0)
+        return {
+            "total_tickets": total_tickets,
+            "open_tickets": status_totals.get("open", 0),
+            "resolved_tickets": resolved_tickets,
+            "resolution_rate": (resolved_tickets / total_tickets * 100) if total_tickets > 0 else 0,
+            "category_breakdown": [
+                {"category": cat, "count": count}
+                for cat, count in sorted(category_totals.items())
+                if count > 0
+            ]
+        }
+
+    def check_counters(self, fix: bool = False) -> List[Dict[str, Any]]:
+        """
+        Recompute ticket counters from the tickets table and compare them with the stored ones.
+
+        Args:
+            fix (bool): If True, replace the stored counters with the recomputed values.
+
+        Returns:
+            List[Dict[str, Any]]: One entry per drifted (category, status) pair with
+            `expected` (from tickets) and `stored` counts; empty when consistent.
+        """
+        db = next(get_db())  # Primary database: the check must see the latest writes
+        try:
+            expected = {
+                (category, status): count
+                for category, status, count in db.query(
+                    Ticket.category, Ticket.status, func.count(Ticket.id)
+                ).group_by(Ticket.category, Ticket.status).all()
+                if category is not None and status is not None
+            }
+            stored = {
+                (counter.category, counter.status): counter.count
+                for counter in db.query(TicketCounter).all()
+            }
+
+            drift = [
+                {"category": key[0], "status": key[1],
+                 "expected": expected.get(key, 0), "stored": stored.get(key, 0)}
+                for key in sorted(set(expected) | set(stored))
+                if expected.get(key, 0) != stored.get(key, 0)
+            ]
+
+            if fix and drift:
+                db.query(TicketCounter).delete()
+                db.add_all([
+                    TicketCounter(category=category, status=status, count=count)
+                    for (category, status), count in expected.items()
+                ])
+                db.commit()
+                logger.warning(f"Repaired {len(drift)} drifted ticket counters")
+            return drift
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error checking ticket counters: {e}")
+            raise
+        finally:
+            db.close()
+
+    def ensure_counters(self):
+        """
+        Build the counters from scratch if the table is empty but tickets exist
+        (e.g. an older database opened before migrations were run). Cheap otherwise.
+        """
+        db = next(get_db())
+        try:
+            needs_rebuild = (db.query(TicketCounter).first() is None
+                             and db.query(Ticket.id).first() is not None)
+        finally:
+            db.close()
+        if needs_rebuild:
+            self.check_counters(fix=True)
+
     def update_ticket_status(self, ticket_id: int, status: str, resolution: str = None):
         """
         Update the status of an existing ticket, optionally including resolution details.
@@ -116,8 +426,8 @@ class TicketService:
             resolution (str, optional): Details on how the ticket was resolved.
 
         Workflow:
-            - Fetch the ticket from DB by ID.
-            - Update its status and the `updated_at` timestamp.
+            - Fetch the ticket from DB by ID and atomically claim the status change.
+            - Update its status and the `updated_at` timestamp, moving it between counters.
             - If status is "resolved", set `resolved_at` timestamp.
             - Optionally, store resolution notes (if provided).
             - Commit changes to DB.
@@ -127,8 +437,13 @@ class TicketService:
         """
         db = next(get_db())  # Get DB session
         try:
-            ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+            ticket = self._claim_for_update(db, ticket_id, status)
             if ticket:
+                if ticket.status != status:
+                    self._bump_counter(db, ticket.category, ticket.status, -1)
+                    self._bump_counter(db, ticket.category, status, 1)
+
+                analytics_service.record_resolution(db, ticket, -1)
                 ticket.status = status
                 ticket.updated_at = datetime.utcnow()
 
@@ -136,6 +451,7 @@ class TicketService:
                     ticket.resolved_at = datetime.utcnow()
                     if resolution:
                         ticket.resolution = resolution  # Add resolution details
+                analytics_service.record_resolution(db, ticket, 1)
 
                 db.commit()  # Persist changes
                 logger.info(f"Updated ticket {ticket_id} status to {status}")
@@ -181,5 +497,28 @@ class TicketService:
             db.close()  # Release DB connection
 
 
+    def log_chats(self, rows: List[Dict[str, Any]]):
+        """
+        Insert many chat log rows in a single transaction (used by the write-behind ChatLogWriter).
+
+        Args:
+            rows (List[Dict[str, Any]]): ChatLog column values (session_id, user_message,
+                                         agent_response, agent_type, ticket_id, created_at).
+
+        Raises:
+            Exception: Re-raised after rollback so the caller can count the failed rows.
+        """
+        db = next(get_db())  # Start DB session
+        try:
+            db.bulk_insert_mappings(ChatLog, rows)
+            db.commit()  # One commit for the whole batch
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error logging {len(rows)} chats: {e}")
+            raise
+        finally:
+            db.close()
+
+
 # Singleton instance for reuse across the app to avoid multiple initializations
 ticket_service = TicketService()
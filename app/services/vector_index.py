@@ -0,0 +1,597 @@
+# Import necessary types and Utilities
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.utils.logger import logger
+
+# Name of the file describing the index (embedding model, dimension, storage format, partitions)
+MANIFEST_NAME = "index.json"
+
+# Name of the file holding the fitted PCA projection
+PCA_NAME = "pca.npz"
+
+# Storage formats for the vectors that are scanned on every query
+DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+# Ways to reduce the dimension of stored vectors
+REDUCTIONS = ("truncate", "pca")
+
+# Rows converted to float32 at a time when scanning compact vectors (bounds temporary memory)
+SCAN_CHUNK_ROWS = 8192
+
+# Most vectors the PCA projection is fitted on (a random sample of the index; bounds the SVD cost)
+PCA_SAMPLE_SIZE = 4096
+
+
+def _write_json(path: str, data: Any):
+    """
+    Replace a JSON file atomically, so a crash never leaves a half-written file behind.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row numbers of the `k` highest scores, best first.
+    """
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top])]
+
+
+class _Partition:
+    """
+    Vectors of one category in memory-mapped arrays ("columns") whose first `len(ids)` rows
+    are live, plus the row -> id/entry mapping in a SQLite table next to them.
+
+    Columns: "vectors" (what queries scan; possibly reduced and quantized), "scales"
+    (per-row int8 scale factors) and "full" (full-precision vectors for re-ranking).
+    The mapping is also held in memory (`ids`, `entries`); the table is only written the
+    rows a change touches, so a write costs the same however large the partition is.
+    """
+
+    def __init__(self, path: str, columns: Dict[str, Tuple[Any, tuple]], initial_capacity: int):
+        self.path = path  # Without extension: <path>.npy holds the vectors, <path>.db the entries
+        self.ids: List[str] = []
+        self.entries: List[Dict] = []
+        self.rows: Dict[str, int] = {}
+        self.arrays: Dict[str, np.ndarray] = {}
+        exists = os.path.exists(f"{path}.db") and all(os.path.exists(self._file(name)) for name in columns)
+        self._conn = sqlite3.connect(f"{path}.db", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                row INTEGER PRIMARY KEY,
+                doc_id TEXT UNIQUE NOT NULL,
+                entry TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+        if exists:
+            for row, doc_id, entry in self._conn.execute("SELECT row, doc_id, entry FROM entries ORDER BY row"):
+                if row != len(self.ids):
+                    raise ValueError(f"Vector index partition {path} has a gap at row {len(self.ids)}")
+                self.ids.append(doc_id)
+                self.entries.append(json.loads(entry))
+            self.rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+            for name, (dtype, shape) in columns.items():
+                array = np.load(self._file(name), mmap_mode="r+")
+                if array.dtype != dtype or array.shape[1:] != shape or array.shape[0] < len(self.ids):
+                    raise ValueError(f"Vector index partition {path} does not match its manifest")
+                self.arrays[name] = array
+        else:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            for name, (dtype, shape) in columns.items():
+                self.arrays[name] = np.lib.format.open_memmap(self._file(name), mode="w+", dtype=dtype,
+                                                              shape=(initial_capacity, *shape))
+
+    def _file(self, name: str, suffix: str = "") -> str:
+        return f"{self.path}{'' if name == 'vectors' else '.' + name}{suffix}.npy"
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def files(self) -> List[str]:
+        return [self._file(name) for name in self.arrays] + [f"{self.path}.db{suffix}" for suffix in ("", "-wal", "-shm")]
+
+    def close(self):
+        """
+        Release the arrays and the entries table (before the files are deleted).
+        """
+        self.arrays.clear()
+        self._conn.close()
+
+    def _grow(self, needed: int):
+        """
+        Double the capacity until `needed` rows fit (copy into new files, then swap them in).
+        """
+        capacity = self.arrays["vectors"].shape[0]
+        while capacity < needed:
+            capacity *= 2
+        for name, array in list(self.arrays.items()):
+            grown = np.lib.format.open_memmap(self._file(name, ".grow"), mode="w+", dtype=array.dtype,
+                                              shape=(capacity, *array.shape[1:]))
+            grown[:len(self.ids)] = array[:len(self.ids)]
+            grown.flush()
+            del self.arrays[name], array, grown
+            os.replace(self._file(name, ".grow"), self._file(name))
+            self.arrays[name] = np.load(self._file(name), mmap_mode="r+")
+
+    def upsert(self, doc_id: str, values: Dict[str, np.ndarray], entry: Dict):
+        row = self.rows.get(doc_id)
+        if row is None:
+            if len(self.ids) == self.arrays["vectors"].shape[0]:
+                self._grow(len(self.ids) + 1)
+            row = len(self.ids)
+            self.rows[doc_id] = row
+            self.ids.append(doc_id)
+            self.entries.append(entry)
+            self._conn.execute("INSERT INTO entries (row, doc_id, entry) VALUES (?, ?, ?)",
+                               (row, doc_id, json.dumps(entry)))
+        else:
+            self.entries[row] = entry
+            self._conn.execute("UPDATE entries SET entry = ? WHERE row = ?", (json.dumps(entry), row))
+        for name, value in values.items():
+            self.arrays[name][row] = value
+
+    def delete(self, doc_id: str):
+        """
+        Remove a row in O(1) by moving the last live row into its place.
+        """
+        row = self.rows.pop(doc_id)
+        last = len(self.ids) - 1
+        self._conn.execute("DELETE FROM entries WHERE row = ?", (row,))
+        if row != last:
+            for array in self.arrays.values():
+                array[row] = array[last]
+            self.ids[row], self.entries[row] = self.ids[last], self.entries[last]
+            self.rows[self.ids[row]] = row
+            self._conn.execute("UPDATE entries SET row = ? WHERE row = ?", (row, last))
+        self.ids.pop()
+        self.entries.pop()
+
+    def reencode(self, encode):
+        """
+        Recompute every live row's scanned columns from its full-precision vector.
+        """
+        for start in range(0, len(self.ids), SCAN_CHUNK_ROWS):
+            end = min(start + SCAN_CHUNK_ROWS, len(self.ids))
+            for name, values in encode(np.asarray(self.arrays["full"][start:end])).items():
+                if name != "full":
+                    self.arrays[name][start:end] = values
+        for array in self.arrays.values():
+            array.flush()
+
+    def save(self):
+        """
+        Flush the changed rows to disk: the arrays, then the entries table in one commit.
+        """
+        for array in self.arrays.values():
+            array.flush()
+        self._conn.commit()
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """
+        Similarity of every live row to the query: one matrix-vector product, converting
+        compact rows to float32 chunk by chunk.
+        """
+        count = len(self.ids)
+        vectors = self.arrays["vectors"]
+        if vectors.dtype == np.float32:
+            scores = vectors[:count] @ query
+        else:
+            scores = np.empty(count, dtype=np.float32)
+            for start in range(0, count, SCAN_CHUNK_ROWS):
+                end = min(start + SCAN_CHUNK_ROWS, count)
+                scores[start:end] = vectors[start:end].astype(np.float32) @ query
+        if "scales" in self.arrays:
+            scores *= self.arrays["scales"][:count]
+        return scores
+
+
+class NumpyVectorIndex:
+    def __init__(self, directory: str, initial_capacity: int = 1024, dtype: str = "float32",
+                 dimensions: int = 0, reduction: str = "truncate", rerank_factor: int = 4):
+        """
+        In-process cosine similarity index kept in memory-mapped NumPy matrices.
+
+        Vectors are L2-normalized on write and stored one contiguous matrix per category, so a
+        query is a single matrix-vector product over the rows of its category (or one per
+        category when unfiltered), followed by a partial sort for the top k.
+
+        Args:
+            directory (str): Where the partition files and the manifest are kept.
+            initial_capacity (int): Rows allocated for a new partition; it doubles when full.
+            dtype (str): Storage of the scanned vectors: "float32" (exact), "float16" (half the
+                         memory) or "int8" (a quarter; one float32 scale per vector).
+            dimensions (int): Keep only this many dimensions per scanned vector (0 keeps all).
+            reduction (str): How dimensions are reduced: "truncate" keeps the leading ones (for
+                             Matryoshka-trained models such as nomic-embed-text v1.5), "pca"
+                             projects onto the principal components of the indexed vectors.
+            rerank_factor (int): With compact vectors, take `rerank_factor * n_results`
+                                 candidates and re-score them against full-precision vectors
+                                 kept in a separate file. 0 disables re-ranking (and that file,
+                                 unless the PCA projection needs it).
+
+        Notes:
+            - Only the scanned vectors have to stay in memory: the full-precision file is
+              memory-mapped and only the candidates' rows are read, so re-ranking restores
+              exact similarities (and nearly all of the recall) at a small cost.
+            - Each entry (the Chroma metadata plus the document text) is stored next to its
+              vector, so search results need no second lookup.
+            - Appends and deletes are incremental: an append writes one row (growing the files
+              when full), a delete moves the last row into the freed slot, and only those
+              rows' entries are written to the partition's SQLite table.
+            - The index records the embedding model and storage format it was built with; an
+              index built with a different format is discarded on load, and `reset` starts it
+              over for another model or dimension.
+            - The PCA projection needs the full-precision vectors (they are kept whatever
+              `rerank_factor` is). Until the index holds `stored_dimension` vectors, too few to
+              fit it, searches scan the full-precision vectors instead. The projection is
+              fitted once there are enough, and refitted whenever the index has doubled since;
+              each fit re-encodes the scanned vectors of every partition.
+            - Meant for a single writing process; other processes see writes after restarting.
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported vector index dtype: {dtype}")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unsupported dimension reduction: {reduction}")
+        self.directory = directory
+        self.initial_capacity = initial_capacity
+        self.dtype = dtype
+        self.dimensions = dimensions
+        self.reduction = reduction
+        self.rerank_factor = rerank_factor
+        os.makedirs(directory, exist_ok=True)
+        self.embedding_model: Optional[str] = None
+        self.dimension: Optional[int] = None  # Dimension of the embeddings written to the index
+        self.partitions: Dict[str, _Partition] = {}
+        self._files: Dict[str, str] = {}  # category -> partition file name
+        self._locations: Dict[str, str] = {}  # doc id -> category
+        self._pca_mean: Optional[np.ndarray] = None
+        self._pca_components: Optional[np.ndarray] = None
+        self.pca_fitted_on = 0
+        self._load()
+
+    def _storage_format(self) -> Dict[str, Any]:
+        return {"dtype": self.dtype, "dimensions": self.dimensions, "reduction": self.reduction,
+                "rerank": self.rerank_factor > 0}
+
+    @property
+    def stored_dimension(self) -> Optional[int]:
+        """
+        Dimension of the scanned vectors.
+        """
+        if self.dimension is None or not self.dimensions:
+            return self.dimension
+        return min(self.dimensions, self.dimension)
+
+    @property
+    def reduces(self) -> bool:
+        return self.stored_dimension != self.dimension
+
+    @property
+    def uses_pca(self) -> bool:
+        return self.reduces and self.reduction == "pca"
+
+    @property
+    def pca_fitted(self) -> bool:
+        return self._pca_components is not None
+
+    @property
+    def reranks(self) -> bool:
+        """
+        Whether candidates are re-scored at full precision (only when scanned vectors are compact).
+        """
+        return self.rerank_factor > 0 and (self.dtype != "float32" or self.reduces)
+
+    @property
+    def keeps_full(self) -> bool:
+        """
+        Whether full-precision vectors are kept: for re-ranking, and to fit the PCA projection.
+        """
+        return self.reranks or self.uses_pca
+
+    def _columns(self) -> Dict[str, Tuple[Any, tuple]]:
+        columns = {"vectors": (np.dtype(DTYPES[self.dtype]), (self.stored_dimension,))}
+        if self.dtype == "int8":
+            columns["scales"] = (np.dtype(np.float32), ())
+        if self.keeps_full:
+            columns["full"] = (np.dtype(np.float32), (self.dimension,))
+        return columns
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def _load(self):
+        """
+        Map the partitions listed in the manifest; start empty if it is missing, unreadable or
+        was written with a different storage format.
+        """
+        if not os.path.exists(self._manifest_path()):
+            return
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.embedding_model = manifest["embedding_model"]
+            self.dimension = manifest["dimension"]
+            self._files = manifest["partitions"]
+            if manifest.get("format", self._storage_format()) != self._storage_format():
+                logger.info(f"Vector index in {self.directory} uses a different storage format; rebuilding")
+                self.reset(None)
+                return
+            self.pca_fitted_on = manifest.get("pca_fitted_on", 0)
+            if self.uses_pca and self.pca_fitted_on:
+                with np.load(os.path.join(self.directory, PCA_NAME)) as pca:
+                    self._pca_mean, self._pca_components = pca["mean"], pca["components"]
+            for category, file_name in dict(self._files).items():
+                self._open_partition(category, file_name)
+        except Exception as e:
+            logger.error(f"Vector index in {self.directory} is unreadable, starting empty: {e}")
+            self.reset(None)
+
+    def _save_manifest(self):
+        _write_json(self._manifest_path(), {
+            "embedding_model": self.embedding_model,
+            "dimension": self.dimension,
+            "format": self._storage_format(),
+            "pca_fitted_on": self.pca_fitted_on,
+            "partitions": self._files
+        })
+
+    def _open_partition(self, category: str, file_name: str) -> _Partition:
+        partition = _Partition(os.path.join(self.directory, file_name), self._columns(), self.initial_capacity)
+        self.partitions[category] = partition
+        self._files[category] = file_name
+        for doc_id in partition.ids:
+            self._locations[doc_id] = category
+        return partition
+
+    def _partition_for(self, category: str) -> _Partition:
+        partition = self.partitions.get(category)
+        if partition is None:
+            # Readable and unique file name whatever characters the category contains
+            safe = re.sub(r"[^A-Za-z0-9_-]", "_", category)[:40]
+            digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:8]
+            partition = self._open_partition(category, f"{safe}_{digest}")
+            self._save_manifest()
+        return partition
+
+    def reset(self, embedding_model: Optional[str]):
+        """
+        Delete every vector and start over for `embedding_model`.
+        """
+        paths = [os.path.join(self.directory, PCA_NAME)]
+        for partition in self.partitions.values():
+            paths += partition.files()
+            partition.close()
+        for file_name in self._files.values():  # Also partitions that failed to open (or older layouts)
+            paths += [os.path.join(self.directory, f"{file_name}{suffix}")
+                      for suffix in (".npy", ".scales.npy", ".full.npy", ".db", ".db-wal", ".db-shm", ".json")]
+        for path in set(paths):
+            if os.path.exists(path):
+                os.remove(path)
+        self.partitions, self._files, self._locations = {}, {}, {}
+        self.embedding_model, self.dimension = embedding_model, None
+        self._pca_mean, self._pca_components, self.pca_fitted_on = None, None, 0
+        self._save_manifest()
+
+    def needs_refit(self) -> bool:
+        """
+        True when the PCA projection was fitted on fewer than half of the vectors now indexed
+        (upserts refit it as soon as that happens).
+        """
+        return self.uses_pca and self.pca_fitted_on > 0 and self.count() > 2 * self.pca_fitted_on
+
+    def _fit_pca(self):
+        """
+        Fit the projection onto the top principal components of the indexed vectors (a random
+        sample of at most PCA_SAMPLE_SIZE full-precision rows) and re-encode every partition.
+        """
+        live = [partition for partition in self.partitions.values() if len(partition)]
+        total = sum(len(partition) for partition in live)
+        picks = np.sort(np.random.default_rng(0).choice(total, size=min(total, PCA_SAMPLE_SIZE), replace=False))
+        sample, offset = [], 0
+        for partition in live:
+            rows = picks[(picks >= offset) & (picks < offset + len(partition))] - offset
+            sample.append(np.asarray(partition.arrays["full"][rows]))
+            offset += len(partition)
+        vectors = np.concatenate(sample)
+
+        mean = vectors.mean(axis=0)
+        _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+        components = np.zeros((self.stored_dimension, self.dimension), dtype=np.float32)
+        kept = min(self.stored_dimension, vt.shape[0])
+        components[:kept] = vt[:kept]
+        self._pca_mean, self._pca_components = mean.astype(np.float32), components
+        self.pca_fitted_on = total
+        for partition in live:
+            partition.reencode(self._encode)
+        np.savez(os.path.join(self.directory, PCA_NAME), mean=self._pca_mean, components=components)
+        self._save_manifest()
+        logger.info(f"Fitted PCA projection {self.dimension} -> {self.stored_dimension} dims "
+                    f"on {len(vectors)} of {total} vectors")
+
+    def _reduce(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Project unit vectors to the stored dimension and renormalize them.
+        """
+        if not self.reduces:
+            return vectors
+        if self.reduction == "truncate":
+            reduced = vectors[:, :self.stored_dimension]
+        elif not self.pca_fitted:
+            # Placeholder rows; searches scan the full-precision vectors until the PCA is fitted
+            return np.zeros((len(vectors), self.stored_dimension), dtype=np.float32)
+        else:
+            reduced = (vectors - self._pca_mean) @ self._pca_components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (reduced / norms).astype(np.float32)
+
+    def _encode(self, vectors: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Column values for unit vectors: reduced and quantized, plus scales and full precision.
+        """
+        reduced = self._reduce(vectors)
+        if self.dtype == "int8":
+            scales = np.abs(reduced).max(axis=1) / 127
+            scales[scales == 0] = 1
+            values = {"vectors": np.round(reduced / scales[:, None]).astype(np.int8),
+                      "scales": scales.astype(np.float32)}
+        else:
+            values = {"vectors": reduced.astype(DTYPES[self.dtype])}
+        if self.keeps_full:
+            values["full"] = vectors
+        return values
+
+    def count(self, category: Optional[str] = None) -> int:
+        """
+        Number of vectors in one category, or in all of them.
+        """
+        if category is not None:
+            return len(self.partitions[category]) if category in self.partitions else 0
+        return len(self._locations)
+
+    def upsert(self, ids: List[str], embeddings: List[List[float]], entries: List[Dict]):
+        """
+        Add or replace vectors. Each entry's "category" selects its partition; an entry whose
+        category changed moves to the new partition.
+
+        Raises:
+            ValueError: If a vector's dimension differs from the vectors already indexed,
+                        or a vector is all zeros.
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        if self.dimension is None:
+            self.dimension = vectors.shape[1]
+        if vectors.shape[1] != self.dimension:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the index ({self.dimension})")
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        if not np.all(norms > 0):
+            raise ValueError("Cannot index a zero vector")
+        vectors /= norms
+        encoded = self._encode(vectors)
+
+        touched = set()
+        for i, (doc_id, entry) in enumerate(zip(ids, entries)):
+            category = entry.get("category", "")
+            previous = self._locations.get(doc_id)
+            if previous is not None and previous != category:
+                self.partitions[previous].delete(doc_id)
+                touched.add(previous)
+            self._partition_for(category).upsert(doc_id, {name: value[i] for name, value in encoded.items()}, entry)
+            self._locations[doc_id] = category
+            touched.add(category)
+        for category in touched:
+            self.partitions[category].save()
+        if self.uses_pca and ((not self.pca_fitted and self.count() >= self.stored_dimension)
+                              or self.needs_refit()):
+            self._fit_pca()
+
+    def delete(self, ids: Iterable[str]) -> int:
+        """
+        Remove vectors by ID (unknown IDs are ignored). Returns the number removed.
+        """
+        removed, touched = 0, set()
+        for doc_id in ids:
+            category = self._locations.pop(doc_id, None)
+            if category is not None:
+                self.partitions[category].delete(doc_id)
+                touched.add(category)
+                removed += 1
+        for category in touched:
+            self.partitions[category].save()
+        return removed
+
+    def search(self, embedding: List[float], category: Optional[str] = None,
+               n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        Top-k cosine search.
+
+        Args:
+            embedding (List[float]): Query vector (normalized here).
+            category (Optional[str]): Search only this category.
+            n_results (int): Maximum number of results.
+
+        Returns:
+            List[Dict[str, Any]]: Best first; each is the stored entry plus "id" and "similarity".
+
+        Raises:
+            ValueError: If the query dimension differs from the indexed vectors.
+
+        Notes:
+            - With float32 vectors at full dimension the results are exact. Otherwise the
+              compact vectors select the candidates, and with re-ranking their full-precision
+              similarities decide the order and are the similarities returned.
+            - Before the PCA projection is fitted, the full-precision vectors are scanned
+              and the results are exact.
+        """
+        if self.dimension is None or n_results <= 0:
+            return []
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape != (self.dimension,):
+            raise ValueError(f"Query dimension {query.shape[0]} does not match the index ({self.dimension})")
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        query = query / norm
+        exact_scan = self.uses_pca and not self.pca_fitted
+        reduced = self._reduce(query[None, :])[0]
+        candidates = n_results * self.rerank_factor if self.reranks else n_results
+
+        if category is not None:
+            partitions = [self.partitions[category]] if category in self.partitions else []
+        else:
+            partitions = list(self.partitions.values())
+        matches = []
+        for partition in partitions:
+            if not len(partition):
+                continue
+            if exact_scan:
+                # Too few vectors to fit the PCA projection yet: scan the full-precision ones
+                scores = partition.arrays["full"][:len(partition)] @ query
+                matches += [(float(scores[row]), partition, int(row)) for row in _top_k(scores, n_results)]
+                continue
+            scores = partition.scores(reduced)
+            top = _top_k(scores, candidates)
+            if self.reranks:
+                # Re-rank: exact similarities from the candidates' full-precision rows only
+                exact = partition.arrays["full"][top] @ query
+                matches += [(float(exact[i]), partition, int(top[i])) for i in np.argsort(-exact)[:n_results]]
+            else:
+                matches += [(float(scores[row]), partition, int(row)) for row in top]
+        matches.sort(key=lambda match: match[0], reverse=True)
+        return [{**partition.entries[row], "id": partition.ids[row], "similarity": score}
+                for score, partition, row in matches[:n_results]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the embedding model, storage format, vectors per category and the bytes held
+        per vector in the scanned arrays (what has to stay in memory) and in total.
+        """
+        columns = self._columns() if self.dimension is not None else {}
+        scanned = sum(dtype.itemsize * int(np.prod(shape)) for name, (dtype, shape) in columns.items()
+                      if name != "full")
+        total = sum(dtype.itemsize * int(np.prod(shape)) for dtype, shape in columns.values())
+        return {
+            "embedding_model": self.embedding_model,
+            "dimension": self.dimension,
+            "stored_dimension": self.stored_dimension,
+            "format": self._storage_format(),
+            "vectors": {category: len(partition) for category, partition in self.partitions.items()},
+            "scanned_bytes_per_vector": scanned,
+            "bytes_per_vector": total
+        }
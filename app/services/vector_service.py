@@ -1,12 +1,24 @@
 
 # Import necessary types and Utilities
+import hashlib
+import re
+import time
+from itertools import islice
 import chromadb
 from chromadb.config import Settings as ChromaSettings
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Iterable, Callable
 from app.utils.config import settings  # Import config for Chroma DB path, etc.
 from app.services.llm_service import llm_service  # For embedding generation via LLM
+from app.services.vector_index import NumpyVectorIndex
+from app.services.lexical_index import LexicalIndex
 from app.utils.logger import logger  # Logging system for info/errors
 
+# Name of the Chroma collection holding the knowledge base
+COLLECTION_NAME = "helpdesk_knowledge"
+
+# Minimum number of candidates taken from each ranking before hybrid results are fused
+FUSION_CANDIDATES = 20
+
 
 class VectorService:
     def __init__(self):
@@ -17,6 +29,16 @@ class VectorService:
         - Disables anonymized telemetry for privacy.
         - Retrieves or creates a collection named "helpdesk_knowledge".
         - Uses cosine similarity as the metric space for efficient vector search.
+        - Records the embedding model in the collection metadata; queries and writes always
+          use that model, so vectors in one collection are never mixed across models.
+        - With `settings.vector_backend = "numpy"`, searches are served by an in-process
+          NumpyVectorIndex instead. Chroma stays the store of record: every write goes to
+          both, and the index is rebuilt from Chroma at startup if the two disagree.
+        - With `settings.vector_partition_by_category`, every entry is also written to a
+          per-category collection and category searches are routed there, without a
+          `where` filter. The main collection remains the all-categories view.
+        - With `settings.kb_hybrid_search`, a LexicalIndex (BM25 over questions and answers)
+          mirrors the collection the same way and is searched alongside the embeddings.
 
         This setup supports adding and querying vector embeddings related to helpdesk knowledge.
         """
@@ -25,13 +47,249 @@ class VectorService:
             settings=ChromaSettings(anonymized_telemetry=False)  # Privacy settings
         )
         self.collection = self.client.get_or_create_collection(
-            name="helpdesk_knowledge",  # Logical grouping of vectors (documents)
-            metadata={"hnsw:space": "cosine"}  # Use cosine similarity for nearest neighbor search
+            name=COLLECTION_NAME,  # Logical grouping of vectors (documents)
+            metadata={
+                "hnsw:space": "cosine",  # Use cosine similarity for nearest neighbor search
+                "embedding_model": settings.embedding_model
+            }
         )
+        if self.embedding_model != settings.embedding_model:
+            logger.warning(
+                f"Knowledge base is embedded with '{self.embedding_model}', not EMBEDDING_MODEL "
+                f"'{settings.embedding_model}'; still using '{self.embedding_model}'. "
+                f"Run `python reembed_knowledge.py` to switch."
+            )
+
+        self.partition_by_category = settings.vector_partition_by_category
+        self.partitions: Dict[str, Any] = {}  # category -> Chroma collection
+        self.partitions_ready = False
+        self._load_partitions()
+
+        self.index: Optional[NumpyVectorIndex] = None
+        backend = settings.vector_backend.lower()
+        if backend == "numpy":
+            self.index = NumpyVectorIndex(
+                settings.vector_index_directory,
+                dtype=settings.vector_index_dtype,
+                dimensions=settings.vector_index_dimensions,
+                reduction=settings.vector_index_reduction,
+                rerank_factor=settings.vector_index_rerank_factor
+            )
+        elif backend != "chroma":
+            logger.warning(f"Unknown vector backend '{settings.vector_backend}', using Chroma")
+
+        self.rrf_k = settings.kb_rrf_k
+        self.lexical_index: Optional[LexicalIndex] = None
+        if settings.kb_hybrid_search:
+            self.lexical_index = LexicalIndex(settings.kb_lexical_index_path or None)
+        self.sync_index()
+
+    @property
+    def embedding_model(self) -> str:
+        """
+        Embedding model the current collection was built with. Collections created before
+        the model was recorded were embedded with the chat model.
+        """
+        return (self.collection.metadata or {}).get("embedding_model", settings.ollama_model)
+
+    def _partition_name(self, category: str) -> str:
+        """
+        Collection name for a category: readable, valid for Chroma, unique per category.
+        """
+        slug = re.sub(r"[^a-z0-9]+", "_", category.lower()).strip("_")[:20] or "none"
+        digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:6]
+        return f"{self.collection.name}_{slug}_{digest}"
 
-    async def add_knowledge(self, question: str, answer: str, category: str, metadata: Dict = None):
+    def _load_partitions(self):
+        """
+        Find the per-category collections of the current collection and check that they
+        are complete: together they hold every entry, embedded with the same model.
+        Until they are, category searches fall back to metadata filtering.
         """
-        Adds a new knowledge entry to the vector database.
+        self.partitions, self.partitions_ready = {}, False
+        if not self.partition_by_category:
+            return
+        prefix = f"{self.collection.name}_"
+        for item in self.client.list_collections():
+            name = item if isinstance(item, str) else item.name
+            if not name.startswith(prefix):
+                continue
+            collection = self.client.get_collection(name) if isinstance(item, str) else item
+            metadata = collection.metadata or {}
+            if metadata.get("partition_of") == self.collection.name:
+                self.partitions[metadata.get("category", "")] = collection
+
+        models = {(p.metadata or {}).get("embedding_model") for p in self.partitions.values()}
+        self.partitions_ready = (sum(p.count() for p in self.partitions.values()) == self.collection.count()
+                                 and models <= {self.embedding_model})
+        if not self.partitions_ready:
+            logger.warning("Per-category knowledge collections are missing or out of date; category "
+                           "searches use metadata filtering until `python split_knowledge.py` is run.")
+
+    def _partition_for(self, category: str):
+        """
+        The collection for a category, created on first use.
+        """
+        partition = self.partitions.get(category)
+        if partition is None:
+            partition = self.client.get_or_create_collection(
+                name=self._partition_name(category),
+                metadata={
+                    "hnsw:space": "cosine",
+                    "embedding_model": self.embedding_model,
+                    "partition_of": self.collection.name,
+                    "category": category
+                }
+            )
+            self.partitions[category] = partition
+        return partition
+
+    def _write_partitions(self, ids: List[str], embeddings: List[List[float]],
+                          metadatas: List[Dict], documents: List[str]):
+        """
+        Upsert entries into their categories' collections.
+        """
+        rows_by_category: Dict[str, List[int]] = {}
+        for row, metadata in enumerate(metadatas):
+            rows_by_category.setdefault((metadata or {}).get("category", ""), []).append(row)
+        for category, rows in rows_by_category.items():
+            self._partition_for(category).upsert(
+                ids=[ids[row] for row in rows],
+                embeddings=[embeddings[row] for row in rows],
+                documents=[documents[row] for row in rows],
+                metadatas=[metadatas[row] for row in rows]
+            )
+
+    def split_by_category(self, batch_size: int = 1000,
+                          on_progress: Callable[[Dict], None] = None) -> Dict[str, Any]:
+        """
+        (Re)build the per-category collections from the main collection.
+
+        Args:
+            batch_size (int): Entries copied per step.
+            on_progress (Callable, optional): Called with the running stats after every batch.
+
+        Returns:
+            Dict[str, Any]: 'copied' entry count, 'seconds' and entries per category ('categories').
+
+        Notes:
+            - Stored embeddings are copied as they are; nothing is embedded again.
+            - Existing partitions are dropped first. Category searches use metadata
+              filtering while the split runs and switch to the partitions when it is done.
+        """
+        stats = {"copied": 0, "seconds": 0.0, "categories": {}}
+        started = time.perf_counter()
+        self.partitions_ready = False
+        for partition in list(self.partitions.values()):
+            self._drop_collection(partition.name)
+        self.partitions = {}
+
+        total = self.collection.count()
+        for offset in range(0, total, batch_size):
+            page = self.collection.get(limit=batch_size, offset=offset,
+                                       include=["embeddings", "documents", "metadatas"])
+            self._write_partitions(page["ids"], page["embeddings"], page["metadatas"], page["documents"])
+            stats["copied"] += len(page["ids"])
+            stats["seconds"] = time.perf_counter() - started
+            if on_progress:
+                on_progress(dict(stats))
+
+        self.partitions_ready = self.partition_by_category
+        stats["seconds"] = time.perf_counter() - started
+        stats["categories"] = {category: partition.count() for category, partition in self.partitions.items()}
+        logger.info(f"Split {stats['copied']} knowledge entries into {len(self.partitions)} "
+                    f"category collections in {stats['seconds']:.1f}s")
+        return stats
+
+    def sync_index(self, force: bool = False) -> int:
+        """
+        Rebuild the indexes that mirror the Chroma collection when they are out of date
+        (always, when `force` is set).
+
+        The NumPy index is out of date if it was built with a different embedding model, holds
+        a different number of entries or has outgrown its PCA projection; the lexical index if
+        its entry count differs.
+
+        Returns:
+            int: Number of entries in the collection.
+        """
+        total = self.collection.count()
+        rebuild_vectors = self.index is not None and (
+            force or self.index.embedding_model != self.embedding_model or self.index.count() != total
+            or self.index.needs_refit()
+        )
+        rebuild_lexical = self.lexical_index is not None and (force or self.lexical_index.count() != total)
+        if not (rebuild_vectors or rebuild_lexical):
+            return total
+
+        started = time.perf_counter()
+        if rebuild_vectors:
+            self.index.reset(self.embedding_model)
+        if rebuild_lexical:
+            self.lexical_index.clear()
+        include = ["documents", "metadatas"] + (["embeddings"] if rebuild_vectors else [])
+        for offset in range(0, total, 1000):
+            page = self.collection.get(limit=1000, offset=offset, include=include)
+            entries = [self._index_entry(metadata, document)
+                       for metadata, document in zip(page["metadatas"], page["documents"])]
+            if rebuild_vectors:
+                self.index.upsert(page["ids"], page["embeddings"], entries)
+            if rebuild_lexical:
+                self.lexical_index.upsert(page["ids"], entries)
+        logger.info(f"Rebuilt search indexes from Chroma ({total} entries"
+                    f"{', vectors' if rebuild_vectors else ''}{', lexical' if rebuild_lexical else ''}) "
+                    f"in {time.perf_counter() - started:.1f}s")
+        return total
+
+    @staticmethod
+    def _index_entry(metadata: Dict, document: str) -> Dict:
+        """
+        What the mirroring indexes store for an entry: the Chroma metadata plus the document.
+        """
+        return {**(metadata or {}), "document": document}
+
+    def _mirror_writes(self, ids: List[str], embeddings: List[List[float]],
+                       metadatas: List[Dict], documents: List[str]):
+        """
+        Apply an upsert that was just written to the main collection to the category
+        collections and indexes that mirror it.
+        """
+        if self.partitions_ready:
+            self._write_partitions(ids, embeddings, metadatas, documents)
+        entries = [self._index_entry(metadata, document) for metadata, document in zip(metadatas, documents)]
+        if self.index is not None:
+            self.index.upsert(ids, embeddings, entries)
+        if self.lexical_index is not None:
+            self.lexical_index.upsert(ids, entries)
+
+    @staticmethod
+    def _make_doc_id(question: str, category: str) -> str:
+        """
+        Build a stable, content-addressed document ID for a knowledge entry.
+
+        The ID is derived from the category and the normalized question text, so the
+        same article always maps to the same ID regardless of insertion order, and
+        IDs never collide across categories or get reused after deletes.
+        """
+        normalized = " ".join(question.lower().split())
+        digest = hashlib.sha1(f"{category}\x00{normalized}".encode("utf-8")).hexdigest()[:20]
+        return f"{category}_{digest}"
+
+    @staticmethod
+    def _build_metadata(question: str, answer: str, category: str, metadata: Dict = None) -> Dict:
+        """
+        Merge the base question/answer/category fields with any extra metadata.
+        """
+        return {
+            "category": category,
+            "question": question,
+            "answer": answer,
+            **(metadata or {})  # Merge any extra metadata if provided
+        }
+
+    async def add_knowledge(self, question: str, answer: str, category: str, metadata: Dict = None) -> Optional[str]:
+        """
+        Adds (or updates) a knowledge entry in the vector database.
 
         Args:
             question (str): The user question or query text.
@@ -39,40 +297,240 @@ class VectorService:
             category (str): Category or topic label for classification/filtering.
             metadata (Dict, optional): Additional metadata fields to store with the entry.
 
+        Returns:
+            Optional[str]: The document ID of the entry, or None if it could not be stored.
+
         Process:
-            - Generate an embedding vector for the question using the LLM service.
-            - Construct a unique document ID based on category and current number of stored docs.
-            - Add the embedding along with document text and metadata to the collection.
-            - Log success or catch and log errors if addition fails.
+            - Derive a content-hash document ID from the category and question.
+            - If an identical entry is already stored under that ID, do nothing (idempotent).
+            - Otherwise generate an embedding for the question using the LLM service
+              and upsert it along with document text and metadata.
+            - Log success or catch and log errors if the write fails.
 
         Notes:
             - Embedding is required to store; if generation fails, no insertion happens.
             - Metadata dictionary merges with base metadata like question, answer, and category.
+            - Looking up a single ID is constant-time, so ingest stays linear in the number of entries.
         """
         try:
-            embedding = await llm_service.generate_embedding(question)
+            doc_id = self._make_doc_id(question, category)
+            entry_metadata = self._build_metadata(question, answer, category, metadata)
+
+            # Skip the embedding call entirely when the same article is re-ingested
+            existing = self.collection.get(ids=[doc_id], include=["metadatas"])
+            if existing["ids"] and existing["metadatas"][0] == entry_metadata:
+                logger.debug(f"Knowledge entry unchanged: {doc_id}")
+                return doc_id
+
+            embedding = await llm_service.generate_embedding(question, model=self.embedding_model)
             if embedding:
-                # Generate a unique ID by combining category and current size of collection
-                doc_id = f"{category}_{len(self.collection.get()['ids'])}"
-                self.collection.add(
+                document = f"Q: {question}\nA: {answer}"
+                self.collection.upsert(
                     embeddings=[embedding],  # Embedding vector list
-                    documents=[f"Q: {question}\nA: {answer}"],  # Document text (combined QA)
-                    metadatas=[{
-                        "category": category,
-                        "question": question,
-                        "answer": answer,
-                        **(metadata or {})  # Merge any extra metadata if provided
-                    }],
-                    ids=[doc_id]  # Unique identifier for this entry
+                    documents=[document],  # Document text (combined QA)
+                    metadatas=[entry_metadata],
+                    ids=[doc_id]  # Stable identifier for this entry
                 )
+                self._mirror_writes([doc_id], [embedding], [entry_metadata], [document])
                 logger.info(f"Added knowledge entry: {doc_id}")
+                return doc_id
         except Exception as e:
             # Log the error but don’t throw, so service remains stable
             logger.error(f"Error adding knowledge: {e}")
+        return None
+
+    async def add_knowledge_bulk(self,
+                                 entries: Iterable[Dict],
+                                 batch_size: int = 64,
+                                 on_progress: Callable[[Dict], None] = None) -> Dict[str, Any]:
+        """
+        Adds many knowledge entries using batched lookups, batched embeddings and batched upserts.
+
+        Args:
+            entries (Iterable[Dict]): Stream of entries with 'question', 'answer', 'category'
+                                      and optional 'metadata'. Consumed lazily, batch by batch.
+            batch_size (int): Number of entries written per Chroma upsert call.
+            on_progress (Callable, optional): Called with the running stats after every batch.
+
+        Returns:
+            Dict[str, Any]: Counters ('added', 'skipped', 'failed', 'processed'), elapsed
+                            'seconds' and throughput 'docs_per_sec'.
+
+        Process (per batch):
+            - Derive content-hash IDs and drop duplicates within the batch.
+            - Fetch all those IDs from Chroma in one call and skip entries already stored
+              unchanged. This is what makes an interrupted ingest resumable: re-running it
+              skips everything written before the crash without re-embedding.
+            - Embed the remaining questions with batched /api/embed requests
+              (`llm_service.generate_embeddings`).
+            - Write every successfully embedded entry with a single upsert.
+        """
+        stats = {"added": 0, "skipped": 0, "failed": 0, "processed": 0,
+                 "seconds": 0.0, "docs_per_sec": 0.0}
+        started = time.perf_counter()
+
+        iterator = iter(entries)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                break
+
+            # Build IDs and metadata; later duplicates in the same batch win
+            pending = {}
+            for entry in batch:
+                doc_id = self._make_doc_id(entry["question"], entry["category"])
+                pending[doc_id] = (entry, self._build_metadata(
+                    entry["question"], entry["answer"], entry["category"], entry.get("metadata")
+                ))
+            stats["skipped"] += len(batch) - len(pending)
+
+            try:
+                # One round-trip to find entries that are already stored unchanged
+                existing = self.collection.get(ids=list(pending), include=["metadatas"])
+                for doc_id, stored_metadata in zip(existing["ids"], existing["metadatas"]):
+                    if pending[doc_id][1] == stored_metadata:
+                        del pending[doc_id]
+                        stats["skipped"] += 1
+
+                ids = list(pending)
+                embeddings = await llm_service.generate_embeddings(
+                    [pending[doc_id][0]["question"] for doc_id in ids], model=self.embedding_model
+                )
+
+                write_ids, write_embeddings, write_documents, write_metadatas = [], [], [], []
+                for doc_id, embedding in zip(ids, embeddings):
+                    if not embedding:
+                        stats["failed"] += 1
+                        continue
+                    entry, entry_metadata = pending[doc_id]
+                    write_ids.append(doc_id)
+                    write_embeddings.append(embedding)
+                    write_documents.append(f"Q: {entry['question']}\nA: {entry['answer']}")
+                    write_metadatas.append(entry_metadata)
+
+                if write_ids:
+                    self.collection.upsert(
+                        ids=write_ids,
+                        embeddings=write_embeddings,
+                        documents=write_documents,
+                        metadatas=write_metadatas
+                    )
+                    self._mirror_writes(write_ids, write_embeddings, write_metadatas, write_documents)
+                stats["added"] += len(write_ids)
+            except Exception as e:
+                # A failed batch is not fatal; its entries are retried on the next run
+                logger.error(f"Error adding knowledge batch: {e}")
+                stats["failed"] += len(pending)
+
+            stats["processed"] += len(batch)
+            stats["seconds"] = time.perf_counter() - started
+            stats["docs_per_sec"] = stats["processed"] / stats["seconds"] if stats["seconds"] else 0.0
+            if on_progress:
+                on_progress(dict(stats))
+
+        logger.info(
+            f"Bulk knowledge ingest: {stats['added']} added, {stats['skipped']} skipped, "
+            f"{stats['failed']} failed in {stats['seconds']:.1f}s ({stats['docs_per_sec']:.1f} docs/sec)"
+        )
+        return stats
+
+    async def reembed(self, model: str, batch_size: int = 256,
+                      on_progress: Callable[[Dict], None] = None) -> Dict[str, Any]:
+        """
+        Rebuild the knowledge base with a different embedding model.
+
+        Args:
+            model (str): Embedding model to switch to.
+            batch_size (int): Entries read, embedded and written per step.
+            on_progress (Callable, optional): Called with the running stats after every batch.
+
+        Returns:
+            Dict[str, Any]: 'reembedded' entry count, 'seconds', 'docs_per_sec' and the
+                            'backup' collection name (None if nothing was done).
+
+        Process:
+            - Copy every entry (same IDs, documents and metadata) into a staging collection,
+              embedding the questions with the new model in batches.
+            - Only when every entry has a vector: rename the current collection to
+              "<name>_backup" and the staging collection to "<name>".
+
+        Raises:
+            RuntimeError: If any embedding fails. The staging collection is dropped and the
+                          live collection is left untouched, so the command can be re-run.
+
+        Notes:
+            - Other processes (e.g. a running API) keep their handle on the old collection
+              until restarted.
+        """
+        stats = {"reembedded": 0, "seconds": 0.0, "docs_per_sec": 0.0, "backup": None}
+        if model == self.embedding_model:
+            return stats
+
+        name = self.collection.name
+        staging_name, backup_name = f"{name}_reembed", f"{name}_backup"
+        self._drop_collection(staging_name)  # Leftover from an interrupted run
+        staging = self.client.create_collection(
+            name=staging_name,
+            metadata={"hnsw:space": "cosine", "embedding_model": model}
+        )
+
+        started = time.perf_counter()
+        total = self.collection.count()
+        for offset in range(0, total, batch_size):
+            page = self.collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+            questions = [metadata.get("question") or document
+                         for metadata, document in zip(page["metadatas"], page["documents"])]
+            embeddings = await llm_service.generate_embeddings(questions, model=model)
+            if not all(embeddings):
+                self._drop_collection(staging_name)
+                raise RuntimeError(f"Embedding with '{model}' failed for {embeddings.count([])} entries; "
+                                   f"the knowledge base was not changed")
+
+            staging.upsert(ids=page["ids"], embeddings=embeddings,
+                           documents=page["documents"], metadatas=page["metadatas"])
+            stats["reembedded"] += len(page["ids"])
+            stats["seconds"] = time.perf_counter() - started
+            stats["docs_per_sec"] = stats["reembedded"] / stats["seconds"] if stats["seconds"] else 0.0
+            if on_progress:
+                on_progress(dict(stats))
+
+        # Swap: keep the old collection as a backup until the new one has proven itself
+        self._drop_collection(backup_name)
+        self.collection.modify(name=backup_name)
+        staging.modify(name=name)
+        self.collection = self.client.get_collection(name)
+        if self.partition_by_category:
+            self.split_by_category(batch_size=batch_size)
+        self.sync_index(force=True)
+        stats["backup"] = backup_name
+        logger.info(f"Re-embedded {stats['reembedded']} knowledge entries with '{model}' "
+                    f"in {stats['seconds']:.1f}s; previous collection kept as '{backup_name}'")
+        return stats
+
+    def delete_knowledge(self, doc_ids: List[str]):
+        """
+        Remove knowledge entries by document ID (unknown IDs are ignored).
+        """
+        self.collection.delete(ids=doc_ids)
+        for partition in self.partitions.values():
+            partition.delete(ids=doc_ids)
+        if self.index is not None:
+            self.index.delete(doc_ids)
+        if self.lexical_index is not None:
+            self.lexical_index.delete(doc_ids)
+        logger.info(f"Deleted {len(doc_ids)} knowledge entries")
+
+    def _drop_collection(self, name: str):
+        """
+        Delete a collection if it exists.
+        """
+        if name in [c if isinstance(c, str) else c.name for c in self.client.list_collections()]:
+            self.client.delete_collection(name)
 
     async def search_knowledge(self, query: str, category: str = None, n_results: int = 5) -> List[Dict]:
         """
-        Search the knowledge base for documents semantically similar to the query.
+        Search the knowledge base for documents similar to the query, by meaning and (with
+        hybrid search enabled) by keywords.
 
         Args:
             query (str): The search query string.
@@ -84,54 +542,115 @@ class VectorService:
                 - question (str)
                 - answer (str)
                 - category (str)
-                - similarity (float): Similarity score (1 - distance) between query and doc.
+                - similarity (float): Similarity score between query and doc (0-1).
                 - document (str): Full stored document text.
+                - vector_similarity, lexical_score (Optional[float]): The two components,
+                  with hybrid search only (None where the entry was not found by that side).
 
         Steps:
             - Generate embedding for the query using LLM service.
-            - Prepare an optional filter `where_clause` if category specified.
-            - Query the collection for nearest vectors by cosine similarity.
+            - With the NumPy backend: exact top-N search of the category's partition (or all).
+            - Otherwise: query the category's own Chroma collection, or the main collection
+              (filtered by category via `where_clause` until the categories have been split).
+            - With hybrid search: also take the best keyword (BM25) matches from the lexical
+              index and merge both rankings with reciprocal-rank fusion (`_fuse`).
             - Parse and structure results including similarity score.
-            - Return empty list on any failure or if embedding generation fails.
+            - Return empty list on any failure, or if embedding generation fails and there
+              is no keyword match either.
 
         Note:
-            - Similarity is calculated as 1 - cosine distance (closer to 1 means more similar).
+            - Semantic similarity is 1 - cosine distance (closer to 1 means more similar).
+            - With hybrid search, similarity is the larger of the semantic similarity and the
+              lexical score, so an exact keyword match can clear the agents' confidence threshold.
         """
         try:
-            embedding = await llm_service.generate_embedding(query)
-            if not embedding:
+            hybrid = self.lexical_index is not None
+            candidates = max(n_results, FUSION_CANDIDATES) if hybrid else n_results
+
+            embedding = await llm_service.generate_embedding(query, model=self.embedding_model)
+            if not embedding and not hybrid:
                 return []  # Return empty if embedding could not be generated
 
-            # Optional filter for restricting results by category
-            where_clause = {"category": category} if category else None
+            if not embedding:
+                matches = []  # Keyword matches alone can still answer
+            elif self.index is not None:
+                matches = self.index.search(embedding, category=category or None, n_results=candidates)
+            else:
+                matches = self._chroma_search(embedding, category, candidates)
 
-            # Query chromadb collection for top-N similar documents
-            results = self.collection.query(
-                query_embeddings=[embedding],
-                n_results=n_results,
-                where=where_clause
-            )
+            if hybrid:
+                lexical = self.lexical_index.search(query, category=category or None, n_results=candidates)
+                matches = self._fuse(matches, lexical)
 
-            knowledge_results = []
-            # Unpack results from chromadb format (list of lists for multiple queries)
-            for i, (doc, metadata, distance) in enumerate(zip(
-                    results['documents'][0],
-                    results['metadatas'][0],
-                    results['distances'][0]
-            )):
-                knowledge_results.append({
-                    "question": metadata.get("question", ""),
-                    "answer": metadata.get("answer", ""),
-                    "category": metadata.get("category", ""),
-                    "similarity": 1 - distance,  # Convert distance to similarity score
-                    "document": doc
-                })
-
-            return knowledge_results
+            return [{
+                "question": match.get("question", ""),
+                "answer": match.get("answer", ""),
+                "category": match.get("category", ""),
+                "similarity": match["similarity"],
+                "document": match["document"],
+                **({"vector_similarity": match["vector_similarity"], "lexical_score": match["lexical_score"]}
+                   if hybrid else {})
+            } for match in matches[:n_results]]
         except Exception as e:
             logger.error(f"Error searching knowledge: {e}")
             return []
 
+    def _chroma_search(self, embedding: List[float], category: Optional[str], n_results: int) -> List[Dict]:
+        """
+        Top-N entries from the Chroma collection, as {**metadata, "id", "document", "similarity"}.
+        """
+        collection, where_clause = self.collection, None
+        if category and self.partitions_ready:
+            # Route to the category's collection; no partition means no entries in that category
+            collection = self.partitions.get(category)
+            if collection is None:
+                return []
+        elif category:
+            # Optional filter for restricting results by category
+            where_clause = {"category": category}
+        n_results = min(n_results, collection.count())
+        if n_results == 0:
+            return []
+
+        # Query chromadb collection for top-N similar documents
+        results = collection.query(
+            query_embeddings=[embedding],
+            n_results=n_results,
+            where=where_clause
+        )
+
+        # Unpack results from chromadb format (list of lists for multiple queries)
+        return [
+            {**metadata, "id": doc_id, "document": doc, "similarity": 1 - distance}  # Convert distance to similarity score
+            for doc_id, doc, metadata, distance in zip(
+                results['ids'][0],
+                results['documents'][0],
+                results['metadatas'][0],
+                results['distances'][0]
+            )
+        ]
+
+    def _fuse(self, semantic: List[Dict], lexical: List[Dict]) -> List[Dict]:
+        """
+        Merge a semantic and a lexical ranking with reciprocal-rank fusion.
+
+        Each entry scores sum(1 / (rrf_k + rank)) over the rankings it appears in, so entries
+        found by both sides rise to the top without comparing raw scores across methods.
+        Ties are broken by similarity, which is set to max(vector similarity, lexical score).
+        """
+        fused: Dict[str, Dict] = {}
+        for rank, match in enumerate(semantic, start=1):
+            fused[match["id"]] = {**match, "vector_similarity": match["similarity"],
+                                  "lexical_score": None, "rrf": 1 / (self.rrf_k + rank)}
+        for rank, match in enumerate(lexical, start=1):
+            entry = fused.setdefault(match["id"], {**match, "vector_similarity": None, "rrf": 0.0})
+            entry["lexical_score"] = match["lexical_score"]
+            entry["rrf"] += 1 / (self.rrf_k + rank)
+
+        for entry in fused.values():
+            entry["similarity"] = max(entry["vector_similarity"] or 0.0, entry["lexical_score"] or 0.0)
+        return sorted(fused.values(), key=lambda entry: (entry["rrf"], entry["similarity"]), reverse=True)
+
 
 # Create a single instance for app-wide reuse (singleton pattern)
 vector_service = VectorService()
@@ -1,24 +1,69 @@
 # Import necessary types and Utilities
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.utils.cache import TTLCache
 from app.utils.config import settings  # For config values like API keys
 from app.utils.logger import logger  # To log info and errors
+from app.utils.singleflight import SingleFlight
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key form of a query: lower-cased with runs of whitespace collapsed.
+    """
+    return " ".join(query.lower().split())
 
 
 class WebSearchService:
-    def __init__(self):
+    def __init__(self, google_url: str, duckduckgo_url: str, google_timeout: float,
+                 duckduckgo_timeout: float, max_connections: int, cache_ttl_seconds: float,
+                 cache_size: int, api_key: Optional[str] = None, engine_id: Optional[str] = None):
         """
         Initialize WebSearchService instance.
 
-        Loads API key and search engine ID from settings config,
-        which are required to use Google Custom Search API.
+        Uses the Google Custom Search API when an API key and search engine ID are
+        configured; otherwise falls back to scraping DuckDuckGo's HTML results page.
 
-        If these are missing, service will fallback to DuckDuckGo scraping.
+        Args:
+            google_url (str): Google Custom Search endpoint.
+            duckduckgo_url (str): DuckDuckGo HTML search endpoint.
+            google_timeout (float): Seconds allowed for one Google request.
+            duckduckgo_timeout (float): Seconds allowed for one DuckDuckGo request.
+            max_connections (int): Size of the shared, keep-alive HTTP connection pool.
+            cache_ttl_seconds (float): How long results for a query are reused.
+            cache_size (int): Maximum number of queries kept in the result cache.
+            api_key (Optional[str]): Google API key.
+            engine_id (Optional[str]): Google search engine ID.
+
+        Notes:
+            - Results are cached per (provider, normalized query, number of results).
+              Failed searches are not cached.
+            - Concurrent identical searches share one upstream request.
+        """
+        self.search_api_key = api_key
+        self.search_engine_id = engine_id
+        self.google_url = google_url
+        self.duckduckgo_url = duckduckgo_url
+        self.google_timeout = google_timeout
+        self.duckduckgo_timeout = duckduckgo_timeout
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={
+                # Pretend to be a browser so the server doesn't block the request
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            },
+            follow_redirects=True
+        )
+        self.cache = TTLCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+        self.inflight = SingleFlight()
+
+    async def aclose(self):
+        """
+        Close the shared HTTP connection pool (called on application shutdown).
         """
-        self.search_api_key = settings.search_api_key
-        self.search_engine_id = settings.search_engine_id
+        await self.client.aclose()
 
     async def search_web(self, query: str, num_results: int = 5) -> List[Dict]:
         """
@@ -27,6 +72,8 @@ class WebSearchService:
         Logic:
         - If Google Custom Search API credentials are present, use Google API.
         - Otherwise, fallback to scraping DuckDuckGo HTML search results.
+        - Serve repeated queries from the result cache, and join an identical search
+          that is already in flight instead of sending a second request.
         - Handles any exceptions, logs errors, and returns empty list on failure.
 
         Args:
@@ -36,26 +83,38 @@ class WebSearchService:
         Returns:
             List[Dict]: List of search results, each with 'title', 'link', and 'snippet'.
         """
-        try:
-            # Prefer Google Custom Search API if credentials are available
-            if self.search_api_key and self.search_engine_id:
-                return await self._google_search(query, num_results)
-            else:
-                # Use DuckDuckGo scraping fallback when Google API not configured
-                return await self._duckduckgo_search(query, num_results)
-        except Exception as e:
-            # Log error but don't crash
-            logger.error(f"Error in web search: {e}")
-            return []
+        # Prefer Google Custom Search API if credentials are available
+        if self.search_api_key and self.search_engine_id:
+            provider, search = "google", self._google_search
+        else:
+            # Use DuckDuckGo scraping fallback when Google API not configured
+            provider, search = "duckduckgo", self._duckduckgo_search
+
+        normalized = normalize_query(query)
+        key = (provider, normalized, num_results)
+        results = self.cache.get(key)
+        if results is None:
+            try:
+                results = await self.inflight.do(key, lambda: self._search_and_cache(key, search, normalized, num_results))
+            except Exception as e:
+                # Log error but don't crash
+                logger.error(f"Error in web search ({provider}): {e!r}")
+                return []
+        return list(results)  # Callers get their own list; cached entries stay untouched
+
+    async def _search_and_cache(self, key: tuple, search: Callable[[str, int], Awaitable[List[Dict]]],
+                                query: str, num_results: int) -> List[Dict]:
+        results = await search(query, num_results)
+        self.cache.set(key, results)
+        return results
 
     async def _google_search(self, query: str, num_results: int) -> List[Dict]:
         """
         Performs a search using Google Custom Search API.
 
-        Builds request URL and parameters with API key, search engine ID, query, and number of results.
-        Sends HTTP GET request to Google's search endpoint.
+        Builds request parameters with API key, search engine ID, query, and number of results.
+        Sends HTTP GET request to Google's search endpoint over the shared connection pool.
         Parses JSON response and extracts relevant data (title, link, snippet) for each item.
-        Returns empty list if response is not successful or data missing.
 
         Args:
             query (str): Search query string.
@@ -63,8 +122,10 @@ class WebSearchService:
 
         Returns:
             List[Dict]: List of result dicts with 'title', 'link', 'snippet'.
+
+        Raises:
+            httpx.HTTPError: On timeouts, connection errors and non-2xx responses.
         """
-        url = "https://www.googleapis.com/customsearch/v1"
         params = {
             'key': self.search_api_key,
             'cx': self.search_engine_id,
@@ -72,19 +133,17 @@ class WebSearchService:
             'num': num_results
         }
 
-        response = requests.get(url, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            results = []
-            for item in data.get('items', []):
-                results.append({
-                    'title': item.get('title', ''),
-                    'link': item.get('link', ''),
-                    'snippet': item.get('snippet', '')
-                })
-            return results
-        # If API call failed or no data, return empty list
-        return []
+        response = await self.client.get(self.google_url, params=params, timeout=self.google_timeout)
+        response.raise_for_status()
+        data = response.json()
+        results = []
+        for item in data.get('items', []):
+            results.append({
+                'title': item.get('title', ''),
+                'link': item.get('link', ''),
+                'snippet': item.get('snippet', '')
+            })
+        return results
 
     async def _duckduckgo_search(self, query: str, num_results: int) -> List[Dict]:
         """
@@ -94,13 +153,11 @@ class WebSearchService:
         this method scrapes the HTML page returned by a DuckDuckGo search query.
 
         Steps:
-        - Build DuckDuckGo HTML search URL with the query.
-        - Send GET request with a browser-like User-Agent header to avoid blocking.
+        - Send GET request for the query (browser-like User-Agent set on the shared client).
         - Parse returned HTML content with BeautifulSoup.
         - Extract up to `num_results` search results by looking for specific HTML elements/classes.
         - For each result, extract title text, link URL, and snippet text (if available).
         - Return list of results dicts with title, link, and snippet.
-        - Handles exceptions and logs any errors encountered.
 
         Args:
             query (str): Search query string.
@@ -108,42 +165,48 @@ class WebSearchService:
 
         Returns:
             List[Dict]: List of search result dictionaries.
-        """
-        search_url = f"https://html.duckduckgo.com/html/?q={query}"
-        headers = {
-            # Pretend to be a browser so the server doesn't block the request
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-
-        try:
-            response = requests.get(search_url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                results = []
 
-                # DuckDuckGo's HTML structure uses div.result for each result
-                # We limit results to the requested number (num_results)
-                for result in soup.find_all('div', class_='result')[:num_results]:
-                    # Extract the <a> tag with class 'result__a' for the title and link
-                    title_elem = result.find('a', class_='result__a')
-                    # Extract snippet text from a <a> tag with class 'result__snippet', if available
-                    snippet_elem = result.find('a', class_='result__snippet')
-
-                    if title_elem:
-                        results.append({
-                            'title': title_elem.get_text(strip=True),
-                            'link': title_elem.get('href', ''),
-                            'snippet': snippet_elem.get_text(strip=True) if snippet_elem else ''
-                        })
+        Raises:
+            httpx.HTTPError: On timeouts, connection errors and non-2xx responses.
+        """
+        response = await self.client.get(self.duckduckgo_url, params={'q': query}, timeout=self.duckduckgo_timeout)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'html.parser')
+        results = []
+
+        # DuckDuckGo's HTML structure uses div.result for each result
+        # We limit results to the requested number (num_results)
+        for result in soup.find_all('div', class_='result')[:num_results]:
+            # Extract the <a> tag with class 'result__a' for the title and link
+            title_elem = result.find('a', class_='result__a')
+            # Extract snippet text from a <a> tag with class 'result__snippet', if available
+            snippet_elem = result.find('a', class_='result__snippet')
+
+            if title_elem:
+                results.append({
+                    'title': title_elem.get_text(strip=True),
+                    'link': title_elem.get('href', ''),
+                    'snippet': snippet_elem.get_text(strip=True) if snippet_elem else ''
+                })
 
-                return results
-        except Exception as e:
-            # Log exceptions like request timeout, parsing errors, etc.
-            logger.error(f"DuckDuckGo search error: {e}")
+        return results
 
-        # Return empty list if any failure occurs
-        return []
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return result cache and request coalescing counters.
+        """
+        return {"cache": self.cache.get_stats(), "requests": self.inflight.get_stats()}
 
 
 # Singleton instance of WebSearchService for reuse across app
-web_search_service = WebSearchService()
+web_search_service = WebSearchService(
+    google_url=settings.search_google_url,
+    duckduckgo_url=settings.search_duckduckgo_url,
+    google_timeout=settings.search_google_timeout,
+    duckduckgo_timeout=settings.search_duckduckgo_timeout,
+    max_connections=settings.search_max_connections,
+    cache_ttl_seconds=settings.search_cache_ttl_seconds,
+    cache_size=settings.search_cache_size,
+    api_key=settings.search_api_key,
+    engine_id=settings.search_engine_id
+)
@@ -15,6 +15,9 @@ st.set_page_config(
 # Base URL of the backend API the app communicates with
 API_BASE = "http://localhost:8000"
 
+# Largest page /tickets/all serves; "View All Tickets" follows the cursor across pages
+TICKETS_PAGE_SIZE = 200
+
 
 def init_session_state():
     """
@@ -115,6 +118,75 @@ def send_message(message: str, user_id: str, session_id: str):
         return None
 
 
+def stream_message(message: str, user_id: str, session_id: str, status, placeholder):
+    """
+    Send a user message to the streaming chat endpoint (/chat/stream) and render
+    progress as Server-Sent Events arrive:
+      - agent / kb_hit / cache_hit / web_search / ticket: short status line above the answer
+      - token: generated text appended to the placeholder as it is produced
+      - message: final response JSON (same shape as /chat), returned to the caller
+    Returns None on failure (401 forces logout, like send_message).
+    """
+    try:
+        headers = {}
+        if st.session_state.access_token:
+            headers["Authorization"] = f"Bearer {st.session_state.access_token}"
+
+        with requests.post(
+            f"{API_BASE}/chat/stream",
+            json={
+                "content": message,
+                "user_id": user_id,
+                "session_id": session_id
+            },
+            headers=headers,
+            stream=True,
+            timeout=(5, 300)
+        ) as response:
+            if response.status_code == 401:
+                st.error("Session expired. Please login again.")
+                logout()
+                return None
+            elif response.status_code != 200:
+                st.error(f"Error: {response.status_code}")
+                return None
+
+            text = ""
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                    continue
+                if not line.startswith("data:"):
+                    continue
+
+                data = json.loads(line[len("data:"):])
+                if event == "agent":
+                    status.caption(f"*Routing to {data['agent']} agent...*")
+                elif event == "kb_hit":
+                    status.caption("*Found a match in the knowledge base...*")
+                elif event == "cache_hit":
+                    status.caption("*Found an answer to a similar recent question...*")
+                elif event == "web_search":
+                    status.caption(f"*Reviewing {data['results']} web results...*")
+                elif event == "token":
+                    # Show the answer growing with a cursor while it is generated
+                    text += data["text"]
+                    placeholder.markdown(text + "▌")
+                elif event == "ticket":
+                    status.caption(f"*Creating ticket #{data['ticket_id']}...*")
+                elif event == "message":
+                    status.empty()
+                    return data
+                elif event == "error":
+                    st.error(data.get("detail", "Failed to get response"))
+                    return None
+        return None
+    except Exception as e:
+        st.error(f"Connection error: {e}")
+        return None
+
+
 def get_analytics():
     """
     Fetch dashboard analytics data from the API.
@@ -141,7 +213,8 @@ def get_analytics():
 def get_all_tickets():
     """
     For support engineers only.
-    Fetch all tickets from the backend.
+    Fetch all tickets from the backend, following the X-Next-Cursor header
+    page by page (the endpoint returns at most one page per request).
     Returns list of tickets or None if failure.
     """
     try:
@@ -149,14 +222,21 @@ def get_all_tickets():
         if st.session_state.access_token:
             headers["Authorization"] = f"Bearer {st.session_state.access_token}"
         
-        response = requests.get(
-            f"{API_BASE}/tickets/all",
-            headers=headers
-        )
-        if response.status_code == 200:
-            return response.json()
-        else:
-            return None
+        tickets = []
+        params = {"limit": TICKETS_PAGE_SIZE}
+        while True:
+            response = requests.get(
+                f"{API_BASE}/tickets/all",
+                params=params,
+                headers=headers
+            )
+            if response.status_code != 200:
+                return None
+            tickets.extend(response.json())
+            next_cursor = response.headers.get("X-Next-Cursor")
+            if not next_cursor:
+                return tickets
+            params["cursor"] = next_cursor
     except Exception as e:
         return None
 
@@ -370,32 +450,37 @@ def chat_page():
         with st.chat_message("user"):
             st.write(prompt)
 
-        # Send message to backend and get assistant response
+        # Stream the assistant response from the backend, rendering it as it is generated
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                response = send_message(
-                    prompt,
-                    st.session_state.user_id,
-                    st.session_state.session_id
-                )
-
-                if response:
-                    # Show assistant's response text
-                    st.write(response["response"])
-                    st.caption(f"*Handled by: {response['agent']} agent*")
-
-                    # Save assistant message in session state history
-                    st.session_state.messages.append({
-                        "role": "assistant",
-                        "content": response["response"],
-                        "agent": response["agent"]
-                    })
-
-                    # Show ticket creation info if any
-                    if response.get("ticket_id"):
-                        st.info(f"🎫 Ticket #{response['ticket_id']} created")
-                else:
-                    st.error("Failed to get response")
+            status = st.empty()
+            placeholder = st.empty()
+            status.caption("*Thinking...*")
+            response = stream_message(
+                prompt,
+                st.session_state.user_id,
+                st.session_state.session_id,
+                status,
+                placeholder
+            )
+
+            if response:
+                # Replace the streamed preview with the final formatted response
+                placeholder.write(response["response"])
+                st.caption(f"*Handled by: {response['agent']} agent*")
+
+                # Save assistant message in session state history
+                st.session_state.messages.append({
+                    "role": "assistant",
+                    "content": response["response"],
+                    "agent": response["agent"]
+                })
+
+                # Show ticket creation info if any
+                if response.get("ticket_id"):
+                    st.info(f"🎫 Ticket #{response['ticket_id']} created")
+            else:
+                status.empty()
+                st.error("Failed to get response")
 
 
 def main():
@@ -114,29 +114,42 @@ def get_analytics():
         return None
 
 
-def get_all_tickets():
+# Number of tickets shown per page in the support engineer view
+TICKETS_PAGE_SIZE = 25
+
+
+def get_all_tickets(filters: dict, cursor: str = None):
     """
-    Fetch all tickets for support engineers.
+    Fetch one page of tickets for support engineers.
     Requires Authorization header.
     
+    Args:
+        filters (dict): Query filters (e.g. {"status": "open", "category": "HR"}).
+        cursor (str, optional): Cursor of the page to fetch; None for the first page.
+        
     Returns:
-        List of tickets JSON or None on failure.
+        (tickets JSON, next page cursor or None), or (None, None) on failure.
     """
     try:
         headers = {}
         if st.session_state.access_token:
             headers["Authorization"] = f"Bearer {st.session_state.access_token}"
         
+        params = {"limit": TICKETS_PAGE_SIZE, **filters}
+        if cursor:
+            params["cursor"] = cursor
+        
         response = requests.get(
             f"{API_BASE}/tickets/all",
+            params=params,
             headers=headers
         )
         if response.status_code == 200:
-            return response.json()
+            return response.json(), response.headers.get("X-Next-Cursor")
         else:
-            return None
+            return None, None
     except Exception:
-        return None
+        return None, None
 
 
 def update_ticket_status(ticket_id: int, status: str):
@@ -347,11 +360,34 @@ def dashboard_page():
     if st.session_state.user_info['role'] == 'support-engineer':
         st.markdown("### 🔧 Support Engineer Tools")
         
-        # Fetch all tickets to display
-        tickets = get_all_tickets()
+        # Server-side filters; changing them starts again from the first page
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status_filter = st.selectbox("Status", ["All", "open", "in_progress", "resolved"])
+        with col2:
+            category_filter = st.selectbox(
+                "Category", ["All", "IT_HARDWARE", "IT_SOFTWARE", "HR", "ACCOUNTING", "GENERAL"]
+            )
+        with col3:
+            order = st.selectbox("Sort", ["Newest first", "Oldest first"])
+        
+        filters = {"order": "desc" if order == "Newest first" else "asc"}
+        if status_filter != "All":
+            filters["status"] = status_filter
+        if category_filter != "All":
+            filters["category"] = category_filter
+        
+        # Cursors of the pages visited so far, so "Previous" can step back
+        if st.session_state.get("ticket_filters") != filters:
+            st.session_state.ticket_filters = filters
+            st.session_state.ticket_cursors = [None]
+        
+        # Fetch the current page of tickets to display
+        tickets, next_cursor = get_all_tickets(filters, st.session_state.ticket_cursors[-1])
+        page = len(st.session_state.ticket_cursors)
         
         if tickets:
-            st.markdown(f"#### All Tickets ({len(tickets)})")
+            st.markdown(f"#### Tickets (page {page})")
             
             # Display tickets in expandable sections for detail and status update
             for idx, ticket in enumerate(tickets):
@@ -389,8 +425,19 @@ def dashboard_page():
                             else:
                                 st.info("Status unchanged")
             
-            # Summary statistics for support engineers by ticket status
-            st.markdown("#### Support Statistics")
+            # Page navigation
+            col1, col2, _ = st.columns([1, 1, 4])
+            with col1:
+                if st.button("◀ Previous", disabled=page == 1):
+                    st.session_state.ticket_cursors.pop()
+                    st.rerun()
+            with col2:
+                if st.button("Next ▶", disabled=next_cursor is None):
+                    st.session_state.ticket_cursors.append(next_cursor)
+                    st.rerun()
+            
+            # Summary statistics for support engineers by ticket status (current page)
+            st.markdown("#### Support Statistics (this page)")
             col1, col2, col3 = st.columns(3)
             
             status_counts = {}
@@ -8,14 +8,166 @@ class Settings(BaseSettings):
     # URL for the database connection; defaulting to a local SQLite database file.
     database_url: str = "sqlite:///./helpdesk.db"
     
+    # Optional read-only connection URL for analytics and listing queries (e.g. a replica).
+    # For SQLite, a read-only URI to the same file works well with WAL:
+    #   sqlite:///file:./helpdesk.db?mode=ro&uri=true
+    # When unset, reads use the primary database.
+    database_read_url: Optional[str] = None
+
+    # Connection pool sizing: persistent connections, extra burst connections,
+    # and how long (seconds) a request waits for a free connection.
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+
+    # SQLite tuning applied to every new connection. WAL lets readers proceed while a write
+    # is in progress; synchronous=NORMAL is durable across application crashes in WAL mode.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+
+    # Bytes of the database file memory-mapped for reads (0 disables mmap).
+    sqlite_mmap_size: int = 268435456
+
+    # Page cache per connection; negative values are KiB (-65536 = 64 MiB).
+    sqlite_cache_size: int = -65536
+
+    # How long (milliseconds) a connection waits on a locked database before failing.
+    sqlite_busy_timeout_ms: int = 5000
+
+    # Number of worker threads that run blocking database calls for the async API.
+    # Bounds how many DB operations run at once; extra calls queue instead of blocking the event loop.
+    db_executor_workers: int = 8
+    
+    # Chat logs are written in the background in batches: a batch is flushed once it holds
+    # this many rows or this many milliseconds after its first row, whichever comes first.
+    chat_log_batch_size: int = 100
+    chat_log_flush_interval_ms: int = 250
+
+    # Maximum chat log rows waiting to be written, and what to do when that many are queued:
+    # "block" makes the chat turn wait for space, "drop" discards the row (counted in /metrics).
+    chat_log_queue_size: int = 10000
+    chat_log_overflow_policy: str = "block"
+
+    # Authenticated requests reuse decoded tokens and user records for up to this many seconds
+    # instead of querying the users table each time. Deactivation and role changes made through
+    # AuthService take effect immediately; changes made elsewhere within this window.
+    auth_cache_ttl_seconds: float = 60.0
+
+    # Maximum users and decoded tokens held by the authentication caches.
+    auth_user_cache_size: int = 10000
+    auth_token_cache_size: int = 10000
+    
     # Base URL for the Ollama API (likely an LLM or AI model server endpoint).
     ollama_base_url: str = "http://localhost:11434"
     
     # Name or identifier of the Ollama model to be used.
     ollama_model: str = "qwen2.5:14b"
+
+    # Ollama model used for embeddings (knowledge base search, response cache). A small dedicated
+    # embedding model is far cheaper per lookup than the chat model. The knowledge base keeps using
+    # the model it was built with until it is re-embedded: python reembed_knowledge.py
+    embedding_model: str = "nomic-embed-text"
+
+    # Texts sent per /api/embed request when embedding in bulk.
+    embedding_batch_size: int = 32
+
+    # Per-call timeout (seconds) for chat generations sent to Ollama.
+    ollama_timeout: float = 120.0
+
+    # Per-call timeout (seconds) for embedding requests sent to Ollama.
+    ollama_embedding_timeout: float = 30.0
+
+    # Maximum number of Ollama requests allowed in flight at once per API worker.
+    # Extra calls wait their turn instead of overloading the model server.
+    ollama_max_concurrency: int = 8
+
+    # Size of the shared HTTP connection pool used for all Ollama requests.
+    ollama_max_connections: int = 32
     
+    # Persistent embedding cache (SQLite file). Set to an empty string to keep the cache in memory only.
+    embedding_cache_path: str = "./embedding_cache.db"
+
+    # Number of embeddings kept in the in-memory LRU tier of the embedding cache.
+    embedding_cache_memory_size: int = 10000
+
+    # New embeddings are written to the persistent cache in batches of this many rows (one commit each)...
+    embedding_cache_write_batch_size: int = 64
+
+    # ...or after this many seconds, whichever comes first.
+    embedding_cache_write_interval: float = 5.0
+
+    # Trained local intent classifier (see train_intent_classifier.py). Ignored if the file does not exist.
+    intent_model_path: str = "./intent_model.json"
+
+    # Minimum local classifier confidence needed to skip the LLM classification call.
+    intent_confidence_threshold: float = 0.85
+
+    # Semantic response cache: generated HR/Accounting answers and IT follow-up questions are
+    # reused for new questions whose embedding is at least this similar (cosine) to a cached one.
+    response_cache_enabled: bool = True
+    response_cache_similarity: float = 0.95
+
+    # Cached answers expire after this many seconds; each category keeps at most this many.
+    response_cache_ttl_seconds: int = 3600
+    response_cache_max_entries: int = 500
+
+    # Where chat session state is kept: "memory" (per-process LRU), "sqlite" or "redis".
+    # Use "sqlite" or "redis" when running more than one API worker.
+    session_backend: str = "memory"
+
+    # Idle sessions expire after this many seconds.
+    session_ttl_seconds: int = 3600
+
+    # Maximum number of sessions held by the in-memory backend (least recently used are evicted).
+    session_max_sessions: int = 10000
+
+    # Per-session caps: only the most recent messages are kept, within a byte budget.
+    session_max_messages: int = 40
+    session_max_bytes: int = 262144
+
+    # SQLite file used by the "sqlite" session backend.
+    session_sqlite_path: str = "./sessions.db"
+
+    # Server URL used by the "redis" session backend.
+    session_redis_url: str = "redis://localhost:6379/0"
+
     # Directory path where Chroma vector database or embeddings will be persisted.
     chroma_persist_directory: str = "./chroma_db"
+
+    # Knowledge-base search backend: "chroma" queries the Chroma collection; "numpy" serves
+    # searches from an in-process index of memory-mapped NumPy matrices (one per category),
+    # kept in sync with Chroma and rebuilt from it at startup when they differ.
+    vector_backend: str = "chroma"
+
+    # Directory holding the "numpy" backend's index files.
+    vector_index_directory: str = "./vector_index"
+
+    # Compact storage for the "numpy" backend. Vectors scanned per query are kept as "float32",
+    # "float16" or "int8", optionally reduced to VECTOR_INDEX_DIMENSIONS dimensions (0 keeps all)
+    # by "truncate" (Matryoshka embedding models such as nomic-embed-text v1.5) or "pca".
+    # See `python -m benchmarks.vector_quantization` for recall vs. memory on your knowledge base.
+    vector_index_dtype: str = "float32"
+    vector_index_dimensions: int = 0
+    vector_index_reduction: str = "truncate"
+
+    # With compact vectors, this many candidates per result are re-scored against full-precision
+    # vectors (kept on disk, read only for the candidates). 0 disables re-ranking.
+    vector_index_rerank_factor: int = 4
+
+    # Keep a Chroma collection per category next to the all-categories collection, so a category
+    # search only walks that category's HNSW graph instead of filtering the whole knowledge base.
+    # Existing knowledge bases are split once with: python split_knowledge.py
+    vector_partition_by_category: bool = True
+
+    # Hybrid knowledge-base search: a BM25 keyword index (SQLite FTS5) over questions and answers is
+    # searched alongside the embeddings and the two rankings are merged (reciprocal-rank fusion), so
+    # exact-term queries like "VPN error 809" find their article. Empty path keeps the index in memory.
+    kb_hybrid_search: bool = True
+    kb_lexical_index_path: str = "./kb_lexical.db"
+
+    # Reciprocal-rank fusion constant k (score = sum of 1 / (k + rank)); larger values flatten
+    # the advantage of the very top ranks.
+    kb_rrf_k: int = 60
     
     # Optional API key for a search service (e.g., Google Custom Search or similar).
     # This is optional and can be None if not provided.
@@ -23,6 +175,26 @@ class Settings(BaseSettings):
     
     # Optional search engine identifier for the search service.
     search_engine_id: Optional[str] = None
+
+    # Web search endpoints: Google Custom Search (used when the key and engine ID are set)
+    # and the DuckDuckGo HTML page used as the fallback.
+    search_google_url: str = "https://www.googleapis.com/customsearch/v1"
+    search_duckduckgo_url: str = "https://html.duckduckgo.com/html/"
+
+    # Per-provider request timeouts (seconds); a slow provider returns no results instead of stalling the turn.
+    search_google_timeout: float = 5.0
+    search_duckduckgo_timeout: float = 8.0
+
+    # Size of the shared HTTP connection pool used for web searches.
+    search_max_connections: int = 10
+
+    # Search results are cached per normalized query for this many seconds, up to this many queries.
+    search_cache_ttl_seconds: int = 3600
+    search_cache_size: int = 1000
+
+    # Time budget (seconds) for the IT agent's retrieval stage, where the knowledge base and
+    # web search run side by side. Whatever has not returned by then is treated as no results.
+    it_retrieval_budget_seconds: float = 10.0
     
     # Logging level for the application (e.g., DEBUG, INFO, WARNING).
     log_level: str = "INFO"
@@ -0,0 +1,22 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from app.utils.config import settings
+
+# Bounded pool dedicated to synchronous SQLAlchemy work. Keeping it separate from the
+# default executor means slow queries cannot starve other to_thread users (and vice versa).
+_executor = ThreadPoolExecutor(max_workers=settings.db_executor_workers, thread_name_prefix="db")
+
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking database call (e.g. a TicketService or AuthService method) in the DB
+    thread pool and await its result, so the event loop keeps serving other requests.
+
+    Example:
+        tickets = await run_db(ticket_service.get_user_tickets, user_id)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
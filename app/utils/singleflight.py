@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent async calls that share a key into one execution.
+
+    - The first caller for a key starts the work; callers arriving while it is still
+      running await the same result (or exception) instead of starting their own.
+    - Once the work finishes the key is released, so later calls run it again
+      (pair with a cache to reuse results beyond the in-flight window).
+    - A waiter being cancelled does not cancel the shared work for the others, but when
+      the last waiter is cancelled the work is cancelled too, so abandoned requests (e.g. a
+      streaming client that disconnected) stop instead of running to completion.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}  # Callers still awaiting each task
+        self.stats = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the result of `fn()`, sharing one execution among concurrent callers with `key`.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.stats["calls"] += 1
+        else:
+            self.stats["shared"] += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Every waiter was cancelled: nobody wants the result any more. Release
+                    # the key now so a new caller starts fresh work instead of joining this.
+                    if self._inflight.get(key) is task:
+                        del self._inflight[key]
+                    task.cancel()
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark as retrieved even if every waiter was cancelled
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return executions started, calls that joined one already in flight, and keys in flight.
+        """
+        return {**self.stats, "in_flight": len(self._inflight)}
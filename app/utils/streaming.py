@@ -0,0 +1,25 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+# Queue of events for the chat request currently being streamed (None when not streaming).
+# A ContextVar lets agents deep inside the workflow publish events without threading
+# the queue through every function signature.
+current_stream: ContextVar[Optional[asyncio.Queue]] = ContextVar("current_stream", default=None)
+
+
+def is_streaming() -> bool:
+    """
+    True when the current request is a streaming (SSE) chat request.
+    """
+    return current_stream.get() is not None
+
+
+def emit(event: str, data: Dict[str, Any]):
+    """
+    Publish an event (e.g. "agent", "kb_hit", "token", "ticket") to the streaming client, if any.
+    Does nothing for regular, non-streaming requests.
+    """
+    queue = current_stream.get()
+    if queue is not None:
+        queue.put_nowait({"event": event, "data": data})
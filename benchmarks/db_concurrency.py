@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent API throughput with database calls on vs. off the event loop.
+
+Usage:
+    python -m benchmarks.db_concurrency
+    python -m benchmarks.db_concurrency --tickets 50000 --users 200 --concurrency 64
+
+Runs the real FastAPI app in-process against a throwaway SQLite database seeded with
+tickets, and fires concurrent GET /tickets/user/{id} requests while a heartbeat task
+measures event-loop lag (how late a 5 ms sleep wakes up).
+
+    before: DB calls run inline on the event loop (the old behaviour)
+    after:  DB calls go through the bounded run_db thread pool
+
+Reported per mode: ticket requests/sec and loop lag (p50/p99/max). Loop lag is the
+delay every other in-flight request (chat turns, health checks, SSE streams) sees
+while a database call holds the loop.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+# Point the app at a scratch database before anything under app/ is imported
+_tmpdir = tempfile.mkdtemp(prefix="helpdesk_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+import httpx
+import app.main as api
+from app.models.database import SessionLocal, Ticket
+
+CATEGORIES = ["IT_HARDWARE", "IT_SOFTWARE", "HR", "ACCOUNTING", "GENERAL"]
+
+
+async def run_inline(fn, *args, **kwargs):
+    # Reproduces the pre-executor behaviour: the sync call blocks the event loop
+    return fn(*args, **kwargs)
+
+
+def seed(n_tickets, n_users):
+    db = SessionLocal()
+    try:
+        db.bulk_save_objects([
+            Ticket(
+                user_id=f"user{i % n_users}",
+                category=CATEGORIES[i % len(CATEGORIES)],
+                title=f"Benchmark ticket {i}",
+                description="Generated by benchmarks/db_concurrency.py " * 4,
+                priority="medium",
+                status="open" if i % 3 else "resolved"
+            )
+            for i in range(n_tickets)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_mode(args):
+    transport = httpx.ASGITransport(app=api.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        lags = []
+        done = asyncio.Event()
+
+        async def ticket_request(i):
+            async with semaphore:
+                response = await client.get(f"/tickets/user/user{i % args.users}")
+                response.raise_for_status()
+
+        async def heartbeat():
+            # Anything beyond the requested 5 ms is time the loop spent unable to run us
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lags.append((time.perf_counter() - start - 0.005) * 1000)
+
+        probe = asyncio.create_task(heartbeat())
+        start = time.perf_counter()
+        await asyncio.gather(*[ticket_request(i) for i in range(args.requests)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe
+
+    lags.sort()
+    return {
+        "rps": args.requests / elapsed,
+        "p50": statistics.median(lags),
+        "p99": lags[min(int(len(lags) * 0.99), len(lags) - 1)],
+        "max": lags[-1]
+    }
+
+
+async def main(args):
+    print(f"Seeding {args.tickets} tickets for {args.users} users in {_tmpdir}...")
+    seed(args.tickets, args.users)
+
+    results = {}
+    for mode, runner in [("before (inline)", run_inline), ("after (run_db)", api.run_db)]:
+        api.run_db = runner
+        await run_mode(args)  # Warm-up
+        results[mode] = await run_mode(args)
+
+    print(f"\n{args.requests} requests, concurrency {args.concurrency}\n")
+    print(f"{'mode':<18}{'req/s':>10}{'lag p50 ms':>13}{'lag p99 ms':>13}{'lag max ms':>13}")
+    for mode, r in results.items():
+        print(f"{mode:<18}{r['rps']:>10.1f}{r['p50']:>13.2f}{r['p99']:>13.2f}{r['max']:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DB calls on vs. off the event loop")
+    parser.add_argument("--tickets", type=int, default=20000, help="Tickets to seed")
+    parser.add_argument("--users", type=int, default=1000, help="Distinct ticket owners")
+    parser.add_argument("--requests", type=int, default=1000, help="Ticket requests per mode")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    asyncio.run(main(parser.parse_args()))
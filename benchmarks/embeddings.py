@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: embedding latency and throughput, chat model vs. dedicated embedding model,
+one text per request vs. batched /api/embed requests.
+
+Usage:
+    python -m benchmarks.embeddings
+    python -m benchmarks.embeddings --texts 512 --batch-size 64 --chat-model qwen2.5:14b
+
+Needs a running Ollama server (OLLAMA_BASE_URL) with both models pulled. The embedding
+cache is disabled and every text is unique, so each number is a real Ollama round-trip.
+
+    single:  one request per text, sent sequentially (the cost of one KB lookup)
+    batched: llm_service.generate_embeddings, `--batch-size` texts per request, sent sequentially
+
+Reported per model and mode: per-request latency (p50/p99) and texts/sec.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Keep the embedding cache in memory and empty so no lookup is served from it
+os.environ["EMBEDDING_CACHE_PATH"] = ""
+
+from app.services.embedding_cache import EmbeddingCache
+from app.services.llm_service import llm_service
+from app.utils.config import settings
+
+TOPICS = ["printer jams", "VPN disconnects", "Outlook crashes", "laptop will not boot", "password reset",
+          "expense report rejected", "payroll question", "vacation balance", "Wi-Fi is slow", "MFA prompt loops"]
+
+
+def make_texts(n, run):
+    return [f"[{run}-{i}] My {TOPICS[i % len(TOPICS)]} again after the update, what should I try first?"
+            for i in range(n)]
+
+
+def reset_cache():
+    llm_service.embedding_cache = EmbeddingCache(path=None, max_memory_entries=100000)
+
+
+async def run_single(model, texts):
+    latencies = []
+    started = time.perf_counter()
+    for text in texts:
+        request_started = time.perf_counter()
+        vector = await llm_service.generate_embedding(text, model=model)
+        if not vector:
+            raise RuntimeError(f"Embedding with '{model}' failed; is it pulled?")
+        latencies.append((time.perf_counter() - request_started) * 1000)
+    return latencies, len(texts) / (time.perf_counter() - started)
+
+
+async def run_batched(model, texts, batch_size):
+    settings.embedding_batch_size = batch_size
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        request_started = time.perf_counter()
+        vectors = await llm_service.generate_embeddings(texts[start:start + batch_size], model=model)
+        if not all(vectors):
+            raise RuntimeError(f"Batch embedding with '{model}' failed; is it pulled?")
+        latencies.append((time.perf_counter() - request_started) * 1000)
+    return latencies, len(texts) / (time.perf_counter() - started)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+async def main(args):
+    models = [("chat", args.chat_model), ("embedding", args.embedding_model)]
+    print(f"{args.texts} texts per run, batch size {args.batch_size}, Ollama at {settings.ollama_base_url}\n")
+
+    results = []
+    for label, model in models:
+        reset_cache()
+        await llm_service.generate_embedding("warm-up", model=model)  # Load the model first
+        for mode in ("single", "batched"):
+            reset_cache()
+            texts = make_texts(args.texts if mode == "batched" else args.single_texts, f"{model}-{mode}")
+            if mode == "single":
+                latencies, rate = await run_single(model, texts)
+            else:
+                latencies, rate = await run_batched(model, texts, args.batch_size)
+            dims = len(await llm_service.generate_embedding(texts[0], model=model))
+            results.append((f"{label} ({model})", mode, dims, statistics.median(latencies),
+                            percentile(latencies, 99), rate))
+
+    print(f"{'model':<34}{'mode':<9}{'dims':>6}{'req p50 ms':>12}{'req p99 ms':>12}{'texts/s':>10}")
+    for name, mode, dims, p50, p99, rate in results:
+        print(f"{name:<34}{mode:<9}{dims:>6}{p50:>12.1f}{p99:>12.1f}{rate:>10.1f}")
+    await llm_service.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark embedding latency and throughput")
+    parser.add_argument("--chat-model", default=settings.ollama_model, help="Chat model (the old embedding source)")
+    parser.add_argument("--embedding-model", default=settings.embedding_model, help="Dedicated embedding model")
+    parser.add_argument("--texts", type=int, default=256, help="Texts embedded in batched mode")
+    parser.add_argument("--single-texts", type=int, default=32, help="Texts embedded one per request")
+    parser.add_argument("--batch-size", type=int, default=32, help="Texts per /api/embed request")
+    asyncio.run(main(parser.parse_args()))
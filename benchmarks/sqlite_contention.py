@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dashboard-style reads while chat logs are being written, default vs. tuned SQLite profile.
+
+Usage:
+    python -m benchmarks.sqlite_contention
+    python -m benchmarks.sqlite_contention --seconds 10 --readers 8 --rows-per-commit 20
+
+For each profile a fresh database is seeded with tickets. One writer thread commits
+batches of chat log rows (like the write-behind chat log writer) while reader threads
+run the /analytics/dashboard and /tickets/all queries.
+
+    default: SQLite defaults (rollback journal, synchronous=FULL), same connection pool
+    tuned:   create_db_engine() with the PRAGMAs from settings (WAL, synchronous=NORMAL, mmap, cache)
+
+Reported per profile: read latency (p50/p99/max), reads/sec and write commits/sec.
+In rollback-journal mode readers stall whenever the writer commits; in WAL mode they do not.
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+# Point the app at a scratch database before anything under app/ is imported
+_tmpdir = tempfile.mkdtemp(prefix="helpdesk_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/app.db"
+
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from app.models.database import Base, Ticket, ChatLog, create_db_engine
+
+CATEGORIES = ["IT_HARDWARE", "IT_SOFTWARE", "HR", "ACCOUNTING", "GENERAL"]
+
+
+def seed(session_factory, n_tickets):
+    db = session_factory()
+    try:
+        db.bulk_save_objects([
+            Ticket(
+                user_id=f"user{i % 500}",
+                category=CATEGORIES[i % len(CATEGORIES)],
+                title=f"Benchmark ticket {i}",
+                description="Generated by benchmarks/sqlite_contention.py",
+                status="open" if i % 3 else "resolved"
+            )
+            for i in range(n_tickets)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def dashboard_read(db):
+    # Same queries as TicketService.get_dashboard_stats plus an open-ticket listing
+    db.query(Ticket).count()
+    db.query(Ticket).filter(Ticket.status == "open").count()
+    db.query(Ticket.category, func.count(Ticket.id)).group_by(Ticket.category).all()
+    db.query(Ticket.id, Ticket.title).filter(Ticket.status == "open").limit(200).all()
+
+
+def run_profile(name, pragmas, args):
+    url = f"sqlite:///{_tmpdir}/{name}.db"
+    engine = create_db_engine(url, pragmas=pragmas)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    seed(session_factory, args.tickets)
+
+    stop = threading.Event()
+    latencies = []
+    commits = [0]
+    lock = threading.Lock()
+
+    def writer():
+        db = session_factory()
+        try:
+            while not stop.is_set():
+                db.add_all([
+                    ChatLog(session_id="bench", user_message="printer jam",
+                            agent_response="Try reseating the tray", agent_type="it_support")
+                    for _ in range(args.rows_per_commit)
+                ])
+                db.commit()
+                commits[0] += 1
+        finally:
+            db.close()
+
+    def reader():
+        while not stop.is_set():
+            db = session_factory()
+            try:
+                start = time.perf_counter()
+                dashboard_read(db)
+                elapsed = (time.perf_counter() - start) * 1000
+            finally:
+                db.close()
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies) / args.seconds,
+        "writes": commits[0] / args.seconds,
+        "p50": statistics.median(latencies),
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+        "max": latencies[-1]
+    }
+
+
+def main(args):
+    print(f"Profiles run for {args.seconds}s each: 1 writer ({args.rows_per_commit} rows/commit), "
+          f"{args.readers} readers, {args.tickets} tickets  [{_tmpdir}]\n")
+    results = {
+        "default": run_profile("default", {}, args),
+        "tuned": run_profile("tuned", None, args)
+    }
+
+    print(f"{'profile':<10}{'reads/s':>10}{'commits/s':>11}{'read p50 ms':>13}{'read p99 ms':>13}{'read max ms':>13}")
+    for name, r in results.items():
+        print(f"{name:<10}{r['reads']:>10.1f}{r['writes']:>11.1f}{r['p50']:>13.2f}{r['p99']:>13.2f}{r['max']:>13.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark SQLite read latency under concurrent writes")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Run time per profile")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent reader threads")
+    parser.add_argument("--rows-per-commit", type=int, default=10, help="Chat log rows per write transaction")
+    parser.add_argument("--tickets", type=int, default=5000, help="Tickets to seed")
+    main(parser.parse_args())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark: knowledge-base search latency, Chroma (one collection or one per category)
+vs. the in-process NumPy index.
+
+Usage:
+    python -m benchmarks.vector_index
+    python -m benchmarks.vector_index --entries 20000 --dimension 768 --queries 500
+
+All backends are loaded with the same synthetic entries (random unit vectors spread
+over a few categories, like the knowledge base's IT/HR/ACCOUNTING split) in throwaway
+directories, then answer the same queries. No Ollama is needed: query vectors are
+generated too, so only the search itself is timed.
+
+    chroma:       one persistent Chroma collection, HNSW (cosine) with a `where` category filter
+    chroma-split: one Chroma collection per category, queried without a filter
+    numpy:        NumpyVectorIndex, one matrix-vector product over the category's partition
+
+Reported per backend, with and without a category filter: search latency (p50/p99)
+and recall@k against exact search (Chroma's HNSW is approximate).
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+import chromadb
+import numpy as np
+from chromadb.config import Settings as ChromaSettings
+from app.services.vector_index import NumpyVectorIndex
+
+CATEGORIES = ["IT", "HR", "ACCOUNTING", "GENERAL"]
+
+
+def make_entries(n, dimension, rng):
+    vectors = rng.standard_normal((n, dimension), dtype=np.float32)
+    ids = [f"doc{i}" for i in range(n)]
+    metadatas = [{"category": CATEGORIES[i % len(CATEGORIES)], "question": f"Question {i}", "answer": f"Answer {i}"}
+                 for i in range(n)]
+    return ids, vectors, metadatas
+
+
+def exact_top_k(vectors, categories, query, category, k):
+    units = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = units @ (query / np.linalg.norm(query))
+    if category is not None:
+        scores = np.where(categories == category, scores, -np.inf)
+    return {f"doc{i}" for i in np.argsort(-scores)[:k]}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def main(args):
+    rng = np.random.default_rng(42)
+    ids, vectors, metadatas = make_entries(args.entries, args.dimension, rng)
+    documents = [f"Q: {m['question']}\nA: {m['answer']}" for m in metadatas]
+    categories = np.array([m["category"] for m in metadatas])
+    queries = rng.standard_normal((args.queries, args.dimension), dtype=np.float32)
+    workdir = tempfile.mkdtemp(prefix="helpdesk_vector_bench_")
+
+    try:
+        started = time.perf_counter()
+        client = chromadb.PersistentClient(path=f"{workdir}/chroma", settings=ChromaSettings(anonymized_telemetry=False))
+        collection = client.create_collection(name="bench", metadata={"hnsw:space": "cosine"})
+        for start in range(0, args.entries, 5000):
+            end = start + 5000
+            collection.add(ids=ids[start:end], embeddings=vectors[start:end].tolist(),
+                           documents=documents[start:end], metadatas=metadatas[start:end])
+        chroma_build = time.perf_counter() - started
+
+        partitions = {}
+        for category in CATEGORIES:
+            rows = [i for i, metadata in enumerate(metadatas) if metadata["category"] == category]
+            partitions[category] = client.create_collection(name=f"bench_{category.lower()}",
+                                                            metadata={"hnsw:space": "cosine"})
+            for start in range(0, len(rows), 5000):
+                chunk = rows[start:start + 5000]
+                partitions[category].add(ids=[ids[i] for i in chunk], embeddings=vectors[chunk].tolist(),
+                                         documents=[documents[i] for i in chunk],
+                                         metadatas=[metadatas[i] for i in chunk])
+
+        started = time.perf_counter()
+        index = NumpyVectorIndex(f"{workdir}/index")
+        index.reset("bench")
+        entries = [{**metadata, "document": document} for metadata, document in zip(metadatas, documents)]
+        for start in range(0, args.entries, 5000):
+            end = start + 5000
+            index.upsert(ids[start:end], vectors[start:end], entries[start:end])
+        numpy_build = time.perf_counter() - started
+
+        def chroma_search(query, category):
+            result = collection.query(query_embeddings=[query.tolist()], n_results=args.k,
+                                      where={"category": category} if category else None)
+            return result["ids"][0]
+
+        def chroma_split_search(query, category):
+            if category is None:
+                return chroma_search(query, None)  # The all-categories collection
+            return partitions[category].query(query_embeddings=[query.tolist()], n_results=args.k)["ids"][0]
+
+        def numpy_search(query, category):
+            return [match["id"] for match in index.search(query.tolist(), category=category, n_results=args.k)]
+
+        print(f"{args.entries} entries x {args.dimension} dims in {len(CATEGORIES)} categories, "
+              f"{args.queries} queries, k={args.k}")
+        print(f"build: chroma {chroma_build:.1f}s, numpy {numpy_build:.1f}s\n")
+        print(f"{'backend':<14}{'filter':<10}{'p50 ms':>10}{'p99 ms':>10}{'recall@k':>10}")
+        for category in (CATEGORIES[0], None):
+            backends = [("chroma", chroma_search), ("chroma-split", chroma_split_search), ("numpy", numpy_search)]
+            for name, search in backends[::2] if category is None else backends:
+                for query in queries[:5]:  # Warm up caches and lazy loading
+                    search(query, category)
+                latencies, recalls = [], []
+                for query in queries:
+                    request_started = time.perf_counter()
+                    found = search(query, category)
+                    latencies.append((time.perf_counter() - request_started) * 1000)
+                    expected = exact_top_k(vectors, categories, query, category, args.k) if args.recall else None
+                    if expected is not None:
+                        recalls.append(len(expected & set(found)) / args.k)
+                recall = f"{statistics.mean(recalls):.3f}" if recalls else "-"
+                print(f"{name:<14}{category or 'none':<10}{statistics.median(latencies):>10.2f}"
+                      f"{percentile(latencies, 99):>10.2f}{recall:>10}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Chroma vs. NumPy knowledge-base search")
+    parser.add_argument("--entries", type=int, default=10000, help="Knowledge entries loaded into each backend")
+    parser.add_argument("--dimension", type=int, default=768, help="Embedding dimension (nomic-embed-text: 768)")
+    parser.add_argument("--queries", type=int, default=300, help="Queries timed per backend and filter")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--no-recall", dest="recall", action="store_false", help="Skip the recall computation")
+    main(parser.parse_args())
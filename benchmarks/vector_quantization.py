@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall@k vs. memory for compact NumPy vector index formats.
+
+Usage:
+    python -m benchmarks.vector_quantization
+    python -m benchmarks.vector_quantization --entries 50000 --dimension 768 --k 5
+    python -m benchmarks.vector_quantization --from-chroma     # the knowledge base's own embeddings
+
+Builds a NumpyVectorIndex per storage format (dtype x dimensions x reduction, with and
+without re-ranking) over the same vectors in a throwaway directory and compares each
+with the exact float32 index:
+
+    scanned B/vec: bytes per vector that every query scans (what must stay in memory)
+    disk B/vec:    bytes per vector on disk, including the full-precision re-ranking copy
+    saved:         memory saved on scanned vectors vs. float32 at full dimension
+    recall@k:      share of the exact top-k that the format returns
+    p50 ms:        median search latency (category-filtered, like the agents' searches)
+
+Synthetic vectors have a decaying variance along the dimensions, like embeddings from
+Matryoshka-trained models (nomic-embed-text v1.5), so truncation is meaningful; queries
+are noisy copies of indexed vectors. With --from-chroma, the vectors stored in the
+knowledge base are used instead (queries are again noisy copies of them).
+"""
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+import numpy as np
+from app.services.vector_index import NumpyVectorIndex
+
+CATEGORIES = ["IT", "HR", "ACCOUNTING", "GENERAL"]
+
+
+def synthetic_vectors(n, dimension, rng):
+    return rng.standard_normal((n, dimension), dtype=np.float32) * (0.995 ** np.arange(dimension))
+
+
+def chroma_vectors():
+    from app.services.vector_service import vector_service
+    stored = vector_service.collection.get(include=["embeddings"])
+    return np.asarray(stored["embeddings"], dtype=np.float32)
+
+
+def formats(dimension):
+    half, quarter = dimension // 2, dimension // 4
+    yield "float32", 0, "truncate", 0
+    yield "float16", 0, "truncate", 0
+    yield "int8", 0, "truncate", 0
+    yield "int8", 0, "truncate", 4
+    for dimensions in (half, quarter):
+        yield "float32", dimensions, "truncate", 0
+        yield "float32", dimensions, "truncate", 4
+        yield "float32", dimensions, "pca", 4
+        yield "int8", dimensions, "truncate", 4
+        yield "int8", dimensions, "pca", 4
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+def main(args):
+    rng = np.random.default_rng(42)
+    vectors = chroma_vectors() if args.from_chroma else synthetic_vectors(args.entries, args.dimension, rng)
+    n, dimension = vectors.shape
+    ids = [f"doc{i}" for i in range(n)]
+    entries = [{"category": CATEGORIES[i % len(CATEGORIES)]} for i in range(n)]
+    picks = rng.integers(0, n, args.queries)
+    noise = rng.standard_normal((args.queries, dimension), dtype=np.float32)
+    queries = vectors[picks] + noise * args.noise * np.linalg.norm(vectors[picks], axis=1, keepdims=True) / np.sqrt(dimension)
+    query_categories = [entries[i]["category"] for i in picks]
+    workdir = tempfile.mkdtemp(prefix="helpdesk_quantization_bench_")
+
+    try:
+        exact = NumpyVectorIndex(f"{workdir}/exact")
+        exact.upsert(ids, vectors, entries)
+        expected = [{r["id"] for r in exact.search(q.tolist(), category=c, n_results=args.k)}
+                    for q, c in zip(queries, query_categories)]
+        baseline = exact.get_stats()["scanned_bytes_per_vector"]
+
+        print(f"{n} vectors x {dimension} dims, {args.queries} queries, k={args.k}\n")
+        print(f"{'format':<34}{'scanned B/vec':>14}{'disk B/vec':>11}{'saved':>8}{'recall@k':>10}{'p50 ms':>9}")
+        for i, (dtype, dimensions, reduction, rerank) in enumerate(formats(dimension)):
+            index = NumpyVectorIndex(f"{workdir}/f{i}", dtype=dtype, dimensions=dimensions,
+                                     reduction=reduction, rerank_factor=rerank)
+            index.upsert(ids, vectors, entries)
+            stats = index.get_stats()
+
+            latencies, recalls = [], []
+            for query, category, wanted in zip(queries, query_categories, expected):
+                started = time.perf_counter()
+                found = index.search(query.tolist(), category=category, n_results=args.k)
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(wanted & {r["id"] for r in found}) / len(wanted))
+
+            name = f"{dtype} {dimensions or dimension}d" + (f" {reduction}" if dimensions else "")
+            name += f" rerank x{rerank}" if rerank else ""
+            saved = 1 - stats["scanned_bytes_per_vector"] / baseline
+            print(f"{name:<34}{stats['scanned_bytes_per_vector']:>14}{stats['bytes_per_vector']:>11}"
+                  f"{saved:>8.0%}{statistics.mean(recalls):>10.3f}{percentile(latencies, 50):>9.2f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark recall@k vs. memory for compact vector index formats")
+    parser.add_argument("--entries", type=int, default=20000, help="Synthetic vectors indexed")
+    parser.add_argument("--dimension", type=int, default=768, help="Synthetic embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per format")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    parser.add_argument("--noise", type=float, default=1.0, help="Query noise relative to the vectors' scale")
+    parser.add_argument("--from-chroma", action="store_true", help="Use the knowledge base's stored embeddings")
+    main(parser.parse_args())
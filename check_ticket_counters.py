@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Check the dashboard's ticket counters against the tickets table.
+
+Usage:
+    python check_ticket_counters.py          # report drift (exit code 1 if any)
+    python check_ticket_counters.py --fix    # report drift and rebuild the counters
+
+The counters in ticket_counters are updated in the same transaction as each ticket
+insert or status change, so drift should only appear after manual edits to the
+tickets table or writes from code that bypasses TicketService.
+"""
+
+import argparse
+import sys
+from app.services.ticket_service import ticket_service
+
+
+def main(args):
+    print("Recomputing ticket counters from the tickets table...")
+    drift = ticket_service.check_counters(fix=args.fix)
+
+    if not drift:
+        print("✓ Counters are consistent")
+        return 0
+
+    print(f"\n{'category':<16}{'status':<14}{'stored':>8}{'expected':>10}")
+    for row in drift:
+        print(f"{row['category']:<16}{row['status']:<14}{row['stored']:>8}{row['expected']:>10}")
+
+    if args.fix:
+        print(f"\n✓ Repaired {len(drift)} counters")
+        return 0
+    print(f"\n✗ {len(drift)} counters drifted; run with --fix to rebuild them")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check ticket analytics counters for drift")
+    parser.add_argument("--fix", action="store_true", help="Rebuild counters from the tickets table")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Bulk-ingest knowledge base articles from Markdown, JSONL and CSV files.
+
+Usage:
+    python ingest_knowledge.py kb/ --category IT
+    python ingest_knowledge.py articles.jsonl faq.csv --batch-size 128
+
+An interrupted run can simply be restarted with the same arguments: entries that
+were already stored are detected by their content-hash IDs and skipped without
+being embedded again.
+"""
+
+import argparse
+import asyncio
+from app.services.knowledge_loader import iter_knowledge_entries
+from app.services.vector_service import vector_service
+
+
+def print_progress(stats: dict):
+    """Print a one-line progress report after every batch"""
+    print(
+        f"  {stats['processed']} processed | {stats['added']} added | "
+        f"{stats['skipped']} skipped | {stats['failed']} failed | "
+        f"{stats['docs_per_sec']:.1f} docs/sec"
+    )
+
+
+async def ingest(paths, category, batch_size):
+    """Stream entries from the given paths into the vector database"""
+    print(f"Ingesting knowledge from: {', '.join(paths)}")
+
+    stats = await vector_service.add_knowledge_bulk(
+        iter_knowledge_entries(paths, default_category=category),
+        batch_size=batch_size,
+        on_progress=print_progress
+    )
+
+    print(
+        f"\nCompleted! {stats['added']} added, {stats['skipped']} skipped, "
+        f"{stats['failed']} failed in {stats['seconds']:.1f}s "
+        f"({stats['docs_per_sec']:.1f} docs/sec)."
+    )
+    if stats["failed"]:
+        print("Re-run the same command to retry failed entries.")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-ingest knowledge base articles")
+    parser.add_argument("paths", nargs="+", help="Files or directories (.md, .jsonl, .csv)")
+    parser.add_argument("--category", help="Category for entries that do not set one "
+                                           "(default: parent directory name)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Entries per Chroma upsert")
+    args = parser.parse_args()
+
+    asyncio.run(ingest(args.paths, args.category, args.batch_size))
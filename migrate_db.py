@@ -1,31 +1,37 @@
 #!/usr/bin/env python3
-"""Database migration script to add missing columns"""
+"""
+Database migration script: upgrade the database to the latest schema revision.
 
-from app.models.database import SessionLocal, engine
-from sqlalchemy import text
+Usage:
+    python migrate_db.py              # apply all pending migrations
+    python migrate_db.py --sql        # print the SQL instead of running it
 
-def migrate_database():
-    """Add missing columns to existing database"""
-    db = SessionLocal()
-    
+Migrations live in migrations/versions (Alembic). They check what already exists,
+so this is safe to run on fresh databases and on databases created before
+migrations were introduced.
+"""
+
+import argparse
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+
+ALEMBIC_INI = Path(__file__).resolve().parent / "alembic.ini"
+
+
+def migrate_database(sql: bool = False):
+    """Apply all pending migrations"""
+    config = Config(str(ALEMBIC_INI))
     try:
-        # Check if assigned_to column exists
-        result = db.execute(text("PRAGMA table_info(tickets)"))
-        columns = [row[1] for row in result.fetchall()]
-        
-        if 'assigned_to' not in columns:
-            print("Adding assigned_to column to tickets table...")
-            db.execute(text("ALTER TABLE tickets ADD COLUMN assigned_to TEXT"))
-            db.commit()
-            print("✅ Added assigned_to column")
-        else:
-            print("✅ assigned_to column already exists")
-            
+        command.upgrade(config, "head", sql=sql)
+        if not sql:
+            print("✅ Database schema is up to date")
     except Exception as e:
         print(f"❌ Error during migration: {e}")
-        db.rollback()
-    finally:
-        db.close()
+        raise
+
 
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Apply database migrations")
+    parser.add_argument("--sql", action="store_true", help="Print the migration SQL instead of running it")
+    migrate_database(parser.parse_args().sql)
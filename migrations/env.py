@@ -0,0 +1,91 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+# Engine profile (WAL, busy_timeout, ...) so migrations run with the same connection
+# settings as the API. Not app.models.database: importing it creates the HEAD tables
+# and default users on the configured database before any revision runs.
+from app.models.engine import create_db_engine
+from app.utils.config import settings
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+# This line sets up loggers basically.
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+
+def get_target_metadata():
+    """
+    Model metadata for `alembic revision --autogenerate`; None for upgrade/downgrade.
+
+    Only autogenerate imports the models. Their import runs create_all against
+    DATABASE_URL, so compare against a different database via sqlalchemy.url.
+    """
+    if not getattr(config.cmd_opts, "autogenerate", False):
+        return None
+    from app.models.database import Base
+    return Base.metadata
+
+
+def get_url() -> str:
+    """
+    Database URL: sqlalchemy.url when set (e.g. by tests), otherwise DATABASE_URL from settings.
+    """
+    return config.get_main_option("sqlalchemy.url") or settings.database_url
+
+
+def run_migrations_offline() -> None:
+    """Run migrations in 'offline' mode.
+
+    This configures the context with just a URL
+    and not an Engine, though an Engine is acceptable
+    here as well.  By skipping the Engine creation
+    we don't even need a DBAPI to be available.
+
+    Calls to context.execute() here emit the given string to the
+    script output.
+
+    """
+    context.configure(
+        url=get_url(),
+        target_metadata=get_target_metadata(),
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,  # SQLite needs table rebuilds for most ALTERs
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode.
+
+    In this scenario we need to create an Engine
+    and associate a connection with the context.
+
+    """
+    connectable = create_db_engine(get_url())
+
+    try:
+        with connectable.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=get_target_metadata(),
+                render_as_batch=True,  # SQLite needs table rebuilds for most ALTERs
+            )
+
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
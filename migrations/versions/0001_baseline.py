@@ -0,0 +1,86 @@
+"""Baseline schema: users, tickets and chat_logs as created before migrations existed
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-16 00:00:00
+
+Tables are only created when missing, so this revision can be applied to databases
+the application already created. Offline (--sql) there is no database to inspect, so
+the script creates everything, as for an empty database. It also folds in the old migrate_db.py step that
+added tickets.assigned_to.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = None if context.is_offline_mode() else sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names()) if inspector else set()
+
+    if "users" not in tables:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("username", sa.String(), nullable=False),
+            sa.Column("password_hash", sa.String(), nullable=False),
+            sa.Column("role", sa.String(), nullable=False),
+            sa.Column("full_name", sa.String(), nullable=False),
+            sa.Column("email", sa.String(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("last_login", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_username", "users", ["username"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "tickets" not in tables:
+        op.create_table(
+            "tickets",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.String(), nullable=False),
+            sa.Column("assigned_to", sa.String(), nullable=True),
+            sa.Column("category", sa.String(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=False),
+            sa.Column("priority", sa.String(), nullable=True),
+            sa.Column("status", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("resolved_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_tickets_id", "tickets", ["id"])
+        op.create_index("ix_tickets_user_id", "tickets", ["user_id"])
+    elif "assigned_to" not in {column["name"] for column in inspector.get_columns("tickets")}:
+        op.add_column("tickets", sa.Column("assigned_to", sa.String(), nullable=True))
+
+    if "chat_logs" not in tables:
+        op.create_table(
+            "chat_logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("session_id", sa.String(), nullable=False),
+            sa.Column("user_message", sa.Text(), nullable=False),
+            sa.Column("agent_response", sa.Text(), nullable=False),
+            sa.Column("agent_type", sa.String(), nullable=False),
+            sa.Column("ticket_id", sa.Integer(), sa.ForeignKey("tickets.id"), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_chat_logs_id", "chat_logs", ["id"])
+        op.create_index("ix_chat_logs_session_id", "chat_logs", ["session_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("chat_logs")
+    op.drop_table("tickets")
+    op.drop_table("users")
@@ -0,0 +1,64 @@
+"""Composite indexes for ticket listings, dashboard aggregates and chat history
+
+Revision ID: 0002_listing_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-16 00:00:00
+
+Indexes are built outside a transaction (CONCURRENTLY on PostgreSQL) so the tables
+stay writable while they build, and existing indexes are skipped. Offline (--sql) the
+script assumes the database is at the previous revision.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_listing_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns); mirrors __table_args__ in app/models/database.py
+INDEXES = [
+    # Keyset-paginated listings: filter column, then the (created_at, id) sort key
+    ("ix_tickets_created_at_id", "tickets", ["created_at", "id"]),
+    ("ix_tickets_updated_at_id", "tickets", ["updated_at", "id"]),
+    ("ix_tickets_user_id_created_at_id", "tickets", ["user_id", "created_at", "id"]),
+    ("ix_tickets_status_created_at_id", "tickets", ["status", "created_at", "id"]),
+    ("ix_tickets_category_created_at_id", "tickets", ["category", "created_at", "id"]),
+    ("ix_tickets_assigned_to_created_at_id", "tickets", ["assigned_to", "created_at", "id"]),
+    # Dashboard aggregates: counts by status and by category, answered from the index alone
+    ("ix_tickets_category_status", "tickets", ["category", "status"]),
+    # Conversation history in order
+    ("ix_chat_logs_session_id_created_at", "chat_logs", ["session_id", "created_at"]),
+]
+
+
+def _existing_indexes(offline: set) -> set:
+    """
+    Names of the listing indexes already in the database, or `offline` when generating SQL.
+    """
+    if context.is_offline_mode():
+        return offline
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for table in ("tickets", "chat_logs") for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = _existing_indexes(offline=set())
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in existing:
+                op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    existing = _existing_indexes(offline={name for name, _, _ in INDEXES})
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            if name in existing:
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""Ticket counters per (category, status) for O(1) dashboard analytics
+
+Revision ID: 0003_ticket_counters
+Revises: 0002_listing_indexes
+Create Date: 2026-10-16 00:00:00
+
+Creates the table if the application has not already done so (always, offline), then
+rebuilds the counters from the tickets table so they start out exact.
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_ticket_counters"
+down_revision: Union[str, None] = "0002_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if context.is_offline_mode() or "ticket_counters" not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            "ticket_counters",
+            sa.Column("category", sa.String(), primary_key=True),
+            sa.Column("status", sa.String(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+
+    op.execute("DELETE FROM ticket_counters")
+    op.execute(
+        "INSERT INTO ticket_counters (category, status, count) "
+        "SELECT category, status, COUNT(*) FROM tickets "
+        "WHERE category IS NOT NULL AND status IS NOT NULL "
+        "GROUP BY category, status"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("ticket_counters")
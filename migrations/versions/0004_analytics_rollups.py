@@ -0,0 +1,132 @@
+"""Hourly ticket rollups and resolution-time histogram for /analytics/timeseries
+
+Revision ID: 0004_analytics_rollups
+Revises: 0003_ticket_counters
+Create Date: 2026-10-16 00:00:00
+
+Creates the tables if the application has not already done so, then rebuilds them
+from the tickets table with the same bucketing the application uses (copied below so
+the backfill does not change when the application code does). Offline (--sql)
+the tables are always created and the backfill is left to the application, which
+rebuilds empty rollups on startup (AnalyticsService.ensure_rollups).
+"""
+import math
+from typing import Dict, List, Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_analytics_rollups"
+down_revision: Union[str, None] = "0003_ticket_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Bucketing as of this revision (app/services/analytics_service.py): bucket b covers
+# [BASE**b, BASE**(b+1)) seconds of resolution time
+RESOLUTION_BUCKET_BASE = 2 ** 0.25
+
+# Tables as of this revision, for the backfill
+tickets = sa.table(
+    "tickets",
+    sa.column("category", sa.String()),
+    sa.column("status", sa.String()),
+    sa.column("assigned_to", sa.String()),
+    sa.column("created_at", sa.DateTime()),
+    sa.column("resolved_at", sa.DateTime()),
+)
+ticket_hourly_stats = sa.table(
+    "ticket_hourly_stats",
+    sa.column("hour", sa.DateTime()),
+    sa.column("category", sa.String()),
+    sa.column("created", sa.Integer()),
+    sa.column("resolved", sa.Integer()),
+)
+resolution_time_histogram = sa.table(
+    "resolution_time_histogram",
+    sa.column("day", sa.DateTime()),
+    sa.column("category", sa.String()),
+    sa.column("assignee", sa.String()),
+    sa.column("bucket", sa.Integer()),
+    sa.column("count", sa.Integer()),
+)
+
+
+def _resolution_bucket(seconds: float) -> int:
+    return 0 if seconds < 1 else int(math.log(seconds, RESOLUTION_BUCKET_BASE))
+
+
+def _backfill() -> None:
+    """
+    Rebuild both rollup tables from the tickets table, streaming tickets in chunks.
+    """
+    bind = op.get_bind()
+    hourly: Dict[tuple, List[int]] = {}
+    histogram: Dict[tuple, int] = {}
+
+    rows = bind.execution_options(yield_per=10000).execute(sa.select(
+        tickets.c.category, tickets.c.status, tickets.c.assigned_to,
+        tickets.c.created_at, tickets.c.resolved_at
+    ))
+    for category, status, assigned_to, created_at, resolved_at in rows:
+        if created_at is None:
+            continue
+        hour = created_at.replace(minute=0, second=0, microsecond=0)
+        hourly.setdefault((hour, category), [0, 0])[0] += 1
+        if (status or "").lower() == "resolved" and resolved_at is not None:
+            hour = resolved_at.replace(minute=0, second=0, microsecond=0)
+            hourly.setdefault((hour, category), [0, 0])[1] += 1
+            key = (resolved_at.replace(hour=0, minute=0, second=0, microsecond=0), category,
+                   assigned_to or "unassigned",
+                   _resolution_bucket((resolved_at - created_at).total_seconds()))
+            histogram[key] = histogram.get(key, 0) + 1
+
+    bind.execute(ticket_hourly_stats.delete())
+    bind.execute(resolution_time_histogram.delete())
+    if hourly:
+        bind.execute(ticket_hourly_stats.insert(), [
+            {"hour": hour, "category": category, "created": created, "resolved": resolved}
+            for (hour, category), (created, resolved) in hourly.items()
+        ])
+    if histogram:
+        bind.execute(resolution_time_histogram.insert(), [
+            {"day": day, "category": category, "assignee": assignee, "bucket": bucket, "count": count}
+            for (day, category, assignee, bucket), count in histogram.items()
+        ])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    offline = context.is_offline_mode()
+    tables = set() if offline else set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "ticket_hourly_stats" not in tables:
+        op.create_table(
+            "ticket_hourly_stats",
+            sa.Column("hour", sa.DateTime(), primary_key=True),
+            sa.Column("category", sa.String(), primary_key=True),
+            sa.Column("created", sa.Integer(), nullable=False),
+            sa.Column("resolved", sa.Integer(), nullable=False),
+        )
+    if "resolution_time_histogram" not in tables:
+        op.create_table(
+            "resolution_time_histogram",
+            sa.Column("day", sa.DateTime(), primary_key=True),
+            sa.Column("category", sa.String(), primary_key=True),
+            sa.Column("assignee", sa.String(), primary_key=True),
+            sa.Column("bucket", sa.Integer(), primary_key=True),
+            sa.Column("count", sa.Integer(), nullable=False),
+        )
+
+    if offline:
+        return
+
+    # Backfill with the application's bucketing so incremental updates line up
+    _backfill()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("resolution_time_histogram")
+    op.drop_table("ticket_hourly_stats")
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Re-embed the knowledge base with the configured embedding model.
+
+Usage:
+    python reembed_knowledge.py                           # switch to EMBEDDING_MODEL
+    python reembed_knowledge.py --model mxbai-embed-large --batch-size 128
+
+Every entry is embedded again into a staging collection, which then replaces
+helpdesk_knowledge; the previous collection is kept as helpdesk_knowledge_backup.
+If any embedding fails nothing is changed, so the command can simply be re-run.
+Restart the API afterwards so it picks up the new collection.
+"""
+
+import argparse
+import asyncio
+import sys
+from app.services.vector_service import vector_service
+from app.utils.config import settings
+
+
+def print_progress(stats: dict):
+    """Print a one-line progress report after every batch"""
+    print(f"  {stats['reembedded']} re-embedded | {stats['docs_per_sec']:.1f} docs/sec")
+
+
+async def reembed(model, batch_size):
+    current = vector_service.embedding_model
+    if current == model:
+        print(f"✓ Knowledge base already uses '{model}'")
+        return 0
+
+    print(f"Re-embedding {vector_service.collection.count()} entries: '{current}' -> '{model}'")
+    try:
+        stats = await vector_service.reembed(model, batch_size=batch_size, on_progress=print_progress)
+    except RuntimeError as e:
+        print(f"✗ {e}")
+        return 1
+
+    print(f"\n✓ Re-embedded {stats['reembedded']} entries in {stats['seconds']:.1f}s "
+          f"({stats['docs_per_sec']:.1f} docs/sec); previous collection kept as '{stats['backup']}'")
+    if model != settings.embedding_model:
+        print(f"  Set EMBEDDING_MODEL={model} so new entries and the response cache use it too.")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-embed the knowledge base with a new embedding model")
+    parser.add_argument("--model", default=settings.embedding_model, help="Embedding model (default: EMBEDDING_MODEL)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Entries embedded and written per step")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(reembed(args.model, args.batch_size)))
@@ -15,6 +15,7 @@ echo "Pulling Ollama model..."
 docker-compose up -d ollama
 sleep 10
 docker-compose exec ollama ollama pull qwen2:14b
+docker-compose exec ollama ollama pull nomic-embed-text
 
 # Start all services
 echo "Starting all services..."
@@ -149,19 +149,12 @@ Note: Passwords must be at least 8 characters with uppercase, lowercase, numbers
     ]
     
     print("Adding knowledge base entries...")
-    
-    for entry in knowledge_entries:
-        try:
-            await vector_service.add_knowledge(
-                question=entry["question"],
-                answer=entry["answer"],
-                category=entry["category"]
-            )
-            print(f"✓ Added: {entry['question'][:50]}...")
-        except Exception as e:
-            print(f"✗ Failed to add: {entry['question'][:50]}... - Error: {e}")
-    
-    print(f"\nCompleted! Added {len(knowledge_entries)} knowledge base entries.")
+
+    # Embed in parallel and write in a single batched upsert; unchanged entries are skipped
+    stats = await vector_service.add_knowledge_bulk(knowledge_entries)
+
+    print(f"\nCompleted! Added {stats['added']} knowledge base entries "
+          f"({stats['skipped']} unchanged, {stats['failed']} failed).")
 
 if __name__ == "__main__":
     asyncio.run(populate_knowledge_base())
\ No newline at end of file
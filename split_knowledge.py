@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Split the knowledge base into one Chroma collection per category.
+
+Usage:
+    python split_knowledge.py
+    python split_knowledge.py --batch-size 500
+
+Category searches (IT, HR, ACCOUNTING, ...) then query only their own collection
+instead of filtering the whole knowledge base; helpdesk_knowledge stays as the
+all-categories collection. Stored embeddings are copied, nothing is re-embedded,
+and the command can be re-run at any time to rebuild the category collections.
+Restart the API afterwards so it routes searches to them.
+"""
+
+import argparse
+import sys
+from app.services.vector_service import vector_service
+from app.utils.config import settings
+
+
+def print_progress(stats: dict):
+    """Print a one-line progress report after every batch"""
+    print(f"  {stats['copied']} copied | {stats['seconds']:.1f}s")
+
+
+def split(batch_size):
+    if not settings.vector_partition_by_category:
+        print("✗ VECTOR_PARTITION_BY_CATEGORY is disabled; category collections would not be used")
+        return 1
+
+    print(f"Splitting {vector_service.collection.count()} entries of '{vector_service.collection.name}' by category")
+    stats = vector_service.split_by_category(batch_size=batch_size, on_progress=print_progress)
+
+    print(f"\n✓ Copied {stats['copied']} entries into {len(stats['categories'])} category collections "
+          f"in {stats['seconds']:.1f}s")
+    for category, count in sorted(stats["categories"].items()):
+        print(f"  {category or '(no category)'}: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split the knowledge base into per-category collections")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Entries copied per step")
+    args = parser.parse_args()
+
+    sys.exit(split(args.batch_size))
@@ -9,9 +9,14 @@ from app.agents.classifier_agent import classifier_agent
 from app.agents.it_support_agent import it_support_agent
 from app.agents.hr_agent import hr_agent
 from app.agents.accounting_agent import accounting_agent
+from app.agents.workflow import helpdesk_workflow
 
 # Service to interact with the LLM (Large Language Model) for classification and generation
 from app.services.llm_service import llm_service
+from app.services.response_cache import response_cache
+from app.services.session_store import InMemorySessionStore
+from app.utils.streaming import current_stream
+from app.main import ChatMessage, run_chat_turn
 
 # Database utility to initialize default users for tests
 from app.models.database import init_default_users
@@ -67,6 +72,27 @@ class TestClassifierAgent:
             assert result["category"] == "HR"
             assert result["next_agent"] == "hr"
 
+    @pytest.mark.asyncio
+    async def test_confident_local_model_skips_llm(self):
+        """
+        When the local model clears the confidence threshold, the LLM is not consulted;
+        below the threshold the LLM answer is used instead.
+        """
+        with patch.object(classifier_agent.local_classifier, 'predict') as mock_local:
+            with patch.object(llm_service, 'classify_intent') as mock_classify:
+                mock_local.return_value = {"category": "ACCOUNTING", "confidence": 0.99}
+                mock_classify.return_value = {"category": "HR", "confidence": 0.9}
+
+                result = await classifier_agent.classify_query("Submit my expense report")
+                assert result["category"] == "ACCOUNTING"
+                assert result["classifier"] == "local"
+                mock_classify.assert_not_called()
+
+                mock_local.return_value = {"category": "ACCOUNTING", "confidence": 0.4}
+                result = await classifier_agent.classify_query("Question about my payslip")
+                assert result["category"] == "HR"
+                assert result["classifier"] == "llm"
+
 
 class TestITSupportAgent:
     """
@@ -119,6 +145,107 @@ class TestITSupportAgent:
                     assert "steps" in result["response"].lower()
 
 
+class TestITParallelRetrieval:
+    """
+    Test suite for the concurrent knowledge-base + web-search stage of IT detail gathering.
+    """
+
+    CONTEXT = {"conversation_stage": "gathering_details", "original_query": "VPN keeps dropping"}
+
+    @staticmethod
+    def _slow(delay: float, value):
+        async def search(*args, **kwargs):
+            await asyncio.sleep(delay)
+            return value
+        return search
+
+    @pytest.mark.asyncio
+    async def test_kb_and_web_run_concurrently(self):
+        """
+        On a knowledge-base miss the web results are used, and the retrieval stage takes
+        about as long as the slower search rather than the sum of both.
+        """
+        web_results = [{"title": "VPN fix", "snippet": "Update the client"}]
+        with patch("app.services.vector_service.vector_service.search_knowledge", self._slow(0.3, [{"similarity": 0.2}])), \
+                patch("app.services.web_search.web_search_service.search_web", self._slow(0.3, web_results)), \
+                patch("app.services.vector_service.vector_service.add_knowledge"), \
+                patch.object(llm_service, "generate_response", return_value="1. Update the VPN client"):
+            result = await it_support_agent.handle_query("Windows 11, since this morning", self.CONTEXT)
+
+        assert result["source"] == "web_search"
+        timings = result["timings"]
+        assert timings["kb"] == timings["web"] == "ok"
+        assert timings["kb_ms"] >= 300 and timings["web_ms"] >= 300
+        assert timings["retrieval_ms"] < 500
+        assert "llm_ms" in timings
+
+    @pytest.mark.asyncio
+    async def test_strong_kb_hit_cancels_web_search(self):
+        """
+        A strong knowledge-base hit answers immediately without waiting for the web search.
+        """
+        kb_results = [{"answer": "Reinstall the VPN profile", "similarity": 0.9}]
+        with patch("app.services.vector_service.vector_service.search_knowledge", self._slow(0.05, kb_results)), \
+                patch("app.services.web_search.web_search_service.search_web", self._slow(5, [])):
+            result = await it_support_agent.handle_query("Windows 11, since this morning", self.CONTEXT)
+
+        assert result["source"] == "knowledge_base"
+        assert result["timings"]["web"] == "cancelled"
+        assert result["timings"]["retrieval_ms"] < 1000
+
+    @pytest.mark.asyncio
+    async def test_searches_past_budget_count_as_no_results(self):
+        """
+        A web search still running when the latency budget expires is abandoned.
+        """
+        with patch("app.services.vector_service.vector_service.search_knowledge", self._slow(0, [])), \
+                patch("app.services.web_search.web_search_service.search_web", self._slow(5, [{"title": "late"}])), \
+                patch("app.agents.it_support_agent.settings.it_retrieval_budget_seconds", 0.2):
+            result = await it_support_agent.handle_query("Windows 11, since this morning", self.CONTEXT)
+
+        assert result["source"] == "no_solution"
+        assert result["timings"]["web"] == "timeout"
+        assert result["timings"]["retrieval_ms"] < 1000
+
+class TestChatTimings:
+    """
+    Tests that the IT agent's per-stage timings reach the chat response and the event stream.
+    """
+
+    @pytest.mark.asyncio
+    async def test_timings_in_response_and_stream(self):
+        """
+        A turn that ran retrieval reports its timings in the ChatResponse and as a "timings"
+        event; the next turn does not repeat them.
+        """
+        store = InMemorySessionStore(max_sessions=10, ttl_seconds=60, max_messages=20, max_bytes=100000)
+        await store.save("timed-session", {
+            "messages": [], "current_agent": "it_support", "category": "IT_SOFTWARE", "user_id": "test_user",
+            "session_id": "timed-session", "context": {"original_query": "VPN keeps disconnecting"},
+            "ticket_id": 0, "resolution_status": "", "conversation_stage": "gathering_details",
+            "needs_ticket": False
+        })
+        kb_results = [{"answer": "Reinstall the VPN profile", "similarity": 0.9}]
+        queue = asyncio.Queue()
+        token = current_stream.set(queue)
+        try:
+            with patch("app.main.session_store", store), \
+                    patch("app.services.vector_service.vector_service.search_knowledge", return_value=kb_results), \
+                    patch("app.services.web_search.web_search_service.search_web", return_value=[]):
+                response = await run_chat_turn(ChatMessage(content="Windows 11, since this morning",
+                                                           user_id="test_user", session_id="timed-session"))
+                follow_up = await run_chat_turn(ChatMessage(content="yes", user_id="test_user",
+                                                            session_id="timed-session"))
+        finally:
+            current_stream.reset(token)
+
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert response.timings["kb"] == "ok"
+        assert "retrieval_ms" in response.timings and "total_ms" in response.timings
+        assert [e["data"] for e in events if e["event"] == "timings"] == [response.timings]
+        assert follow_up.timings is None
+
+
 class TestHRAgent:
     """
     Test suite for the HR Agent handling HR related queries.
@@ -140,6 +267,30 @@ class TestHRAgent:
             assert result["source"] == "generated"
 
 
+    @pytest.mark.asyncio
+    async def test_repeat_question_served_from_response_cache(self):
+        """
+        A near-identical follow-up question should reuse the generated answer
+        without another LLM call.
+        """
+        embeddings = {"How many sick days do I get?": [1.0, 0.0], "how many sick days do i get": [0.999, 0.01]}
+
+        async def embed(text):
+            return embeddings[text]
+
+        response_cache.invalidate("HR")
+        with patch('app.services.vector_service.vector_service.search_knowledge', return_value=[]), \
+                patch.object(llm_service, 'generate_embedding', side_effect=embed), \
+                patch.object(llm_service, 'generate_response', return_value="You get 10 sick days per year") as mock_llm:
+            first = await hr_agent.handle_query("How many sick days do I get?")
+            second = await hr_agent.handle_query("how many sick days do i get")
+
+        assert first["source"] == "generated"
+        assert second["source"] == "response_cache"
+        assert second["response"] == "You get 10 sick days per year"
+        assert mock_llm.call_count == 1
+        response_cache.invalidate("HR")
+
 class TestAccountingAgent:
     """
     Test suite for the Accounting Agent which handles finance/accounting queries.
@@ -194,3 +345,54 @@ class TestWorkflowIntegration:
                 result = await it_support_agent.handle_query("My computer won't start")
                 assert "restart" in result["response"].lower()
                 assert result["source"] == "knowledge_base"
+
+
+class TestStickyRouting:
+    """
+    Tests that follow-up turns of an in-flight conversation skip the LLM classifier.
+    """
+
+    def _state(self, stage: str, category: str = "IT_SOFTWARE"):
+        """Build a minimal workflow state for the classify node."""
+        return {
+            "messages": [{"role": "user", "content": "yes"}],
+            "current_agent": "it_support",
+            "category": category,
+            "user_id": "test_user",
+            "session_id": "sticky-session",
+            "context": {},
+            "ticket_id": 0,
+            "resolution_status": "",
+            "conversation_stage": stage,
+            "needs_ticket": False
+        }
+
+    @pytest.mark.asyncio
+    async def test_follow_up_skips_classification(self):
+        """
+        A reply while awaiting resolution feedback keeps its category without an LLM call.
+        """
+        skipped_before = helpdesk_workflow.metrics["classifications_skipped"]
+
+        with patch.object(llm_service, 'classify_intent') as mock_classify:
+            state = await helpdesk_workflow._classify_node(self._state("awaiting_resolution_feedback"))
+
+            mock_classify.assert_not_called()
+
+        assert state["category"] == "IT_SOFTWARE"
+        assert helpdesk_workflow._route_to_agent(state) == "it_support"
+        assert helpdesk_workflow.metrics["classifications_skipped"] == skipped_before + 1
+
+    @pytest.mark.asyncio
+    async def test_initial_message_is_classified(self):
+        """
+        A message in the initial stage still goes through the classifier.
+        """
+        with patch.object(llm_service, 'classify_intent') as mock_classify:
+            mock_classify.return_value = {"category": "HR", "confidence": 0.9}
+
+            state = await helpdesk_workflow._classify_node(self._state("initial", category=""))
+
+            mock_classify.assert_called_once()
+
+        assert state["category"] == "HR"
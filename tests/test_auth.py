@@ -1,8 +1,12 @@
 # Importing Libraries
 
+import time
 import pytest
 import httpx
-from app.main import app
+from unittest.mock import patch
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from app.main import app, get_current_user
 from app.services.auth_service import auth_service
 from app.models.database import User, SessionLocal
 
@@ -293,6 +297,85 @@ class TestAuthService:
             db.close()
 
 
+@pytest.fixture
+def cache_user():
+    """
+    A throwaway active user for the cache tests, removed (and uncached) afterwards.
+    """
+    username = "cache-test-user"
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username == username).delete()
+        db.add(User(username=username, password_hash=User.hash_password("cache123"),
+                    role="user", full_name="Cache Test User", email=None))
+        db.commit()
+    finally:
+        db.close()
+    auth_service.invalidate_user(username)
+
+    token = auth_service.create_access_token({"username": username, "role": "user", "full_name": "Cache Test User"})
+    yield username, HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username == username).delete()
+        db.commit()
+    finally:
+        db.close()
+    auth_service.invalidate_user(username)
+
+
+class TestAuthCache:
+    """Tests for the cached token/user lookups behind get_current_user"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_requests_skip_database_and_decode(self, cache_user):
+        """
+        After the first authenticated request, later ones should neither query the
+        users table nor decode the JWT again.
+        """
+        username, credentials = cache_user
+        first = await get_current_user(credentials)
+        assert first.username == username
+
+        with patch("app.services.auth_service.SessionLocal") as session_local, \
+                patch("app.services.auth_service.jwt.decode") as decode:
+            for _ in range(5):
+                user = await get_current_user(credentials)
+                assert user.username == username
+        session_local.assert_not_called()
+        decode.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_role_change_and_deactivation_take_effect_immediately(self, cache_user):
+        """
+        Changing a role or deactivating a user through AuthService should invalidate the
+        cached record, so the very next request sees the change.
+        """
+        username, credentials = cache_user
+        assert not auth_service.is_support_engineer(await get_current_user(credentials))
+
+        assert auth_service.set_user_role(username, "support-engineer") is True
+        assert auth_service.is_support_engineer(await get_current_user(credentials))
+
+        assert auth_service.deactivate_user(username) is True
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(credentials)
+        assert exc_info.value.status_code == 401
+
+        assert auth_service.deactivate_user("no-such-user") is False
+
+    def test_token_cache_respects_expiry(self):
+        """
+        A decoded token must not be cached beyond its own `exp` claim.
+        """
+        with patch("app.services.auth_service.ACCESS_TOKEN_EXPIRE_MINUTES", 1 / 60):  # One second
+            token = auth_service.create_access_token({"username": "test_user", "role": "user", "full_name": "Test User"})
+        assert auth_service.verify_token(token) is not None
+        time.sleep(1.5)
+        assert auth_service.verify_token(token) is None
+
+
 class TestUserModel:
     """Tests for User ORM model password handling"""
 
@@ -0,0 +1,193 @@
+# Importing Libraries
+
+import io
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from app.models.database import create_db_engine
+from app.services.analytics_service import analytics_service
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+
+# Queries the listing/dashboard/chat-history code runs, with the index each should use after migrating
+QUERIES = {
+    "open tickets, newest first": (
+        "SELECT * FROM tickets WHERE status = 'open' ORDER BY created_at DESC, id DESC LIMIT 50",
+        "ix_tickets_status_created_at_id"
+    ),
+    "dashboard counts by category and status": (
+        "SELECT category, status, COUNT(*) FROM tickets GROUP BY category, status",
+        "ix_tickets_category_status"
+    ),
+    "chat history for a session": (
+        "SELECT * FROM chat_logs WHERE session_id = 'abc' ORDER BY created_at",
+        "ix_chat_logs_session_id_created_at"
+    ),
+}
+
+
+@pytest.fixture
+def alembic_config(tmp_path):
+    """
+    Alembic configuration pointed at a throwaway SQLite database.
+    """
+    path = tmp_path / "migrations.db"
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    config.attributes["path"] = path
+    return config
+
+
+def query_plan(path: Path, sql: str) -> str:
+    """
+    Return the EXPLAIN QUERY PLAN output for a query as one string.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        return " | ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+    finally:
+        conn.close()
+
+
+class TestMigrations:
+    """Tests for the Alembic migrations and the query plans they enable"""
+
+    def test_indexes_change_query_plans(self, alembic_config):
+        """
+        Before the index migration the listing and history queries scan or sort;
+        after it each one is answered from its composite index with no temporary sort.
+        """
+        path = alembic_config.attributes["path"]
+        command.upgrade(alembic_config, "0001_baseline")
+        before = {name: query_plan(path, sql) for name, (sql, _) in QUERIES.items()}
+
+        command.upgrade(alembic_config, "head")
+        after = {name: query_plan(path, sql) for name, (sql, _) in QUERIES.items()}
+
+        for name, (_, index) in QUERIES.items():
+            assert index not in before[name]
+            assert index in after[name], f"{name}: {after[name]}"
+            assert "TEMP B-TREE" not in after[name], f"{name}: {after[name]}"
+        assert "TEMP B-TREE" in before["open tickets, newest first"]
+
+    def test_upgrade_is_idempotent_and_reversible(self, alembic_config):
+        """
+        Re-running the upgrade should be a no-op, and downgrading should drop the new indexes.
+        """
+        path = alembic_config.attributes["path"]
+        command.upgrade(alembic_config, "head")
+        command.upgrade(alembic_config, "head")
+
+        command.downgrade(alembic_config, "0001_baseline")
+        conn = sqlite3.connect(path)
+        try:
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        finally:
+            conn.close()
+        assert "ix_tickets_category_status" not in indexes
+        assert "ix_tickets_user_id" in indexes  # Baseline indexes are kept
+
+    def test_offline_sql_builds_the_same_schema(self, alembic_config, tmp_path):
+        """
+        `migrate_db.py --sql` must not touch a database, and its script applied to an
+        empty database should produce the same tables and indexes as an online upgrade.
+        """
+        path = alembic_config.attributes["path"]
+        command.upgrade(alembic_config, "head")
+
+        offline_config = Config(str(ALEMBIC_INI))
+        offline_config.set_main_option("sqlalchemy.url", f"sqlite:///{tmp_path / 'never-created.db'}")
+        offline_config.output_buffer = io.StringIO()
+        command.upgrade(offline_config, "head", sql=True)
+        assert not (tmp_path / "never-created.db").exists()
+
+        schema_query = "SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%' ORDER BY name"
+        script_db = sqlite3.connect(tmp_path / "from-script.db")
+        online_db = sqlite3.connect(path)
+        try:
+            script_db.executescript(offline_config.output_buffer.getvalue())
+            assert script_db.execute(schema_query).fetchall() == online_db.execute(schema_query).fetchall()
+            assert script_db.execute("SELECT version_num FROM alembic_version").fetchall() == [
+                ("0004_analytics_rollups",)
+            ]
+        finally:
+            script_db.close()
+            online_db.close()
+
+    def test_migrations_do_not_import_the_application_models(self, tmp_path):
+        """
+        Running the migrations must not import app.models.database, whose import creates
+        the current tables and default users on DATABASE_URL before any revision runs.
+        """
+        script = (
+            "import sys\n"
+            "from alembic import command\n"
+            "from alembic.config import Config\n"
+            f"config = Config({str(ALEMBIC_INI)!r})\n"
+            f"config.set_main_option('sqlalchemy.url', 'sqlite:///{tmp_path / 'migrated.db'}')\n"
+            "command.upgrade(config, 'head')\n"
+            "assert 'app.models.database' not in sys.modules, 'models imported'\n"
+        )
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'app.db'}"}
+        result = subprocess.run([sys.executable, "-c", script], cwd=ALEMBIC_INI.parent, env=env,
+                                capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
+        assert (tmp_path / "migrated.db").exists()
+        assert not (tmp_path / "app.db").exists()
+
+    def test_rollup_backfill_matches_the_application(self, alembic_config):
+        """
+        The rollups backfilled by 0004 are the rows AnalyticsService.rebuild_rollups produces.
+        """
+        path = alembic_config.attributes["path"]
+        command.upgrade(alembic_config, "0003_ticket_counters")
+        created = datetime(2026, 3, 1, 9, 30)
+        conn = sqlite3.connect(path)
+        try:
+            conn.executemany(
+                "INSERT INTO tickets (user_id, assigned_to, category, title, description, status, "
+                "created_at, resolved_at) VALUES ('u', ?, ?, 't', 'd', ?, ?, ?)",
+                [(assignee, category, status, str(created + timedelta(minutes=i)),
+                  str(created + timedelta(minutes=i, seconds=seconds)) if seconds else None)
+                 for i, (assignee, category, status, seconds) in enumerate([
+                     ("alice", "HR", "resolved", 45),
+                     (None, "HR", "resolved", 3 * 3600),
+                     ("bob", "IT_SOFTWARE", "open", None),
+                     ("bob", "IT_SOFTWARE", "RESOLVED", 2 * 86400),
+                     ("alice", "HR", "in_progress", None),
+                 ])]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+        command.upgrade(alembic_config, "head")
+        tables = ("ticket_hourly_stats", "resolution_time_histogram")
+
+        def rollups():
+            conn = sqlite3.connect(path)
+            try:
+                return {table: sorted(conn.execute(f"SELECT * FROM {table}")) for table in tables}
+            finally:
+                conn.close()
+
+        migrated = rollups()
+        assert len(migrated["ticket_hourly_stats"]) == 4
+        assert len(migrated["resolution_time_histogram"]) == 3
+
+        engine = create_db_engine(f"sqlite:///{path}")
+        try:
+            with Session(engine) as db:
+                analytics_service.rebuild_rollups(db)
+                db.commit()
+        finally:
+            engine.dispose()
+        assert rollups() == migrated
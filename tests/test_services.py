@@ -0,0 +1,1731 @@
+# Importing libraries
+
+import pytest
+import asyncio
+import json
+import threading
+import uuid
+import chromadb
+import httpx
+import numpy as np
+import sqlalchemy
+from unittest.mock import patch
+from sqlalchemy.orm import sessionmaker
+from urllib.parse import parse_qs, urlparse
+
+# Service to interact with the LLM (Large Language Model)
+from app.services.llm_service import llm_service, OllamaService
+from app.services.embedding_cache import EmbeddingCache
+from app.services.vector_service import vector_service
+from app.services.vector_index import NumpyVectorIndex
+from app.services.lexical_index import LexicalIndex
+from app.services.knowledge_loader import iter_knowledge_entries
+from app.services.intent_classifier import LocalIntentClassifier
+from app.services.session_store import SessionStore, InMemorySessionStore, SQLiteSessionStore, RedisSessionStore
+from app.models import database
+from app.models.database import Base, engine, create_db_engine, TicketHourlyStats, ResolutionTimeHistogram
+from datetime import datetime, timedelta
+from pathlib import Path
+from app.services.ticket_service import ticket_service
+from app.services.analytics_service import analytics_service, resolution_bucket
+from app.services.chat_log_writer import ChatLogWriter
+from app.services.web_search import WebSearchService
+from app.services.response_cache import SemanticResponseCache
+from app.services.llm_service import FALLBACK_RESPONSE
+from app.utils.db_executor import run_db
+from app.utils.streaming import current_stream
+
+
+class TestOllamaService:
+    """
+    Test suite for the OllamaService transport layer: concurrency limits, timeouts and request coalescing.
+    The Ollama client itself is mocked so no model server is required.
+    """
+
+    @pytest.mark.asyncio
+    async def test_generate_response_does_not_block_event_loop(self):
+        """
+        Several slow generations should overlap instead of running one after another,
+        and never exceed the configured concurrency limit.
+        """
+        in_flight = 0
+        peak = 0
+
+        async def slow_chat(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return {"message": {"content": "ok"}}
+
+        with patch.object(llm_service, "semaphore", asyncio.Semaphore(2)):
+            with patch.object(llm_service.client, "chat", side_effect=slow_chat):
+                results = await asyncio.gather(
+                    *[llm_service.generate_response(f"question {i}") for i in range(6)]
+                )
+
+        assert results == ["ok"] * 6
+        assert peak == 2  # Calls overlapped, but only up to the semaphore size
+
+    @pytest.mark.asyncio
+    async def test_generate_response_timeout_returns_fallback(self):
+        """
+        A generation that exceeds the per-call timeout should be abandoned
+        and the polite fallback message returned.
+        """
+        async def hanging_chat(**kwargs):
+            await asyncio.sleep(5)
+
+        with patch("app.services.llm_service.settings.ollama_timeout", 0.01):
+            with patch.object(llm_service.client, "chat", side_effect=hanging_chat):
+                result = await llm_service.generate_response("hello")
+
+        assert "trouble processing" in result
+
+    @pytest.mark.asyncio
+    async def test_streaming_request_emits_tokens(self):
+        """
+        During a streaming chat request, generated tokens should be published as
+        "token" events as they arrive, and the full text still returned.
+        """
+        async def token_stream():
+            for token in ["Try ", "restarting ", "Outlook."]:
+                yield {"message": {"content": token}}
+
+        async def streaming_chat(**kwargs):
+            assert kwargs["stream"] is True
+            return token_stream()
+
+        queue = asyncio.Queue()
+        token = current_stream.set(queue)
+        try:
+            with patch.object(llm_service.client, "chat", side_effect=streaming_chat):
+                result = await llm_service.generate_response("outlook crashes")
+        finally:
+            current_stream.reset(token)
+
+        events = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert result == "Try restarting Outlook."
+        assert [e["data"]["text"] for e in events if e["event"] == "token"] == ["Try ", "restarting ", "Outlook."]
+
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_calls_share_one_request(self):
+        """
+        Identical prompts and embedding inputs requested at the same time should reach
+        Ollama once; different prompts still get their own request.
+        """
+        async def slow_chat(**kwargs):
+            await asyncio.sleep(0.05)
+            return {"message": {"content": f"answer to {kwargs['messages'][0]['content']}"}}
+
+        async def slow_embeddings(**kwargs):
+            await asyncio.sleep(0.05)
+            return {"embeddings": [[0.1, 0.2]]}
+
+        shared_before = llm_service.get_request_stats()["chat"]["shared"]
+        with patch.object(llm_service, "embedding_cache", EmbeddingCache(path=None)), \
+                patch.object(llm_service.client, "chat", side_effect=slow_chat) as chat, \
+                patch.object(llm_service.client, "embed", side_effect=slow_embeddings) as embeddings:
+            answers = await asyncio.gather(*[llm_service.generate_response("VPN is down") for _ in range(10)],
+                                           llm_service.generate_response("Printer is down"))
+            vectors = await asyncio.gather(*[llm_service.generate_embedding("VPN is down") for _ in range(10)])
+
+        assert answers[:10] == ["answer to VPN is down"] * 10
+        assert answers[10] == "answer to Printer is down"
+        assert chat.call_count == 2
+        assert vectors == [[0.1, 0.2]] * 10
+        assert embeddings.call_count == 1
+        assert llm_service.get_request_stats()["chat"]["shared"] - shared_before == 9
+
+    @pytest.mark.asyncio
+    async def test_streaming_caller_joining_a_request_gets_the_reply(self):
+        """
+        A streaming request that joins a generation started by another caller still
+        receives the reply on its own stream.
+        """
+        async def slow_chat(**kwargs):
+            await asyncio.sleep(0.05)
+            return {"message": {"content": "Reconnect the VPN"}}
+
+        async def streaming_follower(queue):
+            await asyncio.sleep(0.01)  # Let the non-streaming call start first
+            current_stream.set(queue)
+            return await llm_service.generate_response("VPN is down again")
+
+        queue = asyncio.Queue()
+        with patch.object(llm_service.client, "chat", side_effect=slow_chat) as chat:
+            leader, follower = await asyncio.gather(llm_service.generate_response("VPN is down again"),
+                                                    streaming_follower(queue))
+
+        assert leader == follower == "Reconnect the VPN"
+        assert chat.call_count == 1
+        assert queue.get_nowait() == {"event": "token", "data": {"text": "Reconnect the VPN"}}
+
+    @pytest.mark.asyncio
+    async def test_cancelling_every_caller_cancels_the_shared_request(self):
+        """
+        A shared generation keeps running while any caller still waits for it, and is
+        cancelled (freeing its concurrency slot) once the last caller is cancelled.
+        """
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def hanging_chat(**kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with patch.object(llm_service, "semaphore", asyncio.Semaphore(1)) as semaphore, \
+                patch.object(llm_service.client, "chat", side_effect=hanging_chat):
+            callers = [asyncio.create_task(llm_service.generate_response("Reset my password")) for _ in range(2)]
+            await started.wait()
+
+            callers[0].cancel()
+            await asyncio.sleep(0.01)
+            assert not cancelled.is_set()  # The other caller still wants the reply
+
+            callers[1].cancel()
+            await asyncio.wait_for(cancelled.wait(), timeout=1)
+            for caller in callers:
+                with pytest.raises(asyncio.CancelledError):
+                    await caller
+            assert llm_service.get_request_stats()["chat"]["in_flight"] == 0
+            assert not semaphore.locked()
+
+    @pytest.mark.asyncio
+    async def test_generate_embedding_timeout_returns_empty(self):
+        """
+        An embedding request that times out should return an empty vector.
+        """
+        async def hanging_embeddings(**kwargs):
+            await asyncio.sleep(5)
+
+        with patch.object(llm_service, "embedding_cache", EmbeddingCache(path=None)):
+            with patch("app.services.llm_service.settings.ollama_embedding_timeout", 0.01):
+                with patch.object(llm_service.client, "embed", side_effect=hanging_embeddings):
+                    result = await llm_service.generate_embedding("hello")
+
+        assert result == []
+
+    @pytest.mark.asyncio
+    async def test_requests_use_owned_transport_closed_on_shutdown(self):
+        """
+        Requests should go through the transport the service created, and aclose should close it.
+        """
+        service = OllamaService()
+
+        async def fake_request(request):
+            return httpx.Response(200, json={"models": []}, request=request)
+
+        with patch.object(service.transport, "handle_async_request", side_effect=fake_request) as send:
+            await service.client.list()
+        assert send.call_count == 1
+
+        with patch.object(service.transport, "aclose") as close:
+            await service.aclose()
+        close.assert_awaited_once()
+
+
+class TestEmbeddingCache:
+    """
+    Test suite for the two-tier (memory LRU + SQLite) embedding cache.
+    """
+
+    def test_normalized_text_shares_entry(self, tmp_path):
+        """
+        Case and whitespace differences should map to the same cache key,
+        while a different model should not.
+        """
+        cache = EmbeddingCache(path=str(tmp_path / "cache.db"))
+        cache.put("model-a", "Printer  not working", [0.1, 0.2, 0.3])
+
+        assert cache.get("model-a", "printer not working") is not None
+        assert cache.get("model-b", "printer not working") is None
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """
+        Entries evicted from memory (or written by another process) are served from disk.
+        """
+        path = str(tmp_path / "cache.db")
+        writer = EmbeddingCache(path=path)
+        writer.put("model-a", "vpn is down", [0.5, 0.25])
+        writer.flush()
+
+        cache = EmbeddingCache(path=path)
+        assert cache.get("model-a", "vpn is down") == [0.5, 0.25]
+        assert cache.get("model-a", "vpn is down") == [0.5, 0.25]
+
+        stats = cache.get_stats()
+        assert stats["disk_hits"] == 1
+        assert stats["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disk_writes_are_batched_and_off_the_event_loop(self, tmp_path):
+        """
+        New vectors are buffered and committed in batches from the DB thread pool, and
+        disk lookups run there too; buffered vectors are served before they reach disk.
+        """
+        path = str(tmp_path / "cache.db")
+        cache = EmbeddingCache(path=path, max_memory_entries=1, write_batch_size=3)
+        loop_thread = threading.get_ident()
+        disk_threads = []
+        original_flush = cache.flush
+
+        def recording_flush():
+            disk_threads.append(threading.get_ident())
+            original_flush()
+
+        with patch.object(cache, "flush", side_effect=recording_flush):
+            await cache.aput_many("m", [("one", [1.0]), ("two", [2.0])])
+            assert cache.get_stats()["disk_writes"] == 0
+            assert await cache.aget("m", "one") == [1.0]  # Evicted from memory, still buffered
+            await cache.aput_many("m", [("three", [3.0])])
+
+        assert cache.get_stats()["disk_writes"] == 1
+        assert cache.get_stats()["pending_writes"] == 0
+        assert disk_threads and loop_thread not in disk_threads
+
+        restarted = EmbeddingCache(path=path)
+        assert await restarted.aget_many("m", ["three", "one", "four"]) == [[3.0], [1.0], None]
+        assert restarted.get_stats()["disk_hits"] == 2
+
+    def test_memory_tier_is_bounded(self):
+        """
+        The memory tier should evict least recently used entries beyond its capacity.
+        """
+        cache = EmbeddingCache(path=None, max_memory_entries=2)
+        cache.put("m", "one", [1.0])
+        cache.put("m", "two", [2.0])
+        cache.get("m", "one")          # "two" is now least recently used
+        cache.put("m", "three", [3.0])
+
+        assert cache.get("m", "two") is None
+        assert cache.get("m", "one") == [1.0]
+        assert cache.get_stats()["memory_entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_skips_ollama(self):
+        """
+        The second embedding request for the same text should not reach Ollama.
+        """
+        async def fake_embeddings(**kwargs):
+            return {"embeddings": [[0.1, 0.2]]}
+
+        with patch.object(llm_service, "embedding_cache", EmbeddingCache(path=None)):
+            with patch.object(llm_service.client, "embed", side_effect=fake_embeddings) as mock_embed:
+                first = await llm_service.generate_embedding("printer not working")
+                second = await llm_service.generate_embedding("Printer not working ")
+
+        assert first == second
+        assert mock_embed.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_embeddings_use_embedding_model_and_cache(self):
+        """
+        generate_embeddings should send only uncached, distinct texts to the embedding
+        model, in batches of `embedding_batch_size`, and return vectors in input order.
+        """
+        calls = []
+
+        async def fake_embed(model, input):
+            calls.append((model, list(input)))
+            return {"embeddings": [[float(len(text))] for text in input]}
+
+        with patch.object(llm_service, "embedding_cache", EmbeddingCache(path=None)), \
+                patch("app.services.llm_service.settings.embedding_batch_size", 2), \
+                patch.object(llm_service.client, "embed", side_effect=fake_embed):
+            await llm_service.generate_embedding("a")  # Cached up front
+            calls.clear()
+            vectors = await llm_service.generate_embeddings(["a", "bb", "ccc", "bb", "dddd"])
+
+        assert vectors == [[1.0], [2.0], [3.0], [2.0], [4.0]]
+        assert sorted(len(batch) for _, batch in calls) == [1, 2]
+        assert {model for model, _ in calls} == {llm_service.embedding_model}
+
+
+@pytest.fixture
+def ephemeral_collection():
+    """
+    Provides a throwaway in-memory Chroma collection (with no category collections yet, and
+    an empty in-memory lexical index) patched into the vector service, so knowledge-base
+    tests never touch the persistent stores.
+    """
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(
+        name=f"test_{uuid.uuid4().hex}",
+        metadata={"hnsw:space": "cosine"}
+    )
+    with patch.object(vector_service, "client", client), patch.object(vector_service, "collection", collection), \
+            patch.object(vector_service, "partitions", {}), patch.object(vector_service, "partitions_ready", True), \
+            patch.object(vector_service, "lexical_index", LexicalIndex(None)):
+        yield collection
+
+
+class TestVectorService:
+    """
+    Test suite for knowledge-base writes in the VectorService.
+    """
+
+    @pytest.mark.asyncio
+    async def test_doc_ids_are_content_addressed(self, ephemeral_collection):
+        """
+        IDs depend only on category and question, so they do not collide across categories.
+        """
+        with patch.object(llm_service, "generate_embedding", return_value=[0.1, 0.2, 0.3]):
+            it_id = await vector_service.add_knowledge("How do I reset?", "Use the portal", "IT")
+            hr_id = await vector_service.add_knowledge("How do I reset?", "Ask HR", "HR")
+
+        assert it_id != hr_id
+        assert it_id == vector_service._make_doc_id("how do i  reset?", "IT")
+        assert ephemeral_collection.count() == 2
+
+    @pytest.mark.asyncio
+    async def test_reingest_is_noop(self, ephemeral_collection):
+        """
+        Re-adding an identical article should not embed again nor create a duplicate,
+        while a changed answer should update the existing entry in place.
+        """
+        with patch.object(llm_service, "generate_embedding", return_value=[0.1, 0.2, 0.3]) as mock_embed:
+            await vector_service.add_knowledge("VPN error 809", "Open UDP 500", "IT")
+            await vector_service.add_knowledge("VPN error 809", "Open UDP 500", "IT")
+            assert mock_embed.call_count == 1
+
+            await vector_service.add_knowledge("VPN error 809", "Open UDP 500 and 4500", "IT")
+            assert mock_embed.call_count == 2
+
+        assert ephemeral_collection.count() == 1
+        stored = ephemeral_collection.get(include=["metadatas"])
+        assert stored["metadatas"][0]["answer"] == "Open UDP 500 and 4500"
+
+    @pytest.mark.asyncio
+    async def test_bulk_ingest_batches_and_resumes(self, ephemeral_collection):
+        """
+        Bulk ingest should write in batches, and a second run over the same
+        entries (e.g. after a crash) should skip everything without re-embedding.
+        """
+        entries = [
+            {"question": f"Question {i}", "answer": f"Answer {i}", "category": "IT"}
+            for i in range(10)
+        ]
+        progress = []
+
+        embedded = []
+
+        async def embed(texts, model=None):
+            embedded.extend(texts)
+            return [[0.1, 0.2, 0.3] for _ in texts]
+
+        with patch.object(llm_service, "generate_embeddings", side_effect=embed) as mock_embed:
+            stats = await vector_service.add_knowledge_bulk(
+                iter(entries), batch_size=4, on_progress=progress.append
+            )
+            assert stats["added"] == 10
+            assert len(progress) == 3  # Batches of 4, 4 and 2
+            assert mock_embed.call_count == 3  # One batched embedding call per batch
+
+            rerun = await vector_service.add_knowledge_bulk(iter(entries), batch_size=4)
+            assert rerun["skipped"] == 10
+            assert len(embedded) == 10
+
+        assert ephemeral_collection.count() == 10
+
+    @pytest.mark.asyncio
+    async def test_bulk_ingest_leaves_failed_embeddings_for_retry(self, ephemeral_collection):
+        """
+        Entries whose embedding fails are counted as failed and not written.
+        """
+        entries = [
+            {"question": "good question", "answer": "a", "category": "IT"},
+            {"question": "bad question", "answer": "b", "category": "IT"}
+        ]
+
+        async def embed(texts, model=None):
+            return [[] if text.startswith("bad") else [0.1, 0.2] for text in texts]
+
+        with patch.object(llm_service, "generate_embeddings", side_effect=embed):
+            stats = await vector_service.add_knowledge_bulk(entries)
+
+        assert stats["added"] == 1
+        assert stats["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reembed_swaps_in_new_model_collection(self):
+        """
+        Re-embedding copies every entry into a collection built with the new model,
+        swaps it in under the same name and keeps the old one as a backup; a failed
+        run leaves the live collection untouched.
+        """
+        client = chromadb.EphemeralClient()
+        name = f"test_{uuid.uuid4().hex}"
+        collection = client.create_collection(name=name, metadata={"hnsw:space": "cosine"})
+
+        async def old_model(texts, model=None):
+            return [[1.0, 0.0] for _ in texts]
+
+        async def failing(texts, model=None):
+            return [[] for _ in texts]
+
+        async def new_model(texts, model=None):
+            assert model == "tiny-embedder"
+            return [[0.0, 1.0, 0.0] for _ in texts]
+
+        with patch.object(vector_service, "client", client), patch.object(vector_service, "collection", collection), \
+                patch.object(vector_service, "partitions", {}), patch.object(vector_service, "partitions_ready", True), \
+                patch.object(vector_service, "lexical_index", LexicalIndex(None)):
+            with patch.object(llm_service, "generate_embeddings", side_effect=old_model):
+                await vector_service.add_knowledge_bulk(
+                    [{"question": f"Question {i}", "answer": f"Answer {i}", "category": "IT"} for i in range(5)]
+                )
+            assert vector_service.embedding_model == llm_service.model  # Legacy collection: chat model
+
+            with patch.object(llm_service, "generate_embeddings", side_effect=failing):
+                with pytest.raises(RuntimeError):
+                    await vector_service.reembed("tiny-embedder", batch_size=2)
+            assert vector_service.collection.name == name
+            assert vector_service.embedding_model == llm_service.model
+
+            with patch.object(llm_service, "generate_embeddings", side_effect=new_model):
+                stats = await vector_service.reembed("tiny-embedder", batch_size=2)
+
+            assert stats["reembedded"] == 5
+            assert vector_service.collection.name == name
+            assert vector_service.embedding_model == "tiny-embedder"
+            stored = vector_service.collection.get(include=["embeddings", "metadatas"])
+            assert len(stored["ids"]) == 5 and all(len(e) == 3 for e in stored["embeddings"])
+            assert client.get_collection(stats["backup"]).count() == 5
+            partition = vector_service.partitions["IT"]
+            assert partition.count() == 5 and partition.metadata["embedding_model"] == "tiny-embedder"
+
+    @pytest.mark.asyncio
+    async def test_category_searches_use_category_collections(self, ephemeral_collection):
+        """
+        Writes go to the main collection and the category's collection; a category search
+        queries only that collection, an unfiltered one the main collection.
+        """
+        async def embed(text, model=None):
+            return [1.0, 0.0] if "VPN" in text else [0.0, 1.0]
+
+        with patch.object(vector_service, "lexical_index", None), \
+                patch.object(llm_service, "generate_embedding", side_effect=embed):
+            vpn_id = await vector_service.add_knowledge("VPN error 809", "Open UDP 500", "IT")
+            await vector_service.add_knowledge("VPN stipend", "Claim it monthly", "ACCOUNTING")
+            await vector_service.add_knowledge("Vacation days", "25 per year", "HR")
+            assert {c: p.count() for c, p in vector_service.partitions.items()} == {"IT": 1, "ACCOUNTING": 1, "HR": 1}
+
+            with patch.object(ephemeral_collection, "query", wraps=ephemeral_collection.query) as main_query:
+                results = await vector_service.search_knowledge("VPN broken", category="HR")
+                assert main_query.call_count == 0
+                assert [r["question"] for r in results] == ["Vacation days"]
+
+                results = await vector_service.search_knowledge("VPN broken", n_results=2)
+                assert main_query.call_count == 1
+                assert {r["category"] for r in results} == {"IT", "ACCOUNTING"}
+
+            assert await vector_service.search_knowledge("VPN broken", category="FACILITIES") == []
+            vector_service.delete_knowledge([vpn_id])
+            assert vector_service.partitions["IT"].count() == 0
+
+    @pytest.mark.asyncio
+    async def test_split_migrates_a_single_collection(self, ephemeral_collection):
+        """
+        A knowledge base written before partitioning is detected as not split, searched with
+        a metadata filter meanwhile, and routed to category collections after the split.
+        """
+        entries = [{"question": f"Question {i}", "answer": f"Answer {i}", "category": ["IT", "HR"][i % 2]}
+                   for i in range(6)]
+
+        async def embed(texts, model=None):
+            return [[1.0, float(i)] for i in range(len(texts))]
+
+        with patch.object(vector_service, "partitions_ready", False), \
+                patch.object(llm_service, "generate_embeddings", side_effect=embed):
+            await vector_service.add_knowledge_bulk(entries)
+        assert vector_service.partitions == {}
+
+        vector_service._load_partitions()
+        assert vector_service.partitions_ready is False
+        with patch.object(vector_service, "lexical_index", None), \
+                patch.object(llm_service, "generate_embedding", return_value=[1.0, 0.5]):
+            filtered = await vector_service.search_knowledge("question", category="HR")
+            assert {r["category"] for r in filtered} == {"HR"}
+
+            stats = vector_service.split_by_category(batch_size=4)
+            assert stats["copied"] == 6 and stats["categories"] == {"IT": 3, "HR": 3}
+            assert vector_service.partitions_ready is True
+            with patch.object(ephemeral_collection, "query") as main_query:
+                routed = await vector_service.search_knowledge("question", category="HR")
+            main_query.assert_not_called()
+            assert routed == filtered
+
+        vector_service._load_partitions()
+        assert vector_service.partitions_ready is True and set(vector_service.partitions) == {"IT", "HR"}
+
+    @pytest.mark.asyncio
+    async def test_numpy_backend_serves_searches_and_mirrors_writes(self, ephemeral_collection, tmp_path):
+        """
+        With the NumPy backend, writes go to Chroma and the index, searches come from the
+        index, deletes remove from both, and sync_index rebuilds a stale index from Chroma.
+        """
+        index = NumpyVectorIndex(str(tmp_path / "index"))
+        vectors = {"VPN error 809": [1.0, 0.0, 0.0], "Printer jam": [0.0, 1.0, 0.0], "Payroll date": [0.0, 0.0, 1.0]}
+
+        async def embed(text, model=None):
+            return vectors.get(text, [0.9, 0.1, 0.0])
+
+        with patch.object(vector_service, "index", index), \
+                patch.object(llm_service, "generate_embedding", side_effect=embed):
+            vpn_id = await vector_service.add_knowledge("VPN error 809", "Open UDP 500", "IT")
+            await vector_service.add_knowledge("Printer jam", "Open tray 2", "IT")
+            await vector_service.add_knowledge("Payroll date", "The 25th", "ACCOUNTING")
+            assert index.count() == 3 and index.count("IT") == 2
+
+            with patch.object(ephemeral_collection, "query") as chroma_query:
+                results = await vector_service.search_knowledge("my vpn keeps failing", category="IT", n_results=2)
+            chroma_query.assert_not_called()
+            assert [r["answer"] for r in results] == ["Open UDP 500", "Open tray 2"]
+            assert results[0]["similarity"] == pytest.approx(0.9 / (0.82 ** 0.5), abs=1e-5)
+            assert results[0]["document"] == "Q: VPN error 809\nA: Open UDP 500"
+
+            vector_service.delete_knowledge([vpn_id])
+            assert ephemeral_collection.count() == 2 and index.count() == 2
+
+            index.reset("some-other-model")
+            assert vector_service.sync_index() == 2
+            assert index.embedding_model == vector_service.embedding_model
+            results = await vector_service.search_knowledge("Payroll date")
+            assert results[0]["category"] == "ACCOUNTING" and results[0]["similarity"] == pytest.approx(1.0)
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_answers_exact_term_queries(self, ephemeral_collection):
+        """
+        A short query whose embedding matches poorly still finds the article containing its
+        exact terms, with a similarity that clears the agents' 0.7 threshold; entries found by
+        both rankings come first, and keyword matches survive an embedding failure.
+        """
+        vectors = {"How do I fix VPN error 809?": [0.0, 1.0], "VPN client will not install": [0.6, 0.8],
+                   "Laptop fan is loud": [1.0, 0.0], "VPN error 809": [1.0, 0.1]}
+
+        async def embed(text, model=None):
+            return vectors[text]
+
+        with patch.object(llm_service, "generate_embedding", side_effect=embed):
+            for question in ["How do I fix VPN error 809?", "VPN client will not install", "Laptop fan is loud"]:
+                await vector_service.add_knowledge(question, f"Answer to {question}", "IT")
+
+            results = await vector_service.search_knowledge("VPN error 809", category="IT", n_results=3)
+
+        assert results[0]["question"] == "How do I fix VPN error 809?"
+        assert results[0]["vector_similarity"] < 0.7 < results[0]["similarity"] == results[0]["lexical_score"]
+        assert results[1]["question"] == "VPN client will not install"  # Found by both sides
+        assert results[2]["lexical_score"] is None  # Semantic match only
+
+        with patch.object(llm_service, "generate_embedding", return_value=[]):
+            results = await vector_service.search_knowledge("vpn error 809", category="IT")
+        assert results[0]["question"] == "How do I fix VPN error 809?"
+        assert results[0]["vector_similarity"] is None
+
+
+class TestNumpyVectorIndex:
+    """
+    Test suite for the in-process memory-mapped vector index.
+    """
+
+    def test_exact_top_k_per_category(self, tmp_path):
+        """
+        Results are cosine-ranked, restricted to the requested category, and merged across
+        categories when no category is given.
+        """
+        index = NumpyVectorIndex(str(tmp_path))
+        index.upsert(["a", "b", "c"], [[1, 0], [1, 1], [0, 5]],
+                     [{"category": "IT", "answer": "a"}, {"category": "IT", "answer": "b"},
+                      {"category": "HR", "answer": "c"}])
+
+        results = index.search([2, 0], category="IT", n_results=5)
+        assert [r["id"] for r in results] == ["a", "b"]
+        assert results[0]["similarity"] == pytest.approx(1.0)
+        assert results[1]["similarity"] == pytest.approx(2 ** -0.5)
+
+        assert [r["id"] for r in index.search([0, 1], n_results=2)] == ["c", "b"]
+        assert index.search([0, 1], category="FINANCE") == []
+        with pytest.raises(ValueError):
+            index.search([1, 0, 0])
+
+    def test_incremental_updates_grow_and_persist(self, tmp_path):
+        """
+        Appends past the initial capacity grow the matrix, deletes fill the gap with the last
+        row, a changed category moves the entry, and everything survives a reload.
+        """
+        index = NumpyVectorIndex(str(tmp_path), initial_capacity=2)
+        ids = [f"doc{i}" for i in range(5)]
+        index.upsert(ids, [[1.0, float(i)] for i in range(5)], [{"category": "IT", "n": i} for i in range(5)])
+        assert index.partitions["IT"].arrays["vectors"].shape[0] == 8
+
+        assert index.delete(["doc1", "missing"]) == 1
+        index.upsert(["doc2"], [[0.0, 1.0]], [{"category": "HR", "n": 2}])
+        assert index.count("IT") == 3 and index.count("HR") == 1
+
+        reloaded = NumpyVectorIndex(str(tmp_path))
+        assert reloaded.count() == 4
+        assert sorted(r["id"] for r in reloaded.search([1.0, 0.0], category="IT")) == ["doc0", "doc3", "doc4"]
+        assert reloaded.search([0.0, 1.0], category="HR")[0]["n"] == 2
+
+        reloaded.reset("another-model")
+        assert NumpyVectorIndex(str(tmp_path)).count() == 0
+
+    def test_writes_touch_only_changed_entries(self, tmp_path):
+        """
+        Adding or deleting one entry in a large partition writes only that entry's rows of
+        the entries table, not the whole partition.
+        """
+        index = NumpyVectorIndex(str(tmp_path))
+        index.upsert([f"doc{i}" for i in range(1000)], self._skewed_vectors(1000, 8),
+                     [{"category": "IT", "n": i} for i in range(1000)])
+        partition = index.partitions["IT"]
+
+        changes = partition._conn.total_changes
+        index.upsert(["new"], self._skewed_vectors(1, 8, seed=1), [{"category": "IT", "n": -1}])
+        assert partition._conn.total_changes - changes == 1
+
+        changes = partition._conn.total_changes
+        index.delete(["doc5"])
+        assert partition._conn.total_changes - changes == 2  # Delete the row, renumber the last one
+
+        reloaded = NumpyVectorIndex(str(tmp_path))
+        assert reloaded.count() == 1000 and "doc5" not in reloaded.partitions["IT"].rows
+        assert reloaded.partitions["IT"].entries[5] == {"category": "IT", "n": -1}
+
+
+    @staticmethod
+    def _skewed_vectors(n, dimension, seed=0):
+        """
+        Random vectors whose variance decays along the dimensions (like Matryoshka embeddings),
+        so reduced dimensions keep most of the similarity structure.
+        """
+        rng = np.random.default_rng(seed)
+        return rng.standard_normal((n, dimension)).astype(np.float32) * (0.9 ** np.arange(dimension))
+
+    @pytest.mark.parametrize("dtype,dimensions,reduction", [
+        ("float16", 0, "truncate"), ("int8", 0, "truncate"), ("int8", 16, "truncate"), ("float32", 16, "pca")
+    ])
+    def test_compact_storage_reranks_to_exact_similarities(self, tmp_path, dtype, dimensions, reduction):
+        """
+        Quantized and reduced vectors select candidates; re-ranking on full-precision vectors
+        returns exact similarities and nearly the same top results as float32 at full size.
+        """
+        vectors = self._skewed_vectors(400, 48)
+        ids = [f"doc{i}" for i in range(400)]
+        entries = [{"category": "IT" if i % 2 else "HR"} for i in range(400)]
+        exact = NumpyVectorIndex(str(tmp_path / "exact"))
+        compact = NumpyVectorIndex(str(tmp_path / "compact"), dtype=dtype, dimensions=dimensions, reduction=reduction)
+        for index in (exact, compact):
+            index.upsert(ids, vectors, entries)
+        assert compact.get_stats()["scanned_bytes_per_vector"] < exact.get_stats()["scanned_bytes_per_vector"]
+
+        hits = 0
+        for query in self._skewed_vectors(20, 48, seed=1):
+            expected = exact.search(query.tolist(), category="IT", n_results=5)
+            found = compact.search(query.tolist(), category="IT", n_results=5)
+            hits += len({r["id"] for r in expected} & {r["id"] for r in found})
+            for result in found:
+                vector = vectors[int(result["id"][3:])]
+                assert result["similarity"] == pytest.approx(
+                    float(vector @ query / np.linalg.norm(vector) / np.linalg.norm(query)), abs=1e-5)
+        assert hits / 100 >= 0.9
+
+    def test_int8_without_rerank_approximates_similarity(self, tmp_path):
+        """
+        Without re-ranking no full-precision copy is kept and similarities are int8 estimates.
+        """
+        vectors = self._skewed_vectors(50, 32)
+        index = NumpyVectorIndex(str(tmp_path), dtype="int8", rerank_factor=0)
+        index.upsert([f"doc{i}" for i in range(50)], vectors, [{"category": "IT"}] * 50)
+        assert "full" not in index.partitions["IT"].arrays
+
+        result = index.search(vectors[7].tolist(), n_results=1)[0]
+        assert result["id"] == "doc7" and result["similarity"] == pytest.approx(1.0, abs=0.01)
+
+    def test_storage_format_and_pca_persist(self, tmp_path):
+        """
+        A reopened index keeps its PCA projection; one opened with a different storage format
+        starts empty so it gets rebuilt; adding far more vectors than the PCA was fitted on
+        refits it in place.
+        """
+        vectors = self._skewed_vectors(40, 24)
+        index = NumpyVectorIndex(str(tmp_path), dimensions=8, reduction="pca")
+        index.reset("model-a")
+        index.upsert([f"doc{i}" for i in range(20)], vectors[:20], [{"category": "IT"}] * 20)
+        before = index.search(vectors[3].tolist(), n_results=3)
+
+        reopened = NumpyVectorIndex(str(tmp_path), dimensions=8, reduction="pca")
+        assert reopened.pca_fitted_on == 20 and reopened.search(vectors[3].tolist(), n_results=3) == before
+        assert not reopened.needs_refit()
+        reopened.upsert([f"doc{i}" for i in range(20, 40)], vectors[20:40], [{"category": "IT"}] * 20)
+        assert not reopened.needs_refit()
+        reopened.upsert(["extra"], vectors[:1], [{"category": "HR"}])
+        assert reopened.pca_fitted_on == 41 and not reopened.needs_refit()
+        assert NumpyVectorIndex(str(tmp_path), dimensions=8, reduction="pca").pca_fitted_on == 41
+
+        other_format = NumpyVectorIndex(str(tmp_path), dtype="int8", dimensions=8, reduction="pca")
+        assert other_format.count() == 0 and other_format.embedding_model is None
+
+
+    def test_pca_waits_for_enough_vectors_and_refits_as_it_grows(self, tmp_path):
+        """
+        A PCA index on a fresh knowledge base searches exactly until it holds enough vectors
+        to fit the projection, then fits it and refits it as the index doubles.
+        """
+        vectors = self._skewed_vectors(200, 24)
+        ids = [f"doc{i}" for i in range(200)]
+        index = NumpyVectorIndex(str(tmp_path), dimensions=8, reduction="pca", rerank_factor=0)
+
+        index.upsert(ids[:1], vectors[:1], [{"category": "IT"}])
+        assert index.pca_fitted_on == 0
+        assert index.search(vectors[0].tolist(), n_results=1)[0]["similarity"] == pytest.approx(1.0)
+        index.upsert(ids[1:7], vectors[1:7], [{"category": "IT"}] * 6)
+        assert index.pca_fitted_on == 0
+        assert [r["id"] for r in index.search(vectors[4].tolist(), n_results=1)] == ["doc4"]
+
+        index.upsert(ids[7:8], vectors[7:8], [{"category": "IT"}])
+        assert index.pca_fitted_on == 8
+        fitted_on = []
+        for start in range(8, 200, 8):
+            index.upsert(ids[start:start + 8], vectors[start:start + 8], [{"category": "IT"}] * 8)
+            fitted_on.append(index.pca_fitted_on)
+        assert sorted(set(fitted_on)) == [8, 24, 56, 120] and not index.needs_refit()
+
+        exact = NumpyVectorIndex(str(tmp_path / "exact"))
+        exact.upsert(ids, vectors, [{"category": "IT"}] * 200)
+        hits = 0
+        for query in self._skewed_vectors(20, 24, seed=1):
+            expected = {r["id"] for r in exact.search(query.tolist(), n_results=5)}
+            hits += len(expected & {r["id"] for r in index.search(query.tolist(), n_results=5)})
+        assert hits / 100 >= 0.6
+
+
+class TestLexicalIndex:
+    """
+    Test suite for the BM25 keyword index over knowledge-base entries.
+    """
+
+    @staticmethod
+    def _entry(question, category="IT"):
+        return {"question": question, "answer": f"Answer to {question}", "category": category,
+                "document": f"Q: {question}"}
+
+    def test_ranks_and_scores_keyword_matches(self):
+        """
+        Distinctive shared terms score high, a single common term scores low, stopword-only
+        queries match nothing, and the category filter applies.
+        """
+        index = LexicalIndex(None)
+        questions = ["How do I fix VPN error 809?", "VPN connection drops every hour",
+                     "How do I reset my password?", "How do I request vacation time?"]
+        index.upsert([f"d{i}" for i in range(4)], [self._entry(q, "HR" if "vacation" in q else "IT") for q in questions])
+
+        results = index.search("vpn error 809")
+        assert [r["id"] for r in results] == ["d0", "d1"]
+        assert results[0]["lexical_score"] > 0.8 and results[1]["lexical_score"] < 0.3
+        assert index.search("Password reset!")[0]["lexical_score"] == pytest.approx(1.0)
+        assert index.search("how do I") == []
+        assert index.search("vacation", category="IT") == []
+        assert index.search("vacation", category="HR")[0]["id"] == "d3"
+
+    def test_upsert_and_delete_keep_the_index_in_sync(self, tmp_path):
+        """
+        Replacing an entry re-indexes its text, deleted entries stop matching, and a file-backed
+        index keeps its entries across reopening.
+        """
+        path = str(tmp_path / "lexical.db")
+        index = LexicalIndex(path)
+        index.upsert(["a", "b"], [self._entry("Printer jam in tray 2"), self._entry("Outlook crashes on start")])
+        index.upsert(["a"], [self._entry("Scanner shows error E5")])
+
+        assert index.search("printer") == []
+        assert index.search("scanner e5")[0]["id"] == "a"
+        assert index.delete(["b", "missing"]) == 1
+        assert index.search("outlook") == []
+        assert LexicalIndex(path).count() == 1
+
+
+class TestKnowledgeLoader:
+    """
+    Test suite for streaming knowledge entries out of Markdown, JSONL and CSV files.
+    """
+
+    def test_reads_all_supported_formats(self, tmp_path):
+        """
+        Each format should yield normalized entries; unknown file types are ignored.
+        """
+        hr_dir = tmp_path / "hr"
+        hr_dir.mkdir()
+        (hr_dir / "vacation.md").write_text("# How do I request vacation?\n\nUse the HR portal.")
+        (tmp_path / "faq.jsonl").write_text(
+            '{"question": "VPN error 809", "answer": "Open UDP 500", "category": "it"}\n\nnot json\n'
+        )
+        (tmp_path / "expenses.csv").write_text("question,answer\nHow do I expense?,Submit receipts\n")
+        (tmp_path / "notes.txt").write_text("ignored")
+
+        entries = list(iter_knowledge_entries([str(tmp_path)], default_category=None))
+        by_question = {entry["question"]: entry for entry in entries}
+
+        assert len(entries) == 3
+        assert by_question["How do I request vacation?"]["category"] == "HR"
+        assert by_question["How do I request vacation?"]["answer"] == "Use the HR portal."
+        assert by_question["VPN error 809"]["category"] == "IT"
+        assert by_question["How do I expense?"]["answer"] == "Submit receipts"
+
+    def test_markdown_front_matter_overrides(self, tmp_path):
+        """
+        YAML front matter can set the question and category of a Markdown article.
+        """
+        (tmp_path / "printer.md").write_text(
+            "---\nquestion: printer not working\ncategory: IT\n---\nRestart the spooler."
+        )
+
+        entries = list(iter_knowledge_entries([str(tmp_path / "printer.md")], default_category="HR"))
+
+        assert entries[0]["question"] == "printer not working"
+        assert entries[0]["category"] == "IT"
+        assert entries[0]["answer"] == "Restart the spooler."
+
+
+    def test_malformed_records_are_skipped_or_coerced(self, tmp_path, monkeypatch):
+        """
+        Front matter that is not a mapping, non-string values and non-object JSONL lines
+        never abort the ingest; a file with no parent directory name gets the fallback category.
+        """
+        (tmp_path / "rule.md").write_text("--- just text ---\n# Reset MFA\n\nUse the self-service portal.")
+        (tmp_path / "odd.jsonl").write_text(
+            '{"question": "Form W-4", "answer": 2024, "category": 7}\n[1, 2]\n"text"\n'
+        )
+        (tmp_path / "plain.jsonl").write_text('{"question": "VPN error 809", "answer": "Open UDP 500"}\n')
+        monkeypatch.chdir(tmp_path)
+
+        entries = list(iter_knowledge_entries(["rule.md", "odd.jsonl", "plain.jsonl"]))
+
+        assert [(e["question"], e["answer"], e["category"]) for e in entries] == [
+            ("Reset MFA", "Use the self-service portal.", "GENERAL"),
+            ("Form W-4", "2024", "7"),
+            ("VPN error 809", "Open UDP 500", "GENERAL")
+        ]
+
+
+class TestLocalIntentClassifier:
+    """
+    Test suite for the in-process TF-IDF / logistic regression intent classifier.
+    """
+
+    TRAINING_DATA = [
+        ("my printer is jammed and will not print", "IT_HARDWARE"),
+        ("the laptop screen is flickering", "IT_HARDWARE"),
+        ("keyboard keys stopped working on my computer", "IT_HARDWARE"),
+        ("outlook crashes when opening email", "IT_SOFTWARE"),
+        ("excel application error on startup", "IT_SOFTWARE"),
+        ("cannot install the vpn software update", "IT_SOFTWARE"),
+        ("how many vacation days do I have left", "HR"),
+        ("question about my health benefits enrollment", "HR"),
+        ("where do I find the parental leave policy", "HR"),
+        ("how do I submit an expense report", "ACCOUNTING"),
+        ("invoice payment to vendor is overdue", "ACCOUNTING"),
+        ("reimbursement for travel expenses", "ACCOUNTING"),
+    ]
+
+    def _trained(self):
+        model = LocalIntentClassifier()
+        model.fit([text for text, _ in self.TRAINING_DATA], [label for _, label in self.TRAINING_DATA])
+        return model
+
+    def test_untrained_model_defers(self):
+        """
+        Without a trained model, predict returns None so the LLM is used.
+        """
+        assert LocalIntentClassifier().predict("printer is broken") is None
+
+    def test_predicts_training_categories(self):
+        """
+        Messages close to the training data are classified into the right category.
+        """
+        model = self._trained()
+
+        assert model.predict("my printer will not print")["category"] == "IT_HARDWARE"
+        assert model.predict("submit an expense report for travel")["category"] == "ACCOUNTING"
+        assert model.predict("vacation days left")["category"] == "HR"
+        assert model.predict("zzz qqq") is None  # No known vocabulary
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """
+        A saved model reloads with identical predictions; a missing file leaves it untrained.
+        """
+        model = self._trained()
+        path = str(tmp_path / "intent_model.json")
+        model.save(path)
+
+        reloaded = LocalIntentClassifier()
+        assert reloaded.load(path) is True
+        assert reloaded.predict("outlook email crashes") == model.predict("outlook email crashes")
+        assert LocalIntentClassifier().load(str(tmp_path / "missing.json")) is False
+
+    @pytest.mark.asyncio
+    async def test_training_labels_cache_only_real_llm_answers(self, tmp_path, monkeypatch):
+        """
+        Fallback classifications and unknown categories are not written to the label cache.
+        """
+        import train_intent_classifier
+        monkeypatch.chdir(tmp_path)
+        Path(train_intent_classifier.LABEL_CACHE).write_text(
+            json.dumps({"text": "stale apology", "category": FALLBACK_RESPONSE}) + "\n")
+        replies = {
+            "printer is jammed again": "IT_HARDWARE|0.9",
+            "stale apology": "HR|0.8",
+            "ollama is down": FALLBACK_RESPONSE,
+            "unparseable reply": "IT_SOFTWARE|very sure",
+            "made up category": "FACILITIES|0.7",
+        }
+
+        async def fake_generate(prompt, stream_tokens=True):
+            return next(reply for text, reply in replies.items() if f'"{text}"' in prompt)
+
+        with patch.object(llm_service, "generate_response", side_effect=fake_generate):
+            labels = await train_intent_classifier.label_with_llm(list(replies), concurrency=2)
+
+        assert labels["printer is jammed again"] == "IT_HARDWARE"
+        assert labels["stale apology"] == "HR"  # Cached fallback was relabelled
+        assert labels["ollama is down"] is None
+        cached = [json.loads(line) for line in Path(train_intent_classifier.LABEL_CACHE).read_text().splitlines()]
+        assert [record for record in cached if record["category"] != FALLBACK_RESPONSE] == [
+            {"text": "printer is jammed again", "category": "IT_HARDWARE"},
+            {"text": "stale apology", "category": "HR"},
+        ]
+
+
+class FakeRedisServer:
+    """
+    Minimal local stand-in for a Redis server: speaks RESP and supports
+    PING, GET, SET (with EX) and DEL, which is all the session store uses.
+    Replies can be delayed to simulate a slow server.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.server = None
+        self.delay = 0.0
+        self.connections = 0
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode())
+                reply = self._execute(args)
+                await asyncio.sleep(self.delay)
+                writer.write(reply)
+                await writer.drain()
+        except ConnectionError:
+            pass  # The client went away before its reply was sent
+        finally:
+            writer.close()
+
+    def _execute(self, args):
+        command = args[0].upper()
+        if command == "PING":
+            return b"+PONG\r\n"
+        if command == "SET":
+            ttl = int(args[4]) if len(args) > 4 and args[3].upper() == "EX" else None
+            self.data[args[1]] = (args[2], ttl)
+            return b"+OK\r\n"
+        if command == "GET":
+            if args[1] not in self.data:
+                return b"$-1\r\n"
+            value = self.data[args[1]][0].encode()
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == "DEL":
+            return b":%d\r\n" % (1 if self.data.pop(args[1], None) else 0)
+        return b"-ERR unknown command\r\n"
+
+
+class StubSearchServer:
+    """
+    Minimal local HTTP/1.1 server standing in for the search providers: serves Google
+    Custom Search JSON on /customsearch and DuckDuckGo-style HTML on /html/, with an
+    optional delay. Counts requests and TCP connections.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.requests = []
+        self.connections = 0
+        self.server = None
+        self.handlers = set()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self.server.close()
+        for handler in self.handlers:
+            handler.cancel()  # Connections still sleeping on a delayed response
+        await asyncio.gather(*self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        self.handlers.add(asyncio.current_task())
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b"\r\n", b""):
+                    pass  # Headers are not needed
+                target = request_line.split()[1].decode()
+                self.requests.append(target)
+                await asyncio.sleep(self.delay)
+
+                query = parse_qs(urlparse(target).query).get("q", [""])[0]
+                if target.startswith("/customsearch"):
+                    content_type = "application/json"
+                    body = json.dumps({"items": [
+                        {"title": f"Result for {query}", "link": "https://example.com/1", "snippet": "Restart it"}
+                    ]}).encode()
+                else:
+                    content_type = "text/html"
+                    body = (f'<div class="result"><a class="result__a" href="https://example.com/{i}">'
+                            f'{query} {i}</a><a class="result__snippet">Snippet {i}</a></div>'
+                            for i in range(5))
+                    body = "".join(body).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: %s\r\nContent-Length: %d\r\n\r\n%s"
+                             % (content_type.encode(), len(body), body))
+                await writer.drain()
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.handlers.discard(asyncio.current_task())
+            writer.close()
+
+
+class TestSessionStore:
+    """
+    Test suite for the pluggable session stores and their per-session caps.
+    """
+
+    CAPS = {"ttl_seconds": 60, "max_messages": 3, "max_bytes": 10000}
+
+    def _state(self, n_messages: int):
+        return {
+            "session_id": "s1",
+            "category": "IT_SOFTWARE",
+            "messages": [{"role": "user", "content": f"message {i}"} for i in range(n_messages)]
+        }
+
+    @pytest.mark.asyncio
+    async def test_memory_store_caps_and_evicts(self):
+        """
+        Only the most recent messages are kept, and the least recently used session is evicted.
+        """
+        store = InMemorySessionStore(max_sessions=2, **self.CAPS)
+        await store.save("a", self._state(5))
+        await store.save("b", self._state(1))
+        await store.get("a")                     # "b" becomes least recently used
+        await store.save("c", self._state(1))
+
+        state = await store.get("a")
+        assert [m["content"] for m in state["messages"]] == ["message 2", "message 3", "message 4"]
+        assert await store.get("b") is None
+
+    @pytest.mark.asyncio
+    async def test_byte_cap_drops_oldest_messages(self):
+        """
+        A session over its byte budget loses its oldest messages but keeps the rest of the state.
+        """
+        store = InMemorySessionStore(max_sessions=10, ttl_seconds=60, max_messages=100, max_bytes=300)
+        await store.save("a", self._state(20))
+
+        state = await store.get("a")
+        assert 0 < len(state["messages"]) < 20
+        assert state["messages"][-1]["content"] == "message 19"
+        assert state["category"] == "IT_SOFTWARE"
+
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        """
+        A backend that does not implement every storage method fails when it is created.
+        """
+        class LoadOnlyStore(SessionStore):
+            async def _load(self, session_id):
+                return None
+
+        with pytest.raises(TypeError):
+            LoadOnlyStore(**self.CAPS)
+
+    @pytest.mark.asyncio
+    async def test_memory_store_expires_sessions(self):
+        """
+        Sessions idle longer than the TTL are gone.
+        """
+        store = InMemorySessionStore(max_sessions=10, ttl_seconds=0, max_messages=3, max_bytes=10000)
+        await store.save("a", self._state(1))
+
+        assert await store.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_sqlite_store_shared_between_instances(self, tmp_path):
+        """
+        Two store instances on the same file (e.g. two workers) see the same sessions.
+        """
+        path = str(tmp_path / "sessions.db")
+        worker_one = SQLiteSessionStore(path=path, **self.CAPS)
+        worker_two = SQLiteSessionStore(path=path, **self.CAPS)
+
+        await worker_one.save("a", self._state(5))
+        state = await worker_two.get("a")
+        assert len(state["messages"]) == 3
+
+        await worker_two.delete("a")
+        assert await worker_one.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_store_against_local_server(self):
+        """
+        The Redis-protocol backend round-trips state and sets a server-side expiry.
+        """
+        server = FakeRedisServer()
+        port = await server.start()
+        try:
+            store = RedisSessionStore(url=f"redis://127.0.0.1:{port}/0", **self.CAPS)
+            await store.save("a", self._state(5))
+
+            state = await store.get("a")
+            assert len(state["messages"]) == 3
+            assert server.data["session:a"][1] == 60
+
+            await store.delete("a")
+            assert await store.get("a") is None
+            assert await store.get("missing") is None
+        finally:
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_redis_store_cancelled_command_does_not_leak_its_reply(self):
+        """
+        A command cancelled after it was sent (e.g. a disconnected /chat/stream client) must
+        not leave its reply on the shared connection for the next command to read.
+        """
+        server = FakeRedisServer()
+        port = await server.start()
+        try:
+            store = RedisSessionStore(url=f"redis://127.0.0.1:{port}/0", **self.CAPS)
+            await store.save("a", {**self._state(1), "session_id": "a"})
+            await store.save("b", {**self._state(1), "session_id": "b"})
+
+            server.delay = 0.2
+            pending = asyncio.create_task(store.get("a"))
+            await asyncio.sleep(0.05)  # GET a has been written; its reply is still on the way
+            pending.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+            server.delay = 0.0
+
+            assert (await store.get("b"))["session_id"] == "b"
+            await asyncio.sleep(0.3)  # Past the point where the stale reply would have arrived
+            assert (await store.get("b"))["session_id"] == "b"
+            assert server.connections == 2
+        finally:
+            await server.stop()
+
+
+class TestWebSearchService:
+    """
+    Test suite for the pooled, cached web search client (against a local stub server).
+    """
+
+    def _service(self, base_url: str, google: bool = True, **overrides) -> WebSearchService:
+        options = {
+            "google_url": f"{base_url}/customsearch/v1",
+            "duckduckgo_url": f"{base_url}/html/",
+            "google_timeout": 2.0,
+            "duckduckgo_timeout": 2.0,
+            "max_connections": 4,
+            "cache_ttl_seconds": 60,
+            "cache_size": 100,
+            "api_key": "key" if google else None,
+            "engine_id": "cx" if google else None,
+            **overrides
+        }
+        return WebSearchService(**options)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_searches_share_one_request(self):
+        """
+        Concurrent searches for the same (normalized) query should make a single upstream
+        call, and later repeats should be served from the cache.
+        """
+        server = StubSearchServer(delay=0.2)
+        service = self._service(await server.start())
+        try:
+            queries = ["printer offline", "Printer  Offline", " PRINTER offline "] * 4
+            results = await asyncio.gather(*(service.search_web(q, 3) for q in queries))
+            assert all(r == results[0] for r in results)
+            assert results[0][0]["title"] == "Result for printer offline"
+
+            assert await service.search_web("printer offline", 3) == results[0]
+            assert len(server.requests) == 1
+            assert service.get_stats()["requests"]["shared"] == len(queries) - 1
+        finally:
+            await service.aclose()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_duckduckgo_fallback_reuses_connection(self):
+        """
+        Without Google credentials results are scraped from the HTML page, and
+        sequential searches reuse one keep-alive connection.
+        """
+        server = StubSearchServer()
+        service = self._service(await server.start(), google=False)
+        try:
+            for query in ("vpn drops", "outlook crash", "wifi slow"):
+                results = await service.search_web(query, 3)
+                assert [r["title"] for r in results] == [f"{query} {i}" for i in range(3)]
+                assert results[0]["snippet"] == "Snippet 0"
+            assert len(server.requests) == 3
+            assert server.connections == 1
+        finally:
+            await service.aclose()
+            await server.stop()
+
+    @pytest.mark.asyncio
+    async def test_timeout_returns_empty_and_is_not_cached(self):
+        """
+        A provider slower than its timeout yields no results, and the failure is not cached.
+        """
+        server = StubSearchServer(delay=0.5)
+        service = self._service(await server.start(), google_timeout=0.1)
+        try:
+            assert await service.search_web("disk full", 3) == []
+            server.delay = 0
+            assert len(await service.search_web("disk full", 3)) == 1
+        finally:
+            await service.aclose()
+            await server.stop()
+
+
+class TestSemanticResponseCache:
+    """
+    Test suite for the embedding-similarity cache of generated answers.
+    """
+
+    # Fake embeddings: the two vacation phrasings are nearly parallel, payroll is orthogonal
+    EMBEDDINGS = {
+        "How do I request vacation?": [1.0, 0.0, 0.0],
+        "how can I request vacation time": [0.99, 0.05, 0.0],
+        "When is payday?": [0.0, 1.0, 0.0],
+    }
+
+    @pytest.fixture(autouse=True)
+    def fake_embeddings(self):
+        async def embed(text):
+            return self.EMBEDDINGS.get(text, [0.0, 0.0, 1.0])
+        with patch.object(llm_service, "generate_embedding", side_effect=embed):
+            yield
+
+    def _cache(self, **overrides) -> SemanticResponseCache:
+        options = {"similarity_threshold": 0.95, "ttl_seconds": 60, "max_entries_per_category": 10, **overrides}
+        return SemanticResponseCache(**options)
+
+    @pytest.mark.asyncio
+    async def test_similar_question_hits_within_category(self):
+        """
+        A rephrased question reuses the answer; other questions and other categories miss.
+        """
+        cache = self._cache()
+        await cache.store("HR", "How do I request vacation?", "Use the HR portal")
+
+        hit = await cache.lookup("HR", "how can I request vacation time")
+        assert hit["answer"] == "Use the HR portal"
+        assert hit["similarity"] > 0.95
+        assert await cache.lookup("HR", "When is payday?") is None
+        assert await cache.lookup("ACCOUNTING", "How do I request vacation?") is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_one_category(self):
+        """
+        Invalidating a category empties it and leaves the others alone.
+        """
+        cache = self._cache()
+        await cache.store("HR", "How do I request vacation?", "Use the HR portal")
+        await cache.store("ACCOUNTING", "When is payday?", "The last Friday of the month")
+
+        assert cache.invalidate("HR") == 1
+        assert await cache.lookup("HR", "How do I request vacation?") is None
+        assert (await cache.lookup("ACCOUNTING", "When is payday?"))["answer"] == "The last Friday of the month"
+
+    @pytest.mark.asyncio
+    async def test_expiry_eviction_and_fallbacks(self):
+        """
+        Entries expire after the TTL, the least recently used is evicted past the size cap,
+        and the LLM failure fallback is never cached.
+        """
+        expired = self._cache(ttl_seconds=0)
+        await expired.store("HR", "How do I request vacation?", "Use the HR portal")
+        assert await expired.lookup("HR", "How do I request vacation?") is None
+
+        small = self._cache(max_entries_per_category=1)
+        await small.store("HR", "How do I request vacation?", "Use the HR portal")
+        await small.store("HR", "When is payday?", "Ask accounting")
+        assert await small.lookup("HR", "How do I request vacation?") is None
+        assert small.get_stats()["evictions"] == 1
+
+        await small.store("HR", "How do I request vacation?", FALLBACK_RESPONSE)
+        assert await small.lookup("HR", "How do I request vacation?") is None
+
+
+@pytest.fixture
+def temp_database(tmp_path):
+    """
+    Points the application's session factories at a fresh SQLite database in tmp_path,
+    so ticket and analytics tests never write to the real helpdesk.db.
+
+    Yields:
+        sessionmaker: Session factory for the temporary database.
+    """
+    temp_engine = create_db_engine(f"sqlite:///{tmp_path / 'helpdesk.db'}")
+    Base.metadata.create_all(bind=temp_engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=temp_engine)
+    with patch.object(database, "SessionLocal", session_factory), \
+            patch.object(database, "ReadSessionLocal", session_factory):
+        yield session_factory
+    temp_engine.dispose()
+
+
+@pytest.mark.usefixtures("temp_database")
+class TestTicketService:
+    """
+    Test suite for ticket database operations run through the DB thread pool,
+    against a temporary database.
+    """
+
+    @pytest.mark.asyncio
+    async def test_db_calls_run_off_event_loop(self):
+        """
+        run_db should execute service methods on a DB worker thread, not the event loop thread.
+        """
+        def current_thread_name():
+            return threading.current_thread().name
+
+        assert (await run_db(current_thread_name)).startswith("db")
+
+    @pytest.mark.asyncio
+    async def test_update_ticket_assigns_and_resolves(self):
+        """
+        Updating a ticket to resolved should set the assignee and resolution timestamp,
+        and unknown tickets should return None.
+        """
+        ticket = await run_db(
+            ticket_service.create_ticket,
+            user_id="test_user",
+            category="IT_HARDWARE",
+            title="Printer Issue",
+            description="Printer jams on every page"
+        )
+
+        updated = await run_db(ticket_service.update_ticket, ticket.id, "Resolved", "support-engineer")
+        assert updated.assigned_to == "support-engineer"
+        assert updated.resolved_at is not None
+        assert await run_db(ticket_service.update_ticket, 10**9, "resolved", "support-engineer") is None
+
+    def test_list_tickets_pages_with_cursor(self):
+        """
+        Walking the cursor should return every matching ticket exactly once, newest first,
+        and filters should be applied server-side.
+        """
+        user_id = f"pager_{uuid.uuid4().hex[:8]}"
+        created = [
+            ticket_service.create_ticket(user_id, "HR" if i % 2 else "IT_SOFTWARE", f"Ticket {i}", "details").id
+            for i in range(5)
+        ]
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = ticket_service.list_tickets(user_id=user_id, limit=2, cursor=cursor)
+            assert len(page) <= 2
+            seen.extend(ticket.id for ticket in page)
+            if cursor is None:
+                break
+
+        assert seen == list(reversed(created))
+        hr_tickets, _ = ticket_service.list_tickets(user_id=user_id, category="HR", order="asc")
+        assert [ticket.id for ticket in hr_tickets] == [created[1], created[3]]
+        with pytest.raises(ValueError):
+            ticket_service.list_tickets(user_id=user_id, cursor="not-a-cursor")
+
+    def test_counters_follow_creates_and_status_changes(self):
+        """
+        Dashboard stats come from counters that are updated with every ticket insert and status change.
+        """
+        category = f"TEST_{uuid.uuid4().hex[:8]}"
+        before = ticket_service.get_dashboard_stats()
+
+        ticket = ticket_service.create_ticket("counter_user", category, "Counter test", "details")
+        created = ticket_service.get_dashboard_stats()
+        assert created["total_tickets"] == before["total_tickets"] + 1
+        assert created["open_tickets"] == before["open_tickets"] + 1
+        assert {"category": category, "count": 1} in created["category_breakdown"]
+
+        ticket_service.update_ticket(ticket.id, "resolved", "support-engineer")
+        resolved = ticket_service.get_dashboard_stats()
+        assert resolved["open_tickets"] == before["open_tickets"]
+        assert resolved["resolved_tickets"] == before["resolved_tickets"] + 1
+        assert ticket_service.check_counters() == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_status_changes_keep_counters_exact(self, temp_database):
+        """
+        Concurrent updates of one ticket on the DB pool must each move it from the status it
+        really had, so the counters never drift.
+        """
+        category = f"TEST_{uuid.uuid4().hex[:8]}"
+        ticket = ticket_service.create_ticket("race_user", category, "Race", "details")
+        record_resolution = analytics_service.record_resolution
+
+        def slow_record_resolution(db, changed, sign):
+            threading.Event().wait(0.02)  # Widen the window between reading and committing
+            record_resolution(db, changed, sign)
+
+        statuses = ["resolved", "in-progress", "closed", "resolved"] * 2
+        with patch.object(analytics_service, "record_resolution", side_effect=slow_record_resolution):
+            await asyncio.gather(*[
+                run_db(ticket_service.update_ticket, ticket.id, status, f"engineer-{i}")
+                for i, status in enumerate(statuses)
+            ])
+            await run_db(ticket_service.update_ticket_status, ticket.id, "open")
+
+        assert ticket_service.check_counters() == []
+        db = temp_database()
+        try:
+            # Reopened in the end: every resolution taken back out of the rollups exactly once
+            assert [(row.created, row.resolved) for row in
+                    db.query(TicketHourlyStats).filter(TicketHourlyStats.category == category)] == [(1, 0)]
+            assert all(row.count == 0 for row in
+                       db.query(ResolutionTimeHistogram).filter(ResolutionTimeHistogram.category == category))
+        finally:
+            db.close()
+
+    def test_check_counters_reports_and_repairs_drift(self, temp_database):
+        """
+        A counter that no longer matches the tickets table is reported, and fixed with fix=True.
+        """
+        db = temp_database()
+        try:
+            ticket_service._bump_counter(db, "GENERAL", "open", 5)
+            db.commit()
+        finally:
+            db.close()
+
+        drift = ticket_service.check_counters()
+        assert [(d["category"], d["status"], d["stored"] - d["expected"]) for d in drift] == [("GENERAL", "open", 5)]
+        ticket_service.check_counters(fix=True)
+        assert ticket_service.check_counters() == []
+
+
+class TestChatLogWriter:
+    """
+    Test suite for the write-behind chat log writer. Database writes are captured
+    by patching TicketService so batch boundaries can be inspected.
+    """
+
+    @pytest.fixture
+    def batches(self):
+        written = []
+        with patch.object(ticket_service, "log_chats", side_effect=lambda rows: written.append(list(rows))):
+            yield written
+
+    @pytest.mark.asyncio
+    async def test_flushes_full_batches_and_drains_on_stop(self, batches):
+        """
+        Rows should be written in batches of `batch_size`, and stop() should flush the remainder.
+        """
+        writer = ChatLogWriter(batch_size=3, flush_interval_ms=1000, max_queue_size=100)
+        writer.start()
+        for i in range(7):
+            await writer.log("session", f"message {i}", "response", "hr")
+        await writer.stop()
+
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+        assert [row["user_message"] for batch in batches for row in batch] == [f"message {i}" for i in range(7)]
+        assert writer.get_stats()["written"] == 7
+
+    @pytest.mark.asyncio
+    async def test_flushes_partial_batch_after_interval(self, batches):
+        """
+        A partial batch should be written once the flush interval elapses, without waiting for stop().
+        """
+        writer = ChatLogWriter(batch_size=100, flush_interval_ms=20, max_queue_size=100)
+        writer.start()
+        await writer.log("session", "hello", "hi", "accounting")
+        await writer.log("session", "thanks", "welcome", "accounting")
+        await asyncio.sleep(0.2)
+
+        assert [len(batch) for batch in batches] == [2]
+        await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_drop_policy_discards_when_queue_full(self, batches):
+        """
+        With the "drop" policy, rows beyond the queue bound are discarded instead of blocking.
+        """
+        writer = ChatLogWriter(batch_size=10, flush_interval_ms=1000, max_queue_size=2, overflow_policy="drop")
+        writer.start()
+        for i in range(5):
+            await writer.log("session", f"message {i}", "response", "hr")
+        await writer.stop()
+
+        assert writer.get_stats()["dropped"] == 3
+        assert sum(len(batch) for batch in batches) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_directly_when_not_started(self):
+        """
+        Outside the API (scripts, tests) the writer should fall back to a direct write.
+        """
+        writer = ChatLogWriter(batch_size=10, flush_interval_ms=1000, max_queue_size=10)
+        with patch.object(ticket_service, "log_chat") as mock_log:
+            await writer.log("session", "hello", "hi", "hr")
+
+        mock_log.assert_called_once_with("session", "hello", "hi", "hr", None)
+
+
+class TestDatabaseEngine:
+    """
+    Test suite for the SQLite engine profile (PRAGMAs, read-only replica engine).
+    """
+
+    def test_connections_use_tuned_pragmas(self):
+        """
+        Every pooled connection should be in WAL mode with a busy timeout.
+        """
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+
+    def test_read_engine_not_blocked_by_open_write(self, tmp_path):
+        """
+        A read-only engine should read committed data while a write transaction is open,
+        and should refuse to write.
+        """
+        path = tmp_path / "replica.db"
+        primary = create_db_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=primary)
+        replica = create_db_engine(f"sqlite:///file:{path}?mode=ro&uri=true", read_only=True)
+
+        insert = "INSERT INTO chat_logs (session_id, user_message, agent_response, agent_type) VALUES ('s', 'u', 'a', 'hr')"
+        with primary.begin() as conn:
+            conn.exec_driver_sql(insert)
+
+        with primary.connect() as writer:
+            writer.exec_driver_sql("BEGIN IMMEDIATE")
+            writer.exec_driver_sql(insert)  # Uncommitted, holds the write lock
+            with replica.connect() as reader:
+                assert reader.exec_driver_sql("SELECT COUNT(*) FROM chat_logs").scalar() == 1
+                with pytest.raises(sqlalchemy.exc.OperationalError):
+                    reader.exec_driver_sql(insert)
+            writer.exec_driver_sql("ROLLBACK")
+
+        primary.dispose()
+        replica.dispose()
+
+
+@pytest.mark.usefixtures("temp_database")
+class TestAnalyticsService:
+    """
+    Test suite for the time-series rollups behind /analytics/timeseries,
+    against a temporary database.
+    """
+
+    def _rollup_rows(self, db, category):
+        hourly = db.query(TicketHourlyStats.hour, TicketHourlyStats.created, TicketHourlyStats.resolved).filter(
+            TicketHourlyStats.category == category).all()
+        histogram = db.query(ResolutionTimeHistogram.assignee, ResolutionTimeHistogram.bucket,
+                             ResolutionTimeHistogram.count).filter(
+            ResolutionTimeHistogram.category == category, ResolutionTimeHistogram.count != 0).all()
+        return sorted((h, c, r) for h, c, r in hourly if c or r), sorted(histogram)
+
+    def test_timeseries_counts_and_percentiles(self):
+        """
+        Created/resolved/open counts and resolution percentiles should reflect ticket writes.
+        """
+        category = f"TS_{uuid.uuid4().hex[:8]}"
+        tickets = [ticket_service.create_ticket("ts_user", category, f"Ticket {i}", "details") for i in range(3)]
+        ticket_service.update_ticket(tickets[0].id, "resolved", "alice")
+        ticket_service.update_ticket(tickets[1].id, "resolved", "bob")
+
+        now = datetime.utcnow()
+        result = analytics_service.get_timeseries(now - timedelta(hours=2), now + timedelta(hours=1), "hour", category)
+
+        assert len(result["buckets"]) == 4
+        assert sum(b["created"] for b in result["buckets"]) == 3
+        assert sum(b["resolved"] for b in result["buckets"]) == 2
+        assert result["buckets"][-1]["open"] == 1
+        assert result["resolution_time"]["by_category"][category]["count"] == 2
+        assert result["resolution_time"]["by_category"][category]["p50_seconds"] is not None
+        assert set(result["resolution_time"]["by_assignee"]) == {"alice", "bob"}
+
+    def test_incremental_rollups_match_rebuild(self, temp_database):
+        """
+        After resolving, reopening and reassigning, the incrementally maintained rollups
+        should equal a full rebuild from the tickets table.
+        """
+        category = f"TS_{uuid.uuid4().hex[:8]}"
+        tickets = [ticket_service.create_ticket("ts_user", category, f"Ticket {i}", "details") for i in range(3)]
+        ticket_service.update_ticket(tickets[0].id, "resolved", "alice")
+        ticket_service.update_ticket(tickets[1].id, "resolved", "alice")
+        ticket_service.update_ticket(tickets[1].id, "open", "alice")       # Reopened
+        ticket_service.update_ticket(tickets[0].id, "resolved", "bob")     # Reassigned after resolution
+
+        db = temp_database()
+        try:
+            incremental = self._rollup_rows(db, category)
+            analytics_service.rebuild_rollups(db)
+            rebuilt = self._rollup_rows(db, category)
+        finally:
+            db.close()
+
+        assert incremental == rebuilt
+        assert [assignee for assignee, _, _ in incremental[1]] == ["bob"]
+
+    def test_percentiles_from_histogram(self):
+        """
+        Histogram percentiles should land within the bucket error (~10%) of the true values.
+        """
+        histogram = {resolution_bucket(60): 50, resolution_bucket(3600): 40, resolution_bucket(86400): 10}
+        result = analytics_service._percentiles(histogram)
+
+        assert result["count"] == 100
+        assert result["p50_seconds"] == pytest.approx(60, rel=0.1)
+        assert result["p90_seconds"] == pytest.approx(3600, rel=0.1)
+        assert result["p99_seconds"] == pytest.approx(86400, rel=0.1)
+
+    def test_rejects_oversized_range(self):
+        """
+        Requests spanning more than MAX_BUCKETS buckets should be rejected.
+        """
+        now = datetime.utcnow()
+        with pytest.raises(ValueError):
+            analytics_service.get_timeseries(now - timedelta(days=3650), now, "hour")
+
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Train the local intent classifier from historical tickets and chat logs.
+
+Usage:
+    python train_intent_classifier.py              # label history with the LLM, then train
+    python train_intent_classifier.py --no-llm     # use labels already stored in the database
+
+By default every distinct historical message is labelled once by the LLM
+classifier (labels are cached in intent_labels.jsonl so re-runs are cheap), so
+the reported hold-out accuracy is the local model's agreement with the LLM.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from pathlib import Path
+from app.models.database import SessionLocal, Ticket, ChatLog
+from app.services.intent_classifier import LocalIntentClassifier, CATEGORIES
+from app.utils.config import settings
+
+# Chat log agent types that map directly onto a single category
+AGENT_TYPE_LABELS = {"hr": "HR", "accounting": "ACCOUNTING"}
+
+LABEL_CACHE = "intent_labels.jsonl"
+
+
+def load_history():
+    """
+    Collect distinct user messages from the database with any label the data already implies.
+
+    Returns:
+        dict: message text -> category (or None when only the LLM can label it)
+    """
+    db = SessionLocal()
+    try:
+        messages = {}
+        ticket_categories = dict(db.query(Ticket.id, Ticket.category).all())
+
+        for description, category in db.query(Ticket.description, Ticket.category).all():
+            # Tickets store "Initial issue: ...\n\nAdditional details: ..."; the first part is what was classified
+            first_message = description.split("\n\nAdditional details:")[0].replace("Initial issue:", "").strip()
+            messages[first_message] = category
+
+        for user_message, agent_type, ticket_id in db.query(
+                ChatLog.user_message, ChatLog.agent_type, ChatLog.ticket_id).all():
+            label = AGENT_TYPE_LABELS.get(agent_type) or ticket_categories.get(ticket_id)
+            if messages.get(user_message) is None:
+                messages[user_message] = label
+    finally:
+        db.close()
+
+    # Short follow-ups ("yes", "no thanks") carry no intent and are never classified
+    return {text: label for text, label in messages.items() if len(text.split()) >= 3}
+
+
+async def label_with_llm(texts, concurrency):
+    """
+    Label messages with the LLM classifier, reusing cached labels from earlier runs.
+
+    Only real answers are cached: a default returned because Ollama was down or the
+    reply could not be parsed, or a category outside CATEGORIES, is used for this run
+    only so the message is labelled again next time.
+    """
+    from app.services.llm_service import llm_service
+
+    cache = {}
+    if Path(LABEL_CACHE).exists():
+        for line in Path(LABEL_CACHE).read_text().splitlines():
+            record = json.loads(line)
+            # Older runs cached fallbacks and malformed replies; relabel those
+            if record["category"] in CATEGORIES:
+                cache[record["text"]] = record["category"]
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def label(text):
+        async with semaphore:
+            return await llm_service.classify_intent(text)
+
+    missing = [text for text in texts if text not in cache]
+    print(f"Labelling {len(missing)} messages with the LLM ({len(texts) - len(missing)} cached)...")
+    results = await asyncio.gather(*[label(text) for text in missing])
+
+    with open(LABEL_CACHE, "a") as f:
+        for text, result in zip(missing, results):
+            if result.get("fallback") or result["category"] not in CATEGORIES:
+                continue
+            cache[text] = result["category"]
+            f.write(json.dumps({"text": text, "category": result["category"]}) + "\n")
+
+    return {text: cache.get(text) for text in texts}
+
+
+def evaluate(texts, labels, threshold, test_size, seed):
+    """
+    Train on a random split and report accuracy and LLM-call savings on the hold-out set.
+    """
+    indices = list(range(len(texts)))
+    random.Random(seed).shuffle(indices)
+    split = int(len(indices) * (1 - test_size))
+    train, test = indices[:split], indices[split:]
+
+    model = LocalIntentClassifier()
+    model.fit([texts[i] for i in train], [labels[i] for i in train])
+
+    correct = covered = covered_correct = 0
+    for i in test:
+        prediction = model.predict(texts[i]) or {"category": None, "confidence": 0.0}
+        is_correct = prediction["category"] == labels[i]
+        correct += is_correct
+        if prediction["confidence"] >= threshold:
+            covered += 1
+            covered_correct += is_correct
+
+    n = max(len(test), 1)
+    print(f"\nHold-out evaluation ({len(test)} messages, threshold {threshold}):")
+    print(f"  Overall accuracy:               {correct / n:.1%}")
+    print(f"  Answered locally (no LLM call): {covered / n:.1%}")
+    print(f"  Accuracy when answered locally: {covered_correct / max(covered, 1):.1%}")
+
+
+async def main(args):
+    history = load_history()
+    print(f"Found {len(history)} distinct historical messages")
+
+    if args.no_llm:
+        labelled = {text: label for text, label in history.items() if label}
+    else:
+        labelled = await label_with_llm(list(history), args.concurrency)
+    labelled = {text: label for text, label in labelled.items() if label in CATEGORIES}
+
+    if len(set(labelled.values())) < 2:
+        print("Not enough labelled data to train (need at least two categories).")
+        return
+
+    texts = list(labelled)
+    labels = [labelled[text] for text in texts]
+    evaluate(texts, labels, args.threshold, args.test_size, args.seed)
+
+    # Final model is fitted on everything
+    model = LocalIntentClassifier()
+    model.fit(texts, labels)
+    model.save(args.output)
+    print(f"\nSaved model to {args.output} ({len(model.vocabulary)} features, "
+          f"{len(texts)} training messages)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local intent classifier")
+    parser.add_argument("--no-llm", action="store_true",
+                        help="Only use labels implied by tickets/chat logs instead of LLM labels")
+    parser.add_argument("--output", default=settings.intent_model_path, help="Where to save the model")
+    parser.add_argument("--threshold", type=float, default=settings.intent_confidence_threshold,
+                        help="Confidence needed to skip the LLM (for the report)")
+    parser.add_argument("--test-size", type=float, default=0.2, help="Hold-out fraction")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel LLM labelling requests")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(main(parser.parse_args()))